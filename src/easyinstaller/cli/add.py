@@ -1,12 +1,20 @@
 import typer
-from rich.console import Console
+from rich.console import Console, Group
+from rich.live import Live
+from rich.table import Table
+from rich.text import Text
 
 from easyinstaller.cli.utils.ask import ask_user_to_select_packages
 from easyinstaller.core.package_handler import (
     install_with_manager,
     prime_sudo_session,
 )
-from easyinstaller.core.searcher import unified_search
+from easyinstaller.core.ranking import rank_results
+from easyinstaller.core.searcher import (
+    iter_search,
+    search_many,
+    unique_queries,
+)
 from easyinstaller.i18n.i18n import _
 
 console = Console()
@@ -22,19 +30,52 @@ app = typer.Typer(
 def add(
     packages: list[str] = typer.Argument(
         ..., help=_('One or more packages to search for and install.')
-    )
+    ),
+    batch: bool = typer.Option(
+        True,
+        '--batch/--no-batch',
+        help=_(
+            'Install the selected packages with one transaction per package manager.'
+        ),
+    ),
+    no_cache: bool = typer.Option(
+        False,
+        '--no-cache',
+        help=_('Search every source again instead of using cached results.'),
+    ),
 ):
     """
     Finds and installs one or more packages from any available source.
     """
+    queries = unique_queries(packages)
+    results_by_query = {}
+    if len(queries) > 1:
+        # Search everything up front so the prompts follow without waiting.
+        with console.status(
+            _('[bold]Searching for {count} packages...[/bold]').format(
+                count=len(queries)
+            )
+        ):
+            results_by_query = search_many(queries, use_cache=not no_cache)
+
     packages_to_install = []
-    for package_query in packages:
-        console.print(
-            _(
-                "---\n[bold]Searching for [yellow]'{package_query}'[/yellow]...[/bold]"
-            ).format(package_query=package_query)
-        )
-        results = unified_search(package_query)
+    for package_query in queries:
+        if package_query in results_by_query:
+            console.print(
+                _(
+                    "---\n[bold]Results for [yellow]'{package_query}'[/yellow]:[/bold]"
+                ).format(package_query=package_query)
+            )
+            results = results_by_query[package_query]
+        else:
+            console.print(
+                _(
+                    "---\n[bold]Searching for [yellow]'{package_query}'[/yellow]...[/bold]"
+                ).format(package_query=package_query)
+            )
+            results = _search_with_live_results(
+                package_query, use_cache=not no_cache
+            )
 
         if not results:
             console.print(
@@ -71,6 +112,10 @@ def add(
         if any(p['source'] in ('apt', 'snap') for p in packages_to_install):
             prime_sudo_session()
 
+        if batch:
+            _install_grouped_by_manager(packages_to_install)
+            return
+
         for package in packages_to_install:
             console.print(
                 _(
@@ -87,3 +132,96 @@ def add(
                         '[red]An error occurred while installing {name}:[/red] {error}'
                     ).format(name=package['name'], error=e)
                 )
+
+
+SEARCH_SOURCES = ('apt', 'flatpak', 'snap')
+PREVIEW_ROWS = 8
+
+
+def _render_partial(
+    query: str, results: list[dict], pending: list[str]
+) -> Group:
+    table = Table(show_header=True, header_style='bold magenta', box=None)
+    table.add_column(_('Name'), style='green')
+    table.add_column(_('Source'), style='cyan')
+    table.add_column(_('Summary'), overflow='ellipsis', no_wrap=True)
+    for result in rank_results(results, query, PREVIEW_ROWS):
+        table.add_row(
+            result['name'], result['source'], result.get('summary') or ''
+        )
+    waiting = Text(
+        _('Waiting for: {sources}').format(sources=', '.join(pending))
+        if pending
+        else '',
+        style='dim',
+    )
+    return Group(table, waiting)
+
+
+def _search_with_live_results(query: str, use_cache: bool) -> list[dict]:
+    """
+    Shows the best matches while the backends answer, appending each
+    backend's results as they arrive, and returns the ranked results.
+    """
+    found: list[dict] = []
+    pending = list(SEARCH_SOURCES)
+    missed = []
+    with Live(
+        _render_partial(query, found, pending),
+        console=console,
+        transient=True,
+        refresh_per_second=8,
+    ) as live:
+        for source, results in iter_search(query, use_cache=use_cache):
+            if source in pending:
+                pending.remove(source)
+            if results is None:
+                missed.append(source)
+            else:
+                found.extend(results)
+            live.update(_render_partial(query, found, pending))
+
+    if missed:
+        console.print(
+            _(
+                '[yellow]No answer from {sources}; showing the other results.[/yellow]'
+            ).format(sources=', '.join(missed))
+        )
+    return rank_results(found, query)
+
+
+def _install_grouped_by_manager(packages: list[dict]) -> None:
+    """
+    Issues one install transaction per package manager. A failing manager
+    does not prevent the others from running.
+    """
+    exit_code = 0
+    grouped: dict[str, list[dict]] = {}
+    for package in packages:
+        grouped.setdefault(package['source'], []).append(package)
+
+    for manager, entries in grouped.items():
+        console.print(
+            _(
+                'Installing [green]{names}[/green] from [cyan]{source}[/cyan]...'
+            ).format(
+                names=', '.join(entry['name'] for entry in entries),
+                source=manager,
+            )
+        )
+        try:
+            install_with_manager(
+                package_names=[entry['id'] for entry in entries],
+                manager=manager,
+            )
+        except SystemExit as e:
+            exit_code = e.code or exit_code
+        except Exception as e:
+            console.print(
+                _(
+                    '[red]An error occurred while installing packages from {source}:[/red] {error}'
+                ).format(source=manager, error=e)
+            )
+
+    if exit_code:
+        raise SystemExit(exit_code)
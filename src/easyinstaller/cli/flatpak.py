@@ -17,11 +17,32 @@ app = typer.Typer(
 def flatpak(
     packages: list[str] = typer.Argument(
         ..., help=_('One or more Flatpak packages to install.')
-    )
+    ),
+    batch: bool = typer.Option(
+        True,
+        '--batch/--no-batch',
+        help=_(
+            'Install all packages in a single Flatpak transaction instead of one at a time.'
+        ),
+    ),
 ):
     """
     Installs one or more packages using Flatpak.
     """
+    if batch:
+        console.print(
+            _(
+                'Adding [bold yellow]{packages}[/bold yellow] via [bold green]Flatpak[/bold green]...'
+            ).format(packages=', '.join(packages))
+        )
+        try:
+            install_with_manager(package_names=packages, manager='flatpak')
+        except Exception as e:
+            console.print(
+                _('[red]An error occurred:[/red] {error}').format(error=e)
+            )
+        return
+
     for package in packages:
         console.print(
             _(
@@ -1,12 +1,25 @@
 import datetime
-import json
+import fnmatch
 import os
+import re
+import sqlite3
+from typing import Callable, Dict, Iterable, Optional
 
 import typer
 from rich.console import Console
 from rich.table import Table
 
 from easyinstaller.core.config import config
+from easyinstaller.core.history_handler import (
+    follow_history,
+    iter_history_reverse,
+)
+from easyinstaller.core.history_store import (
+    open_history_store,
+    record_label,
+    record_packages,
+)
+from easyinstaller.core.log_sink import resolve_operation_log
 from easyinstaller.i18n.i18n import _
 
 app = typer.Typer(
@@ -18,24 +31,76 @@ app = typer.Typer(
 )
 console = Console()
 
+DEFAULT_PAGE_SIZE = 50
 
-@app.callback(invoke_without_command=True)
-def show_history():
+_RELATIVE_TIME = re.compile(r'^(\d+)([mhdw])$')
+_RELATIVE_UNITS = {'m': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}
+
+
+def parse_time(value: Optional[str], end: bool = False) -> Optional[str]:
     """
-    Displays the installation and removal history.
+    Turns an ISO date/time or a relative age such as 12h or 7d into an ISO
+    timestamp comparable with the history's. With `end`, a bare date means
+    the end of that day.
     """
-    history_file = config['history_file']
+    if not value:
+        return None
+    match = _RELATIVE_TIME.match(value.strip())
+    if match:
+        delta = datetime.timedelta(
+            **{_RELATIVE_UNITS[match.group(2)]: int(match.group(1))}
+        )
+        return (datetime.datetime.now() - delta).isoformat()
+    try:
+        moment = datetime.datetime.fromisoformat(value.strip())
+    except ValueError:
+        raise typer.BadParameter(
+            _('Use a date like 2024-05-01, a time or an age like 7d.')
+        )
+    if end and len(value.strip()) == 10:
+        moment += datetime.timedelta(days=1)
+    return moment.isoformat()
 
-    if not os.path.exists(history_file) or os.path.getsize(history_file) == 0:
-        console.print(_('[yellow]No history found.[/yellow]'))
-        return
 
+def _details(entry: Dict) -> str:
+    action = entry.get('action')
+    requested = set(entry.get('packages') or [entry.get('package')])
+    if action == 'install' and 'installed_packages' in entry:
+        count = len(
+            [p for p in entry['installed_packages'] if p not in requested]
+        )
+        if count == 1:
+            return _('1 dependency')
+        if count > 1:
+            return _('{count} dependencies').format(count=count)
+    elif action == 'remove' and 'removed_packages' in entry:
+        count = len(
+            [p for p in entry['removed_packages'] if p not in requested]
+        )
+        if count > 0:
+            return _('{count} packages removed').format(count=count)
+    return ''
+
+
+def _timestamp_parts(entry: Dict) -> tuple:
+    try:
+        dt_object = datetime.datetime.fromisoformat(entry.get('timestamp'))
+    except (TypeError, ValueError):
+        return _('N/A'), _('N/A')
+    return dt_object.strftime('%Y-%m-%d'), dt_object.strftime('%H:%M:%S')
+
+
+def _history_table(
+    entries: Iterable[Dict], title: str, show_ids: bool = True
+) -> Table:
     table = Table(
-        title=_('EasyInstaller History'),
+        title=title,
         show_header=True,
         header_style='bold magenta',
         expand=True,
     )
+    if show_ids:
+        table.add_column('#', style='dim', justify='right')
     table.add_column(_('Date'), style='dim', width=12)
     table.add_column(_('Time'), style='dim', width=10)
     table.add_column(_('Action'), width=10)
@@ -43,59 +108,244 @@ def show_history():
     table.add_column(_('Manager'), style='cyan')
     table.add_column(_('Details'), justify='right')
 
-    try:
-        with open(history_file, 'r') as f:
-            history_entries = [json.loads(line) for line in f]
+    for entry in entries:
+        action = entry.get('action', _('N/A'))
+        package = record_label(entry) or _('N/A')
+        manager = entry.get('manager', _('N/A'))
+        date_str, time_str = _timestamp_parts(entry)
 
-        # Sort by timestamp descending (newest first)
-        history_entries.sort(
-            key=lambda x: x.get('timestamp', ''), reverse=True
+        action_style = 'green' if action == 'install' else 'red'
+        table.add_row(
+            *([str(entry.get('id', ''))] if show_ids else []),
+            date_str,
+            time_str,
+            f'[{action_style}]{action}[/{action_style}]',
+            package,
+            manager,
+            _details(entry),
         )
+    return table
 
-        for entry in history_entries:
-            action = entry.get('action', _('N/A'))
-            package = entry.get('package', _('N/A'))
-            manager = entry.get('manager', _('N/A'))
-            timestamp_str = entry.get('timestamp')
-
-            if timestamp_str:
-                dt_object = datetime.datetime.fromisoformat(timestamp_str)
-                date_str = dt_object.strftime('%Y-%m-%d')
-                time_str = dt_object.strftime('%H:%M:%S')
-            else:
-                date_str, time_str = _('N/A'), _('N/A')
-
-            action_style = 'green' if action == 'install' else 'red'
-
-            details = ''
-            if action == 'install' and 'installed_packages' in entry:
-                count = len(entry['installed_packages']) - 1
-                if count > 0:
-                    details = _(
-                        "{count} dependenc{'ies' if count > 1 else 'y'}"
-                    ).format(count=count)
-            elif action == 'remove' and 'removed_packages' in entry:
-                count = len(entry['removed_packages']) - 1
-                if count > 0:
-                    details = _('{count} packages removed').format(count=count)
-
-            table.add_row(
-                date_str,
-                time_str,
-                f'[{action_style}]{action}[/{action_style}]',
-                package,
-                manager,
-                details,
-            )
 
-        console.print(table)
+def _matches(entry: Dict, filters: Dict[str, Optional[str]]) -> bool:
+    if filters['manager'] and entry.get('manager') != filters['manager']:
+        return False
+    if filters['action'] and entry.get('action') != filters['action']:
+        return False
+    if filters['package']:
+        return any(
+            fnmatch.fnmatchcase(name, filters['package'])
+            for name in record_packages(entry)
+        )
+    return True
+
+
+def _recent_entries(
+    limit: int,
+    since: Optional[str],
+    until: Optional[str],
+    on_corrupt: Optional[Callable[[bytes], None]] = None,
+) -> list:
+    """
+    Reads the newest `limit` operations from the end of the history file.
+    The file is in the order operations finished, so reading stops at the
+    first operation older than `since`.
+    """
+    entries = []
+    for entry in iter_history_reverse(on_corrupt=on_corrupt):
+        timestamp = str(entry.get('timestamp') or '')
+        if since and timestamp < since:
+            break
+        if until and timestamp >= until:
+            continue
+        entries.append(entry)
+        if len(entries) >= limit:
+            break
+    return entries
+
 
-    except (IOError, json.JSONDecodeError) as e:
+def _log_location(entry: Dict) -> str:
+    log_file = entry.get('log_file')
+    if not log_file:
+        return _('N/A')
+    # Finished logs are gzip-compressed and old ones rotated away.
+    resolved = resolve_operation_log(log_file)
+    if resolved is None:
+        return _('{path} (removed by log rotation)').format(path=log_file)
+    return str(resolved)
+
+
+def _show_operation(op_id: int) -> None:
+    try:
+        with open_history_store() as store:
+            entry = store.get(op_id)
+    except (OSError, sqlite3.Error) as e:
         console.print(
             _(
                 '[bold red]Error reading history file:[/bold red] {error}'
             ).format(error=e)
         )
+        raise typer.Exit(1)
+    if entry is None:
+        console.print(
+            _('[red]Error:[/red] No operation #{id} in the history.').format(
+                id=op_id
+            )
+        )
+        raise typer.Exit(1)
+
+    date_str, time_str = _timestamp_parts(entry)
+    table = Table.grid(padding=(0, 2))
+    table.add_column(style='bold')
+    table.add_column()
+    table.add_row(_('Operation'), f'#{op_id}')
+    table.add_row(_('Date'), f'{date_str} {time_str}')
+    table.add_row(_('Action'), entry.get('action', _('N/A')))
+    table.add_row(_('Manager'), entry.get('manager', _('N/A')))
+    table.add_row(_('Package'), record_label(entry) or _('N/A'))
+    for key, label in (
+        ('installed_packages', _('Installed')),
+        ('removed_packages', _('Removed')),
+    ):
+        if isinstance(entry.get(key), list):
+            table.add_row(label, ', '.join(map(str, entry[key])))
+    table.add_row(_('Log file'), _log_location(entry))
+    console.print(table)
+
+
+def _print_followed(entry: Dict) -> None:
+    date_str, time_str = _timestamp_parts(entry)
+    action = entry.get('action', _('N/A'))
+    action_style = 'green' if action == 'install' else 'red'
+    details = _details(entry)
+    console.print(
+        f'[dim]{date_str} {time_str}[/dim] '
+        f'[{action_style}]{action}[/{action_style}] '
+        f'{record_label(entry) or _("N/A")} '
+        f"[cyan]{entry.get('manager', _('N/A'))}[/cyan]"
+        + (f' [dim]({details})[/dim]' if details else '')
+    )
+
+
+@app.callback(invoke_without_command=True)
+def show_history(
+    limit: int = typer.Option(
+        DEFAULT_PAGE_SIZE,
+        '--limit',
+        '-n',
+        '--page-size',
+        min=1,
+        help=_('Number of operations to show (per page).'),
+    ),
+    since: Optional[str] = typer.Option(
+        None,
+        '--since',
+        help=_('Only operations from this date/time or age (e.g. 7d) on.'),
+    ),
+    until: Optional[str] = typer.Option(
+        None, '--until', help=_('Only operations before this date/time.')
+    ),
+    follow: bool = typer.Option(
+        False,
+        '--follow',
+        '-f',
+        help=_('Keep running and print new operations as they happen.'),
+    ),
+    package: Optional[str] = typer.Option(
+        None,
+        '--package',
+        '-p',
+        help=_('Only operations involving this package (wildcards allowed).'),
+    ),
+    manager: Optional[str] = typer.Option(
+        None, '--manager', '-m', help=_('Only operations of this manager.')
+    ),
+    action: Optional[str] = typer.Option(
+        None, '--action', '-a', help=_('Only install or remove operations.')
+    ),
+    page: int = typer.Option(
+        1, '--page', min=1, help=_('Page of results to show, newest first.')
+    ),
+    show: Optional[int] = typer.Option(
+        None,
+        '--show',
+        min=1,
+        help=_('Show the details and log file of the operation with this #.'),
+    ),
+):
+    """
+    Displays the installation and removal history.
+    """
+    if show is not None:
+        _show_operation(show)
+        return
+    since_ts = parse_time(since)
+    until_ts = parse_time(until, end=True)
+    filters = {'package': package, 'manager': manager, 'action': action}
+    history_file = config['history_file']
+    try:
+        follow_offset = os.path.getsize(history_file)
+    except OSError:
+        follow_offset = 0
+
+    title = _('EasyInstaller History')
+    # The index is synced incrementally and answers every listing, so the
+    # ids needed by --show and `ei undo` are always shown.
+    try:
+        with open_history_store() as store:
+            total = store.count(**filters, since=since_ts, until=until_ts)
+            entries = store.query(
+                **filters,
+                since=since_ts,
+                until=until_ts,
+                limit=limit,
+                offset=(page - 1) * limit,
+            )
+            skipped = store.skipped_lines
+        show_ids = True
+    except (OSError, sqlite3.Error) as e:
+        if any(filters.values()) or page > 1:
+            console.print(
+                _(
+                    '[bold red]Error reading history file:[/bold red] {error}'
+                ).format(error=e)
+            )
+            raise typer.Exit(1)
+        # Without a usable index the newest operations can still be read
+        # from the end of the file, only without their ids.
+        corrupt = []
+        entries = _recent_entries(limit, since_ts, until_ts, corrupt.append)
+        total = len(entries)
+        skipped = len(corrupt)
+        show_ids = False
+    pages = (total + limit - 1) // limit
+    if pages > 1:
+        title += ' ' + _('(page {page} of {pages})').format(
+            page=page, pages=pages
+        )
+
+    if entries:
+        console.print(_history_table(entries, title, show_ids))
+    elif not follow:
+        console.print(_('[yellow]No history found.[/yellow]'))
+    if skipped:
+        console.print(
+            _(
+                '[yellow]Skipped {count} unreadable history lines (e.g. from an interrupted write).[/yellow]'
+            ).format(count=skipped)
+        )
+
+    if not follow:
+        return
+    console.print(
+        _('[dim]Waiting for new operations (Ctrl+C to stop)...[/dim]')
+    )
+    try:
+        for entry in follow_history(history_file, offset=follow_offset):
+            if _matches(entry, filters):
+                _print_followed(entry)
+    except KeyboardInterrupt:
+        pass
 
 
 if __name__ == '__main__':
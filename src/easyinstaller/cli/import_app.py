@@ -2,17 +2,38 @@ import json
 
 import typer
 from rich import print
+from rich.console import Console
+from rich.progress import (
+    Progress,
+    SpinnerColumn,
+    TextColumn,
+    TimeElapsedColumn,
+)
+from rich.table import Table
 
+from easyinstaller.core.history_handler import history_batch
 from easyinstaller.core.package_handler import (
+    cache_artifacts,
     install_with_manager,
+    prefetch_with_manager,
     prime_sudo_session,
 )
+from easyinstaller.core.runner import is_non_interactive
+from easyinstaller.core.scheduler import (
+    JobResult,
+    ManagerJob,
+    run_manager_jobs,
+)
 from easyinstaller.i18n.i18n import _
 
+console = Console()
+
 app = typer.Typer(
     name='import',
     help=_('Installs packages from a previously exported JSON file.'),
     no_args_is_help=True,
+    # Lets options follow the file, as in `ei import setup.json -y`.
+    context_settings={'allow_interspersed_args': True},
 )
 
 
@@ -23,7 +44,27 @@ def import_packages(
         help=_(
             'Path to the JSON file containing the list of packages to install.'
         ),
-    )
+    ),
+    parallel: bool = typer.Option(
+        True,
+        '--parallel/--sequential',
+        help=_(
+            'Install apt, flatpak and snap groups concurrently when they do not share a lock.'
+        ),
+    ),
+    prefetch: bool = typer.Option(
+        True,
+        '--prefetch/--no-prefetch',
+        help=_(
+            'Download every group up front, in parallel, before installing it. Uses the shared artifact_cache directory when configured.'
+        ),
+    ),
+    yes: bool = typer.Option(
+        False,
+        '--yes',
+        '-y',
+        help=_('Automatically answer "yes" to confirmation prompts.'),
+    ),
 ):
     """
     Import and install packages from a setup.json file.
@@ -57,57 +98,179 @@ def import_packages(
         print(_('[yellow]No packages found in the file to install.[/yellow]'))
         return
 
-    # Prime sudo session if apt or snap packages are present
-    if any(
-        manager in ('apt', 'snap') and packages
-        for manager, packages in packages_to_install.items()
-    ):
-        prime_sudo_session()
-
+    # There is nobody to answer the prompts in non-interactive mode.
+    auto_confirm = yes or is_non_interactive()
+    jobs = []
     for manager, packages in packages_to_install.items():
-        if packages:
-            if manager == 'flatpak':
-                package_ids = [pkg.get('id', pkg['name']) for pkg in packages]
-            else:
-                package_ids = [pkg['name'] for pkg in packages]
+        if not packages:
+            continue
+        if manager == 'flatpak':
+            package_ids = [pkg.get('id', pkg['name']) for pkg in packages]
+        else:
+            package_ids = [pkg['name'] for pkg in packages]
+
+        print(
+            _(
+                'Found {count} packages for [bold green]{manager}[/bold green].'
+            ).format(count=len(package_ids), manager=manager)
+        )
 
+        # Confirm every manager up front so the installs can run unattended
+        if auto_confirm or typer.confirm(
+            _(
+                'Do you want to install these {count} packages using {manager}?'
+            ).format(count=len(package_ids), manager=manager)
+        ):
+            jobs.append(ManagerJob(manager=manager, packages=package_ids))
+        else:
             print(
-                _(
-                    'Found {count} packages for [bold green]{manager}[/bold green].'
-                ).format(count=len(package_ids), manager=manager)
+                _('Skipping installation for {manager} packages.').format(
+                    manager=manager
+                )
             )
 
-            # Confirm before installing
-            if typer.confirm(
-                _(
-                    'Do you want to install these {count} packages using {manager}?'
-                ).format(count=len(package_ids), manager=manager)
-            ):
-                print(
-                    _('Installing packages with {manager}...').format(
-                        manager=manager
-                    )
-                )
-                try:
-                    install_with_manager(package_ids, manager=manager)
-                except SystemExit as e:
-                    if e.code != 0:
-                        print(
-                            _(
-                                '[bold red]Failed to install one or more packages ({manager}).[/bold red]'
-                            ).format(manager=manager)
-                        )
-                        continue
-                print(
-                    _(
-                        '[bold green]✔ Installation process for {manager} complete.[/bold green]'
-                    ).format(manager=manager)
-                )
-            else:
-                print(
-                    _('Skipping installation for {manager} packages.').format(
-                        manager=manager
-                    )
+    if not jobs:
+        print(_('[bold green]✔ Import process finished![/bold green]'))
+        return
+
+    # Prime sudo session if apt or snap packages are present
+    if any(job.manager in ('apt', 'snap') for job in jobs):
+        prime_sudo_session()
+
+    concurrent = parallel and len(jobs) > 1
+    # The whole import is written to the history in one go.
+    with history_batch():
+        if concurrent:
+            print(
+                _('Installing with {managers} in parallel...').format(
+                    managers=', '.join(job.manager for job in jobs)
                 )
+            )
+            results = _run_with_progress(jobs, prefetch)
+        else:
+            results = run_manager_jobs(
+                jobs,
+                _install_job,
+                on_state=_print_state,
+                parallel=False,
+                prefetch=_prefetch_job if prefetch else None,
+            )
 
+    _print_report(results)
     print(_('[bold green]✔ Import process finished![/bold green]'))
+
+
+def _install_job(manager: str, packages: list[str]) -> dict[str, str]:
+    results = install_with_manager(packages, manager=manager)
+    present = [pkg for pkg, outcome in results.items() if outcome != 'failed']
+    cache_artifacts(present, manager)
+    return results
+
+
+def _prefetch_job(manager: str, packages: list[str]) -> int:
+    return prefetch_with_manager(packages, manager=manager)
+
+
+def _print_state(manager: str, state: str) -> None:
+    if state == 'prefetching':
+        print(
+            _('Downloading {manager} packages in advance...').format(
+                manager=manager
+            )
+        )
+    elif state == 'running':
+        print(
+            _('Installing packages with {manager}...').format(manager=manager)
+        )
+    elif state == 'done':
+        print(
+            _(
+                '[bold green]✔ Installation process for {manager} complete.[/bold green]'
+            ).format(manager=manager)
+        )
+    elif state == 'failed':
+        print(
+            _(
+                '[bold red]Failed to install one or more packages ({manager}).[/bold red]'
+            ).format(manager=manager)
+        )
+
+
+def _run_with_progress(
+    jobs: list[ManagerJob], prefetch: bool = True
+) -> list[JobResult]:
+    """Runs the jobs concurrently with one progress line per manager."""
+    state_labels = {
+        'prefetching': _('downloading'),
+        'waiting': _('waiting for lock'),
+        'running': _('installing'),
+        'done': _('done'),
+        'failed': _('failed'),
+    }
+    progress = Progress(
+        SpinnerColumn(),
+        TextColumn('[bold]{task.fields[manager]}[/bold]'),
+        TextColumn('{task.fields[packages]}'),
+        TextColumn('{task.description}'),
+        TimeElapsedColumn(),
+        console=console,
+    )
+    tasks = {
+        job.manager: progress.add_task(
+            state_labels['waiting'],
+            manager=job.manager,
+            packages=_('{count} packages').format(count=len(job.packages)),
+            total=1,
+        )
+        for job in jobs
+    }
+
+    def on_state(manager: str, state: str) -> None:
+        finished = state in ('done', 'failed')
+        progress.update(
+            tasks[manager],
+            description=state_labels[state],
+            completed=1 if finished else 0,
+        )
+
+    with progress:
+        return run_manager_jobs(
+            jobs,
+            _install_job,
+            on_state=on_state,
+            prefetch=_prefetch_job if prefetch else None,
+        )
+
+
+def _print_report(results: list[JobResult]) -> None:
+    table = Table(title=_('Import summary'))
+    table.add_column(_('Manager'), style='cyan')
+    table.add_column(_('Installed'), style='green', justify='right')
+    table.add_column(_('Already present'), justify='right')
+    table.add_column(_('Failed'), style='red', justify='right')
+    table.add_column(_('Time'), justify='right')
+    table.add_column(_('Status'))
+
+    for result in results:
+        outcomes = list(result.results.values())
+        if result.ok:
+            status = _('[green]ok[/green]')
+        elif result.error:
+            status = _('[red]error: {error}[/red]').format(error=result.error)
+        else:
+            status = _('[red]exit code {code}[/red]').format(
+                code=result.exit_code
+            )
+        failed = (
+            outcomes.count('failed') if result.ok else len(result.packages)
+        )
+        table.add_row(
+            result.manager,
+            str(outcomes.count('installed')),
+            str(outcomes.count('unchanged')),
+            str(failed),
+            f'{result.elapsed:.1f}s',
+            status,
+        )
+
+    console.print(table)
@@ -0,0 +1,107 @@
+from datetime import datetime
+from typing import List, Optional
+
+import requests
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from easyinstaller.core.search_index import (
+    INDEX_SOURCES,
+    load_search_index,
+    max_index_age,
+    refresh_index,
+)
+from easyinstaller.i18n.i18n import _
+
+app = typer.Typer(
+    name='index',
+    help=_('Manages the local search index of Flathub and Snap catalogs.'),
+    invoke_without_command=True,
+)
+console = Console()
+
+
+@app.callback()
+def show_index(ctx: typer.Context):
+    """
+    Shows when each catalog was indexed and whether it is still used.
+    """
+    if ctx.invoked_subcommand:
+        return
+
+    index = load_search_index()
+    max_age = max_index_age()
+
+    table = Table(
+        title=_('Search index'),
+        show_header=True,
+        header_style='bold magenta',
+    )
+    table.add_column(_('Source'), style='cyan')
+    table.add_column(_('Packages'), justify='right')
+    table.add_column(_('Updated'))
+    table.add_column(_('Status'))
+
+    for source in INDEX_SOURCES:
+        updated = index.updated(source) if index else None
+        if updated is None:
+            table.add_row(source, '0', '-', _('[yellow]missing[/yellow]'))
+            continue
+        status = (
+            _('[green]fresh[/green]')
+            if index.is_fresh(source, max_age)
+            else _('[yellow]stale[/yellow]')
+        )
+        table.add_row(
+            source,
+            str(index.size(source)),
+            datetime.fromtimestamp(updated).strftime('%Y-%m-%d %H:%M'),
+            status,
+        )
+
+    console.print(table)
+    console.print(
+        _(
+            'Run [cyan]ei index refresh[/cyan] to download the catalogs. '
+            'Stale or missing catalogs are searched online.'
+        )
+    )
+
+
+@app.command('refresh')
+def refresh(
+    sources: Optional[List[str]] = typer.Argument(
+        None,
+        help=_('Catalogs to refresh (flatpak, snap). Defaults to all.'),
+    )
+):
+    """
+    Downloads the Flathub and Snap catalogs into the local search index.
+    """
+    unknown = [s for s in sources or [] if s not in INDEX_SOURCES]
+    if unknown:
+        console.print(
+            _('[red]Error:[/red] Unknown source(s): {sources}.').format(
+                sources=', '.join(unknown)
+            )
+        )
+        raise typer.Exit(1)
+
+    try:
+        with console.status(_('[cyan]Downloading catalogs...[/cyan]')):
+            counts = refresh_index(sources or None)
+    except (requests.RequestException, ValueError) as e:
+        console.print(
+            _('[red]Error:[/red] Could not refresh the index: {error}').format(
+                error=e
+            )
+        )
+        raise typer.Exit(1)
+
+    for source, count in counts.items():
+        console.print(
+            _(
+                '[green]✔[/green] Indexed [bold]{count}[/bold] packages from [cyan]{source}[/cyan].'
+            ).format(count=count, source=source)
+        )
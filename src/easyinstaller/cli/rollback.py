@@ -0,0 +1,209 @@
+from typing import Optional
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from easyinstaller.cli.hist import parse_time
+from easyinstaller.core.history_handler import history_batch
+from easyinstaller.core.package_handler import prime_sudo_session
+from easyinstaller.core.rollback import (
+    ManagerPlan,
+    apply_plan,
+    operations_to_undo,
+    plan_rollback,
+    simulate_apt_removal,
+)
+from easyinstaller.core.scheduler import (
+    JobResult,
+    ManagerJob,
+    run_manager_jobs,
+)
+from easyinstaller.i18n.i18n import _
+
+console = Console()
+
+app = typer.Typer(
+    name='rollback',
+    help=_(
+        'Undoes the last operations, or every operation since a point in time.'
+    ),
+    no_args_is_help=False,
+    # Lets options follow the count, as in `ei undo 2 --dry-run`.
+    context_settings={'allow_interspersed_args': True},
+)
+
+
+@app.callback(invoke_without_command=True)
+def rollback(
+    count: Optional[int] = typer.Argument(
+        None, min=1, help=_('Number of operations to undo (default: 1).')
+    ),
+    to: Optional[str] = typer.Option(
+        None,
+        '--to',
+        help=_('Undo every operation after this date/time or age (e.g. 2h).'),
+    ),
+    dry_run: bool = typer.Option(
+        False, '--dry-run', help=_('Only show what would be changed.')
+    ),
+    parallel: bool = typer.Option(
+        True,
+        '--parallel/--sequential',
+        help=_(
+            'Run apt, flatpak and snap transactions concurrently when they do not share a lock.'
+        ),
+    ),
+    yes: bool = typer.Option(
+        False,
+        '--yes',
+        '-y',
+        help=_('Automatically answer "yes" to confirmation prompts.'),
+    ),
+):
+    """
+    Reverts operations recorded in the history with one remove and one
+    install transaction per manager.
+    """
+    if count is not None and to:
+        console.print(
+            _('[red]Error:[/red] Give either a number of operations or --to.')
+        )
+        raise typer.Exit(code=1)
+
+    if to:
+        operations = operations_to_undo(after=parse_time(to))
+    else:
+        operations = operations_to_undo(count=count or 1)
+
+    if not operations:
+        console.print(_('[yellow]No operations to undo.[/yellow]'))
+        return
+
+    console.print(
+        _('Undoing {count} operations, back to before {timestamp}.').format(
+            count=len(operations),
+            timestamp=operations[-1].get('timestamp', _('N/A')),
+        )
+    )
+    plans = plan_rollback(operations)
+    if not plans:
+        console.print(
+            _(
+                '[green]These operations cancel each other out; nothing to do.[/green]'
+            )
+        )
+        return
+
+    unchecked = [
+        plan.manager
+        for plan in plans
+        if plan.manager == 'apt'
+        and plan.remove
+        and simulate_apt_removal(plan) is None
+    ]
+    console.print(_plan_table(plans))
+    if unchecked:
+        console.print(
+            _(
+                '[yellow]Warning:[/yellow] Could not check which other packages apt would remove.'
+            )
+        )
+
+    extra = sorted(pkg for plan in plans for pkg in plan.extra_removals)
+    if extra:
+        console.print(
+            _(
+                '[red]Error:[/red] Removing these packages would also remove {packages}, which depend on them. Undo the operations that installed those as well, or remove them first.'
+            ).format(packages=', '.join(extra))
+        )
+        if not dry_run:
+            raise typer.Exit(code=1)
+    if dry_run:
+        return
+    if not yes and not typer.confirm(_('Apply these changes?')):
+        raise typer.Exit()
+
+    if any(plan.manager in ('apt', 'snap') for plan in plans):
+        prime_sudo_session()
+
+    by_manager = {plan.manager: plan for plan in plans}
+    jobs = [
+        ManagerJob(manager=plan.manager, packages=plan.packages)
+        for plan in plans
+    ]
+    with history_batch():
+        results = run_manager_jobs(
+            jobs,
+            lambda manager, packages: apply_plan(by_manager[manager]),
+            on_state=_print_state,
+            parallel=parallel,
+        )
+
+    _print_report(results)
+    if not all(result.ok for result in results):
+        raise typer.Exit(code=1)
+    console.print(_('[bold green]✔ Rollback finished![/bold green]'))
+
+
+def _plan_table(plans: list[ManagerPlan]) -> Table:
+    table = Table(title=_('Rollback plan'))
+    table.add_column(_('Manager'), style='cyan')
+    table.add_column(_('Remove'), style='red')
+    table.add_column(_('Reinstall'), style='green')
+    show_extra = any(plan.extra_removals for plan in plans)
+    if show_extra:
+        table.add_column(_('Also removed'), style='bold red')
+    for plan in plans:
+        row = [plan.manager, ', '.join(plan.remove), ', '.join(plan.install)]
+        if show_extra:
+            row.append(', '.join(plan.extra_removals))
+        table.add_row(*row)
+    return table
+
+
+def _print_state(manager: str, state: str) -> None:
+    if state == 'running':
+        console.print(
+            _('Rolling back {manager} packages...').format(manager=manager)
+        )
+    elif state == 'failed':
+        console.print(
+            _(
+                '[bold red]Failed to roll back one or more packages ({manager}).[/bold red]'
+            ).format(manager=manager)
+        )
+
+
+def _print_report(results: list[JobResult]) -> None:
+    table = Table(title=_('Rollback summary'))
+    table.add_column(_('Manager'), style='cyan')
+    table.add_column(_('Removed'), style='red', justify='right')
+    table.add_column(_('Reinstalled'), style='green', justify='right')
+    table.add_column(_('Already done'), justify='right')
+    table.add_column(_('Failed'), justify='right')
+    table.add_column(_('Status'))
+
+    for result in results:
+        outcomes = list(result.results.values())
+        if result.ok:
+            status = _('[green]ok[/green]')
+        elif result.error:
+            status = _('[red]error: {error}[/red]').format(error=result.error)
+        else:
+            status = _('[red]exit code {code}[/red]').format(
+                code=result.exit_code
+            )
+        table.add_row(
+            result.manager,
+            str(outcomes.count('removed')),
+            str(outcomes.count('installed')),
+            str(outcomes.count('unchanged')),
+            str(outcomes.count('failed')),
+            status,
+        )
+    console.print(table)
+
+
+if __name__ == '__main__':
+    app()
@@ -13,11 +13,32 @@ app = typer.Typer(name='snap', help=_('Install a package using Snap.'))
 def snap(
     packages: list[str] = typer.Argument(
         ..., help=_('One or more Snap packages to install.')
-    )
+    ),
+    batch: bool = typer.Option(
+        True,
+        '--batch/--no-batch',
+        help=_(
+            'Install all packages in a single Snap transaction instead of one at a time.'
+        ),
+    ),
 ):
     """
     Installs one or more packages using Snap.
     """
+    if batch:
+        console.print(
+            _(
+                'Adding [bold yellow]{packages}[/bold yellow] via [bold green]Snap[/bold green]...'
+            ).format(packages=', '.join(packages))
+        )
+        try:
+            install_with_manager(package_names=packages, manager='snap')
+        except Exception as e:
+            console.print(
+                _('[red]An error occurred:[/red] {error}').format(error=e)
+            )
+        return
+
     for package in packages:
         console.print(
             _(
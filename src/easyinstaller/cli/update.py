@@ -12,6 +12,7 @@ import typer
 from rich.console import Console
 from rich.markdown import Markdown
 
+from easyinstaller.core.http_client import open_download
 from easyinstaller.core.versioning import (
     DATA_DIR,
     compare_versions,
@@ -49,7 +50,7 @@ def download_asset(url: str, dest_path: Path) -> None:
         )
     )
     try:
-        with requests.get(url, stream=True, timeout=60) as response:
+        with open_download(url) as response:
             response.raise_for_status()
             with dest_path.open('wb') as handle:
                 for chunk in response.iter_content(chunk_size=8192):
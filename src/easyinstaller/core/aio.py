@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import functools
+import subprocess
+import threading
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, TypeVar
+
+T = TypeVar('T')
+
+# Workers of the loop's executor, which runs blocking calls (HTTP requests
+# through the pooled session, file parsing, legacy subprocess helpers).
+IO_WORKERS = 16
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Returns the process-wide event loop, started on first use in a daemon
+    thread. Listing, searching and command execution are all scheduled on
+    it, so they can be composed without creating pools per call.
+    """
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                loop.set_default_executor(
+                    concurrent.futures.ThreadPoolExecutor(
+                        max_workers=IO_WORKERS, thread_name_prefix='ei-io'
+                    )
+                )
+                thread = threading.Thread(
+                    target=loop.run_forever, name='ei-loop', daemon=True
+                )
+                thread.start()
+                _loop = loop
+    return _loop
+
+
+def submit(coro: Awaitable[T]) -> concurrent.futures.Future:
+    """Schedules a coroutine on the shared loop from any other thread."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+
+def run(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """
+    Runs a coroutine on the shared loop and waits for its result.
+    Must not be called from a coroutine running on that loop.
+    """
+    loop = get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        if asyncio.iscoroutine(coro):
+            coro.close()
+        raise RuntimeError('aio.run() called from the shared event loop')
+    return submit(coro).result(timeout)
+
+
+async def call(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Awaits a blocking function run on the shared executor."""
+    return await asyncio.get_running_loop().run_in_executor(
+        None, functools.partial(func, *args, **kwargs)
+    )
+
+
+async def gather_calls(
+    calls: Dict[str, Callable[[], T]]
+) -> Dict[str, T | BaseException]:
+    """
+    Runs blocking functions concurrently and returns their results by key;
+    a function that raised is reported by its exception.
+    """
+    keys = list(calls)
+    results = await asyncio.gather(
+        *(call(calls[key]) for key in keys), return_exceptions=True
+    )
+    return dict(zip(keys, results))
+
+
+@dataclass
+class ProcessResult:
+    returncode: int
+    stdout: str = ''
+    stderr: str = ''
+
+
+async def run_process(
+    args: Sequence[str],
+    env: Optional[dict] = None,
+    stdin: Any = subprocess.DEVNULL,
+    stdout: Any = subprocess.PIPE,
+    stderr: Any = subprocess.PIPE,
+    timeout: Optional[float] = None,
+) -> ProcessResult:
+    """
+    Runs a command without a shell and returns its exit code and decoded
+    output. `stdout`/`stderr` may also be file objects or
+    subprocess.DEVNULL / subprocess.STDOUT.
+    Raises FileNotFoundError if the program does not exist and
+    asyncio.TimeoutError (after killing it) if it exceeds `timeout`.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *args, env=env, stdin=stdin, stdout=stdout, stderr=stderr
+    )
+    try:
+        out, err = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise
+    return ProcessResult(
+        returncode=process.returncode,
+        stdout=(out or b'').decode('utf-8', errors='replace'),
+        stderr=(err or b'').decode('utf-8', errors='replace'),
+    )
+
+
+def run_process_sync(args: Sequence[str], **kwargs: Any) -> ProcessResult:
+    """Sync wrapper of run_process for CLI code."""
+    return run(run_process(args, **kwargs))
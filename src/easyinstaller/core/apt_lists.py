@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import json
+import lzma
+import os
+import re
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from easyinstaller.core.config import CACHE_DIR
+from easyinstaller.core.dpkg_status import COMPRESSED_OPENERS, iter_stanzas
+
+APT_LISTS_DIR = Path('/var/lib/apt/lists')
+APT_NAME_INDEX_FILE = CACHE_DIR / 'apt-names.tsv'
+
+# Characters that make apt-cache treat a query as a regular expression.
+_REGEX_CHARS = re.compile(r'[\\^$.|?*+()\[\]{}]')
+
+
+def package_list_files(lists_dir: Path = APT_LISTS_DIR) -> List[Path]:
+    """
+    Returns the Packages indices apt downloaded, plain or compressed in a
+    format the standard library can read.
+    """
+    try:
+        entries = sorted(lists_dir.iterdir())
+    except OSError:
+        return []
+    files = []
+    for path in entries:
+        name = path.name
+        if path.suffix in COMPRESSED_OPENERS:
+            name = name[: -len(path.suffix)]
+        if name.endswith('_Packages'):
+            files.append(path)
+    return files
+
+
+def lists_fingerprint(files: List[Path]) -> List[list]:
+    fingerprint = []
+    for path in files:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        fingerprint.append([str(path), stat.st_mtime_ns, stat.st_size])
+    return fingerprint
+
+
+class AptNameIndex:
+    """
+    Sorted `name<TAB>summary` lines of every package apt knows about.
+    Searches stream matches lazily: prefix matches first, found by
+    bisection, then the remaining substring or regex matches.
+    """
+
+    def __init__(self, lines: List[str]):
+        self._lines = lines
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    @staticmethod
+    def _entry(line: str) -> Dict:
+        name, _, summary = line.partition('\t')
+        return {'id': name, 'name': name, 'summary': summary, 'source': 'apt'}
+
+    def search(self, query: str) -> Iterator[Dict]:
+        query = query.strip().lower()
+        if not query:
+            return
+        if _REGEX_CHARS.search(query):
+            try:
+                pattern = re.compile(query, re.IGNORECASE)
+            except re.error:
+                return
+            for line in self._lines:
+                if pattern.search(line.partition('\t')[0]):
+                    yield self._entry(line)
+            return
+
+        lines = self._lines
+        start = bisect_left(lines, query)
+        end = start
+        while end < len(lines) and lines[end].startswith(query):
+            yield self._entry(lines[end])
+            end += 1
+
+        for position, line in enumerate(lines):
+            if start <= position < end:
+                continue
+            if query in line.partition('\t')[0]:
+                yield self._entry(line)
+
+
+def build_name_index(lists_dir: Path = APT_LISTS_DIR) -> Optional[List[str]]:
+    """
+    Reads every Packages index into sorted, de-duplicated name lines and
+    stores them with the fingerprint of the lists they came from.
+    Returns None when apt has no readable lists.
+    """
+    files = package_list_files(lists_dir)
+    summaries: Dict[str, str] = {}
+    read_any = False
+    for path in files:
+        try:
+            for stanza in iter_stanzas(path, ('Package', 'Description')):
+                name = stanza.get('Package')
+                if name and name not in summaries:
+                    summaries[name] = stanza.get('Description', '')
+            read_any = True
+        except (OSError, EOFError, lzma.LZMAError):
+            continue
+    if not read_any:
+        return None
+
+    lines = [
+        f"{name}\t{summary.replace(chr(9), ' ')}"
+        for name, summary in sorted(summaries.items())
+    ]
+    header = '#' + json.dumps(lists_fingerprint(files))
+    tmp_file = APT_NAME_INDEX_FILE.with_name(
+        f'{APT_NAME_INDEX_FILE.name}.{os.getpid()}.tmp'
+    )
+    try:
+        APT_NAME_INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file.write_text(
+            '\n'.join([header] + lines) + '\n', encoding='utf-8'
+        )
+        os.replace(tmp_file, APT_NAME_INDEX_FILE)
+    except OSError:
+        try:
+            tmp_file.unlink()
+        except OSError:
+            pass
+    return lines
+
+
+def load_name_index(lists_dir: Path = APT_LISTS_DIR) -> Optional[AptNameIndex]:
+    """
+    Returns the apt name index, rebuilding it when the lists changed since
+    it was written (e.g. after `apt update`). Returns None when apt has no
+    readable lists, so callers can fall back to apt-cache.
+    """
+    fingerprint = lists_fingerprint(package_list_files(lists_dir))
+    if not fingerprint:
+        return None
+    try:
+        with open(APT_NAME_INDEX_FILE, encoding='utf-8') as handle:
+            header = handle.readline()
+            if header.startswith('#') and (
+                json.loads(header[1:]) == fingerprint
+            ):
+                return AptNameIndex(handle.read().splitlines())
+    except (OSError, ValueError):
+        pass
+
+    lines = build_name_index(lists_dir)
+    return AptNameIndex(lines) if lines is not None else None
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import os
+import re
+import shlex
+import shutil
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from easyinstaller.core import aio
+from easyinstaller.core.config import config
+
+# Directory shared by machines restoring the same export (e.g. an NFS
+# mount). Unset or empty disables the artifact cache.
+ARTIFACT_CACHE_CONFIG_KEY = 'artifact_cache'
+MAX_SIZE_CONFIG_KEY = 'artifact_cache_max_mb'
+DEFAULT_MAX_SIZE_MB = 10240
+
+APT_ARCHIVES_DIR = Path('/var/cache/apt/archives')
+APT_SUBDIR = 'apt'
+# `flatpak create-usb` writes an OSTree repo below `.ostree/repo`.
+FLATPAK_SUBDIR = 'flatpak'
+FLATPAK_REPO = Path('.ostree') / 'repo'
+
+# `'<uri>' <file name> <size> <hash>` lines of `apt-get --print-uris`.
+_PRINT_URIS_LINE = re.compile(r"^'[^']+' (\S+\.deb) \d+")
+
+
+def cache_dir() -> Optional[Path]:
+    """Returns the configured artifact cache directory, if any."""
+    value = config.get(ARTIFACT_CACHE_CONFIG_KEY)
+    if not value:
+        return None
+    return Path(os.path.expanduser(str(value)))
+
+
+def max_cache_bytes() -> int:
+    """Returns the configured size limit of the artifact cache in bytes."""
+    try:
+        megabytes = float(config.get(MAX_SIZE_CONFIG_KEY, DEFAULT_MAX_SIZE_MB))
+    except (TypeError, ValueError):
+        megabytes = DEFAULT_MAX_SIZE_MB
+    return int(megabytes * 1024 * 1024)
+
+
+def apt_archive_names(packages: Sequence[str]) -> List[str]:
+    """
+    Returns the .deb file names apt would download to install `packages`,
+    dependencies included. Needs no root and no lock.
+    """
+    if not packages:
+        return []
+    try:
+        result = aio.run_process_sync(
+            ['apt-get', 'install', '--print-uris', '-qq', '-y', *packages]
+        )
+    except OSError:
+        return []
+    if result.returncode != 0:
+        return []
+    names = []
+    for line in result.stdout.splitlines():
+        match = _PRINT_URIS_LINE.match(line)
+        if match:
+            names.append(match.group(1))
+    return names
+
+
+def seed_apt_command(
+    names: Sequence[str], root: Optional[Path] = None
+) -> Optional[str]:
+    """
+    Returns the command copying the cached .debs among `names` into apt's
+    archive directory, where apt uses them instead of downloading, or None
+    when none of them is cached. Hits are touched so eviction keeps them.
+    """
+    root = root or cache_dir()
+    if root is None:
+        return None
+    hits = []
+    for name in names:
+        cached = root / APT_SUBDIR / name
+        if (APT_ARCHIVES_DIR / name).exists() or not cached.is_file():
+            continue
+        try:
+            os.utime(cached)
+        except OSError:
+            pass
+        hits.append(str(cached))
+    if not hits:
+        return None
+    files = ' '.join(shlex.quote(path) for path in hits)
+    return (
+        'sudo cp --reflink=auto --preserve=timestamps '
+        f'-t {shlex.quote(str(APT_ARCHIVES_DIR))} {files}'
+    )
+
+
+def store_apt_archives(
+    names: Sequence[str], root: Optional[Path] = None
+) -> int:
+    """
+    Copies downloaded .debs from apt's archive directory into the cache
+    and returns how many were added. Each file appears atomically, so
+    machines sharing the cache never see partial copies.
+    """
+    root = root or cache_dir()
+    if root is None:
+        return 0
+    target_dir = root / APT_SUBDIR
+    added = 0
+    for name in names:
+        source = APT_ARCHIVES_DIR / name
+        target = target_dir / name
+        if target.exists() or not source.is_file():
+            continue
+        tmp_target = target.with_name(f'.{name}.{os.getpid()}.tmp')
+        try:
+            target_dir.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(source, tmp_target)
+            os.replace(tmp_target, target)
+            added += 1
+        except OSError:
+            try:
+                tmp_target.unlink()
+            except OSError:
+                pass
+    if added:
+        evict(root)
+    return added
+
+
+def flatpak_sideload_repo(root: Optional[Path] = None) -> Optional[Path]:
+    """Returns the cached flatpak repo to pass as --sideload-repo."""
+    root = root or cache_dir()
+    if root is None:
+        return None
+    repo = root / FLATPAK_SUBDIR / FLATPAK_REPO
+    return repo if repo.is_dir() else None
+
+
+def store_flatpak_command(
+    refs: Sequence[str], root: Optional[Path] = None
+) -> Optional[str]:
+    """
+    Returns the command exporting installed flatpak refs into the cache
+    with `flatpak create-usb`, or None when the cache is disabled.
+    """
+    root = root or cache_dir()
+    if root is None or not refs:
+        return None
+    target = root / FLATPAK_SUBDIR
+    target.mkdir(parents=True, exist_ok=True)
+    quoted_refs = ' '.join(shlex.quote(ref) for ref in refs)
+    return (
+        f'flatpak create-usb --allow-partial {shlex.quote(str(target))} '
+        f'{quoted_refs}'
+    )
+
+
+def _tree_size(path: Path) -> int:
+    total = 0
+    for directory, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(directory, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+def evict(root: Optional[Path] = None, max_bytes: Optional[int] = None):
+    """
+    Keeps the cache under `max_bytes`: the least recently used .debs go
+    first. OSTree objects cannot be dropped one by one, so the flatpak
+    repo is removed as a whole if that is still not enough; it is rebuilt
+    by the next import.
+    """
+    root = root or cache_dir()
+    if root is None:
+        return
+    limit = max_cache_bytes() if max_bytes is None else max_bytes
+
+    debs = []
+    for path in (root / APT_SUBDIR).glob('*.deb'):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        debs.append((stat.st_mtime, stat.st_size, path))
+    debs.sort()
+    flatpak_dir = root / FLATPAK_SUBDIR
+    flatpak_size = _tree_size(flatpak_dir) if flatpak_dir.exists() else 0
+    total = flatpak_size + sum(size for _mtime, size, _path in debs)
+
+    while debs and total > limit:
+        _mtime, size, path = debs.pop(0)
+        try:
+            path.unlink(missing_ok=True)
+        except OSError:
+            continue
+        total -= size
+    if total > limit and flatpak_size:
+        shutil.rmtree(flatpak_dir, ignore_errors=True)
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+DPKG_LOG_FILE = Path('/var/log/dpkg.log')
+
+
+@dataclass
+class PackageChanges:
+    installed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+
+class SetDiffTracker:
+    """
+    Detects changes by diffing the installed package names listed before
+    and after an operation.
+    """
+
+    def __init__(self, lister_func: Callable[[], Set[str]]):
+        self._lister = lister_func
+        self._before: Set[str] = set()
+
+    def begin(self) -> None:
+        self._before = self._lister()
+
+    def finish(self) -> PackageChanges:
+        after = self._lister()
+        return PackageChanges(
+            installed=sorted(after - self._before),
+            removed=sorted(self._before - after),
+        )
+
+
+class DpkgLogTracker:
+    """
+    Detects apt changes by reading only the lines dpkg appended to its log
+    during the operation, so the cost is proportional to what changed rather
+    than to the number of installed packages.
+
+    Falls back to a `SetDiffTracker` when the log cannot be read.
+    """
+
+    def __init__(
+        self,
+        fallback_lister: Callable[[], Set[str]],
+        log_path: Path = DPKG_LOG_FILE,
+    ):
+        self._log_path = Path(log_path)
+        self._fallback = SetDiffTracker(fallback_lister)
+        self._offset: Optional[int] = None
+        self._inode: Optional[int] = None
+
+    def begin(self) -> None:
+        try:
+            stat = os.stat(self._log_path)
+            with open(self._log_path, 'rb'):
+                pass
+        except OSError:
+            self._offset = None
+            self._fallback.begin()
+            return
+        self._offset = stat.st_size
+        self._inode = stat.st_ino
+
+    def finish(self) -> PackageChanges:
+        if self._offset is None:
+            return self._fallback.finish()
+        return parse_dpkg_log(self._read_appended())
+
+    def _read_appended(self) -> str:
+        chunks = []
+        try:
+            stat = os.stat(self._log_path)
+        except OSError:
+            stat = None
+
+        if stat is not None and stat.st_ino == self._inode:
+            # Same file; it may have been truncated in place by logrotate.
+            offset = self._offset if stat.st_size >= self._offset else 0
+            chunks.append(_read_from(self._log_path, offset))
+        else:
+            # Rotated during the operation: finish the old file, then read
+            # the new one from the start.
+            rotated = self._log_path.with_name(self._log_path.name + '.1')
+            try:
+                if os.stat(rotated).st_ino == self._inode:
+                    chunks.append(_read_from(rotated, self._offset))
+            except OSError:
+                pass
+            if stat is not None:
+                chunks.append(_read_from(self._log_path, 0))
+        return ''.join(chunks)
+
+
+def _read_from(path: Path, offset: int) -> str:
+    try:
+        with open(path, 'rb') as handle:
+            handle.seek(offset)
+            return handle.read().decode('utf-8', errors='replace')
+    except OSError:
+        return ''
+
+
+def _strip_arch(package: str) -> str:
+    return package.split(':', 1)[0]
+
+
+def parse_dpkg_log(text: str) -> PackageChanges:
+    """
+    Turns dpkg.log lines into installed/removed package names.
+
+    dpkg logs `install` when a package was not installed before, with the
+    version its leftover configuration files belong to as the previous
+    version, and `upgrade` when it already was. A package counts as
+    installed when dpkg installed it and it ended up in the `installed`
+    state, and as removed when it was removed or purged and ended up in
+    `config-files` or `not-installed`.
+    """
+    actions: Dict[str, str] = {}
+    final_state: Dict[str, str] = {}
+
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) < 5:
+            continue
+        kind = parts[2]
+        if kind == 'status':
+            final_state[_strip_arch(parts[4])] = parts[3]
+        elif kind == 'install':
+            actions[_strip_arch(parts[3])] = 'install'
+        elif kind in ('remove', 'purge'):
+            actions[_strip_arch(parts[3])] = 'remove'
+
+    changes = PackageChanges()
+    for package, action in actions.items():
+        state = final_state.get(package)
+        if action == 'install' and state == 'installed':
+            changes.installed.append(package)
+        elif action == 'remove' and state in ('config-files', 'not-installed'):
+            changes.removed.append(package)
+
+    changes.installed.sort()
+    changes.removed.sort()
+    return changes
+
+
+def tracker_for_manager(
+    manager: str, lister_func: Callable[[], Set[str]]
+) -> SetDiffTracker | DpkgLogTracker:
+    """Returns the cheapest change tracker available for a manager."""
+    if manager == 'apt':
+        return DpkgLogTracker(lister_func)
+    return SetDiffTracker(lister_func)
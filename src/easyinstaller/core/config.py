@@ -1,6 +1,9 @@
 import json
 import os
+import threading
 from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Iterator, Mapping, Optional
 
 from easyinstaller.i18n.i18n import _
 
@@ -14,6 +17,13 @@ EXPORT_DIR = DATA_DIR / 'exports'
 LOG_DIR = DATA_DIR / 'logs'
 HIST_FILE = DATA_DIR / 'history.jsonl'
 
+# Disposable data (installed-package snapshots, search caches) lives in the
+# XDG cache directory so it can be wiped without losing user state.
+CACHE_DIR = Path.home() / '.cache' / 'easyinstaller'
+
+_loaded: Optional[Mapping[str, Any]] = None
+_load_lock = threading.Lock()
+
 
 def default_paths() -> dict:
     """
@@ -27,110 +37,120 @@ def default_paths() -> dict:
     }
 
 
-def _ensure_dirs(cfg: dict) -> None:
+def _migrate(cfg: dict) -> dict:
     """
-    Ensures that the necessary directories exist.
+    Renames old keys, fills in missing defaults and keeps the old keys as
+    aliases, so code that still reads them keeps working.
     """
-    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    for path in [EXPORT_DIR, LOG_DIR]:
-        path.mkdir(parents=True, exist_ok=True)
+    if 'log_dir' in cfg and 'log_path' not in cfg:
+        cfg['log_path'] = cfg.pop('log_dir')
+    if 'export_dir' in cfg and 'export_path' not in cfg:
+        cfg['export_path'] = cfg.pop('export_dir')
 
-    Path(cfg['history_file']).parent.mkdir(parents=True, exist_ok=True)
+    for key, value in default_paths().items():
+        cfg.setdefault(key, value)
 
+    cfg['log_dir'] = cfg['log_path']
+    cfg['export_dir'] = cfg['export_path']
+    return cfg
 
-def create_default_config() -> dict:
-    """
-    Creates the default configuration directory and file.
-    """
-    cfg = default_paths()
-    _ensure_dirs(cfg)
 
+def _write_config(cfg: dict) -> None:
+    """Replaces the config file atomically, creating its directory."""
+    tmp_file = CONFIG_FILE.with_name(f'{CONFIG_FILE.name}.{os.getpid()}.tmp')
+    CONFIG_DIR.mkdir(parents=True, exist_ok=True)
     try:
-        with open(CONFIG_FILE, 'w') as f:
+        with open(tmp_file, 'w', encoding='utf-8') as f:
             json.dump(cfg, f, indent=2)
-    except IOError as e:
-        # If we can't write to the config file, return defaults in memory
-        print(_(f'Warning: could not write config file: {e}'))
-
-    return cfg
+        os.replace(tmp_file, CONFIG_FILE)
+    except OSError:
+        try:
+            tmp_file.unlink()
+        except OSError:
+            pass
+        raise
 
 
-def get_config() -> dict:
+def _read_config() -> dict:
     """
-    Loads the configuration from the JSON file.
-    If the file or directory doesn't exist, it creates them with default values.
-    It also handles migration of old keys for backward compatibility.
+    Reads the config file and migrates it. The file is only written when
+    it is missing, unreadable or migration changed it.
     """
-    if not CONFIG_FILE.exists():
-        cfg = create_default_config()
-    else:
-        try:
-            with open(CONFIG_FILE, 'r') as f:
-                cfg = json.load(f)
-        except (json.JSONDecodeError, IOError):
-            cfg = create_default_config()
+    stored = None
+    try:
+        with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        pass
 
-    needs_write = False
+    cfg = _migrate(dict(stored) if isinstance(stored, dict) else {})
+    if cfg != stored:
+        try:
+            _write_config(cfg)
+        except OSError as e:
+            # If we can't write to the config file, use it in memory
+            print(_(f'Warning: could not write config file: {e}'))
+    return cfg
 
-    # Migrate old keys for backward compatibility
-    if 'log_dir' in cfg and 'log_path' not in cfg:
-        cfg['log_path'] = cfg['log_dir']
-        del cfg['log_dir']
-        needs_write = True
 
-    if 'export_dir' in cfg and 'export_path' not in cfg:
-        cfg['export_path'] = cfg['export_dir']
-        del cfg['export_dir']
-        needs_write = True
+def load_config() -> Mapping[str, Any]:
+    """
+    Returns the configuration as a read-only mapping. The file is read and
+    migrated once per process, on first use.
+    """
+    global _loaded
+    if _loaded is None:
+        with _load_lock:
+            if _loaded is None:
+                _loaded = MappingProxyType(_read_config())
+    return _loaded
 
-    # Ensure all default paths are present
-    for key, value in default_paths().items():
-        if key not in cfg:
-            cfg[key] = value
-            needs_write = True
-
-    # For full backward compatibility, ensure the old keys exist as aliases
-    # This prevents KeyErrors in code that hasn't been updated yet.
-    if cfg.get('log_dir') != cfg['log_path']:
-        cfg['log_dir'] = cfg['log_path']
-        needs_write = True
-    if cfg.get('export_dir') != cfg['export_path']:
-        cfg['export_dir'] = cfg['export_path']
-        needs_write = True
-
-    _ensure_dirs(cfg)
-
-    if needs_write:
-        try:
-            with open(CONFIG_FILE, 'w') as f:
-                json.dump(cfg, f, indent=2)
-        except IOError as e:
-            print(_(f'Warning: could not write config file: {e}'))
 
-    return cfg
+def get_config() -> dict:
+    """
+    Returns a copy of the configuration, loading it on first use.
+    If the file doesn't exist it is created with default values, and old
+    keys are migrated for backward compatibility.
+    """
+    return dict(load_config())
 
 
 def set_config_value(key: str, value: str):
     """
     Updates a specific configuration key with a new value and saves it.
     """
+    global _loaded
     cfg = get_config()
+    if cfg.get(key) == value:
+        return
     cfg[key] = value
+    cfg = _migrate(cfg)
     try:
-        _ensure_dirs(cfg)
-    except IOError as e:
+        _write_config(cfg)
+    except OSError as e:
         print(_(f'Error saving configuration: {e}'))
-        pass
+        return
+    with _load_lock:
+        _loaded = MappingProxyType(cfg)
 
-    try:
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(cfg, f, indent=2)
-        global config
-        config = cfg
-    except IOError as e:
-        print(_(f'Error saving configuration: {e}'))
+
+class _LazyConfig(Mapping):
+    """
+    Read-only view of the configuration that loads it on first access, so
+    importing this module does no I/O.
+    """
+
+    def __getitem__(self, key: str) -> Any:
+        return load_config()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(load_config())
+
+    def __len__(self) -> int:
+        return len(load_config())
+
+    def __repr__(self) -> str:
+        return repr(dict(load_config()))
 
 
-# Load config once at import time
-config = get_config()
+config: Mapping[str, Any] = _LazyConfig()
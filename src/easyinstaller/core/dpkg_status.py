@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import lzma
+import re
+from pathlib import Path
+from typing import (
+    IO,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+DPKG_STATUS_FILE = Path('/var/lib/dpkg/status')
+APT_EXTENDED_STATES_FILE = Path('/var/lib/apt/extended_states')
+
+# Only these fields are kept from each stanza; descriptions, conffiles and
+# dependency lists make up most of the file and are skipped while reading.
+STATUS_FIELDS = frozenset(
+    {
+        'Package',
+        'Status',
+        'Version',
+        'Installed-Size',
+        'Section',
+        'Priority',
+    }
+)
+
+# dpkg package states in which files of the package are on disk. apt-mark
+# only reports packages in one of these states.
+INSTALLED_STATES = frozenset(
+    {
+        'installed',
+        'half-installed',
+        'unpacked',
+        'half-configured',
+        'triggers-awaited',
+        'triggers-pending',
+    }
+)
+
+
+# Characters read per step; stanzas are parsed a chunk at a time.
+STANZA_CHUNK = 1024 * 1024
+
+# Compressions apt may keep its list files in (Acquire::GzipIndexes).
+COMPRESSED_OPENERS = {'.gz': gzip.open, '.xz': lzma.open, '.bz2': bz2.open}
+
+
+def open_text(path: Path) -> IO[str]:
+    """Opens a plain or compressed database file as text."""
+    opener = COMPRESSED_OPENERS.get(Path(path).suffix, open)
+    return opener(path, 'rt', encoding='utf-8', errors='replace')
+
+
+# Any `Key:` line; continuation lines start with whitespace and never match.
+_FIELD_LINE = re.compile(r'\n([^\s:][^:\n]*):([^\n]*)')
+
+
+def _parse_stanza(
+    block: str, needles: Optional[Sequence[Tuple[str, str, int]]]
+) -> Dict[str, str]:
+    """
+    Picks the wanted fields out of one stanza. Each field is looked up
+    with str.find, so descriptions and other unwanted lines are skipped
+    in C without being split or looked at by Python.
+    """
+    # Framed by newlines, every field line starts and ends with one.
+    block = f'\n{block}\n'
+    if needles is None:
+        return {
+            key: value.strip() for key, value in _FIELD_LINE.findall(block)
+        }
+    find = block.find
+    stanza = {}
+    for key, needle, length in needles:
+        start = find(needle)
+        if start >= 0:
+            start += length
+            stanza[key] = block[start : find('\n', start)].strip()
+    return stanza
+
+
+def iter_stanzas(
+    path: Path, fields: Optional[Iterable[str]] = None
+) -> Iterator[Dict[str, str]]:
+    """
+    Streams the RFC 822 style stanzas of a dpkg/apt database file.
+    Only fields listed in `fields` are kept; continuation lines are skipped.
+    Compressed files are read transparently.
+    Raises OSError if the file cannot be read.
+
+    The file is read in large chunks and cut into stanzas at the blank
+    lines between them, so no stanza is split into lines.
+    """
+    needles = (
+        [(key, f'\n{key}:', len(key) + 2) for key in fields]
+        if fields is not None
+        else None
+    )
+    pending = ''
+    with open_text(path) as handle:
+        while True:
+            chunk = handle.read(STANZA_CHUNK)
+            if chunk:
+                pending += chunk
+                end = pending.rfind('\n\n')
+                if end < 0:
+                    continue
+                blocks, pending = pending[:end], pending[end + 2 :]
+            else:
+                blocks, pending = pending, ''
+            for block in blocks.split('\n\n'):
+                stanza = _parse_stanza(block, needles)
+                if stanza:
+                    yield stanza
+            if not chunk:
+                break
+
+
+def package_state(stanza: Dict[str, str]) -> str:
+    """Returns the dpkg state (third word of the Status field)."""
+    parts = stanza.get('Status', '').split()
+    return parts[2] if len(parts) == 3 else ''
+
+
+def iter_known_packages(
+    path: Path = DPKG_STATUS_FILE,
+) -> Iterator[Dict[str, str]]:
+    """
+    Yields the stanzas `dpkg-query -W` would report: every package in the
+    database except the ones in the not-installed (purged) state.
+    """
+    for stanza in iter_stanzas(path, STATUS_FIELDS):
+        if 'Package' not in stanza:
+            continue
+        if package_state(stanza) in ('', 'not-installed'):
+            continue
+        yield stanza
+
+
+def read_installed_packages(path: Path = DPKG_STATUS_FILE) -> Set[str]:
+    """
+    Returns the packages whose files are on disk. Removed packages that
+    only left their configuration files behind are not included.
+    """
+    return {
+        stanza['Package']
+        for stanza in iter_known_packages(path)
+        if package_state(stanza) in INSTALLED_STATES
+    }
+
+
+def read_auto_installed(path: Path = APT_EXTENDED_STATES_FILE) -> Set[str]:
+    """Returns the names apt has marked as automatically installed."""
+    try:
+        return {
+            stanza['Package']
+            for stanza in iter_stanzas(path, ('Package', 'Auto-Installed'))
+            if stanza.get('Auto-Installed') == '1' and 'Package' in stanza
+        }
+    except FileNotFoundError:
+        # apt only creates the file once something was auto-installed.
+        return set()
+
+
+def read_manual_packages(
+    status_path: Path = DPKG_STATUS_FILE,
+    extended_states_path: Path = APT_EXTENDED_STATES_FILE,
+) -> Set[str]:
+    """Native equivalent of `apt-mark showmanual`."""
+    auto = read_auto_installed(extended_states_path)
+    return read_installed_packages(status_path) - auto
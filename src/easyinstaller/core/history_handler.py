@@ -1,9 +1,25 @@
 import json
 import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional, Sequence
+
+try:
+    import fcntl
+
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
 
 from easyinstaller.core.config import config
 from easyinstaller.i18n.i18n import _
 
+# Bytes read per step when reading the history backwards.
+REVERSE_BLOCK_SIZE = 64 * 1024
+# Seconds between checks for new lines while following the history.
+FOLLOW_INTERVAL = 0.5
+
 
 def get_history_file_path() -> str:
     """Ensures the history directory exists and returns the full path to the history file."""
@@ -12,12 +28,203 @@ def get_history_file_path() -> str:
     return os.path.join(history_dir, 'history.jsonl')
 
 
+# Records logged inside history_batch(), written together when it ends.
+_batch: Optional[List[dict]] = None
+_batch_depth = 0
+_batch_lock = threading.Lock()
+
+
+def append_records(
+    records: Sequence[dict], history_file: Optional[str] = None
+) -> None:
+    """
+    Appends records to the history file with a single write() under an
+    exclusive advisory lock, so concurrent ei processes never interleave
+    their lines. If an earlier writer died mid-line, the records start on
+    a new line and only the torn one is lost. Raises OSError.
+    """
+    if not records:
+        return
+    path = history_file or config['history_file']
+    payload = b''.join(
+        json.dumps(record).encode('utf-8') + b'\n' for record in records
+    )
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        if HAS_FCNTL:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        size = os.fstat(fd).st_size
+        if size and os.pread(fd, 1, size - 1) != b'\n':
+            payload = b'\n' + payload
+        written = 0
+        while written < len(payload):
+            written += os.write(fd, payload[written:])
+        os.fsync(fd)
+    finally:
+        # Closing the descriptor releases the lock.
+        os.close(fd)
+
+
+@contextmanager
+def history_batch() -> Iterator[None]:
+    """
+    Groups the operations logged inside the block, from any thread, into
+    one locked write and fsync when the outermost block exits, even if it
+    exits with an error.
+    """
+    global _batch, _batch_depth
+    with _batch_lock:
+        if _batch_depth == 0:
+            _batch = []
+        _batch_depth += 1
+    try:
+        yield
+    finally:
+        with _batch_lock:
+            _batch_depth -= 1
+            records = _batch if _batch_depth == 0 else None
+            if records is not None:
+                _batch = None
+        if records:
+            _write_or_report(records)
+
+
+def _write_or_report(records: Sequence[dict]) -> None:
+    try:
+        append_records(records)
+    except OSError as e:
+        print(_('Error writing to history file: {error}').format(error=e))
+
+
 def log_operation(operation_data: dict):
     """Appends a new operation record to the history file."""
-    history_file = config['history_file']
+    with _batch_lock:
+        if _batch is not None:
+            _batch.append(operation_data)
+            return
+    _write_or_report([operation_data])
+
+
+def _decode(
+    line: bytes, on_corrupt: Optional[Callable[[bytes], None]] = None
+) -> Optional[dict]:
     try:
-        with open(history_file, 'a') as f:
-            f.write(json.dumps(operation_data) + '\n')
-    except IOError as e:
-        # In a real CLI, you might want to handle this more gracefully
-        print(_('Error writing to history file: {error}').format(error=e))
+        record = json.loads(line)
+    except ValueError:
+        record = None
+    if not isinstance(record, dict):
+        if on_corrupt:
+            on_corrupt(line)
+        return None
+    return record
+
+
+def iter_history(
+    history_file: Optional[str] = None,
+    on_corrupt: Optional[Callable[[bytes], None]] = None,
+) -> Iterator[dict]:
+    """
+    Yields history records oldest first. Torn or otherwise unreadable
+    lines are skipped and passed to `on_corrupt`.
+    """
+    path = history_file or config['history_file']
+    try:
+        with open(path, 'rb') as handle:
+            for line in handle:
+                if line.strip():
+                    record = _decode(line, on_corrupt)
+                    if record is not None:
+                        yield record
+    except FileNotFoundError:
+        return
+
+
+def iter_lines_reverse(
+    path: str, block_size: int = REVERSE_BLOCK_SIZE
+) -> Iterator[bytes]:
+    """
+    Yields the non-empty lines of a file last to first, reading fixed-size
+    blocks from the end, so the cost depends on how many lines are
+    consumed rather than on the size of the file.
+    """
+    with open(path, 'rb') as handle:
+        position = handle.seek(0, os.SEEK_END)
+        head = b''
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            handle.seek(position)
+            lines = (handle.read(step) + head).split(b'\n')
+            # The first piece may continue in the previous block.
+            head = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line
+        if head.strip():
+            yield head
+
+
+def iter_history_reverse(
+    history_file: Optional[str] = None,
+    on_corrupt: Optional[Callable[[bytes], None]] = None,
+) -> Iterator[dict]:
+    """
+    Yields history records newest first. Unreadable lines are skipped and
+    passed to `on_corrupt`.
+    """
+    path = history_file or config['history_file']
+    try:
+        for line in iter_lines_reverse(path):
+            record = _decode(line, on_corrupt)
+            if record is not None:
+                yield record
+    except FileNotFoundError:
+        return
+
+
+def follow_history(
+    history_file: Optional[str] = None,
+    offset: Optional[int] = None,
+    interval: float = FOLLOW_INTERVAL,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Iterator[dict]:
+    """
+    Yields records appended to the history from `offset` (the current end
+    by default) on, waiting for new ones indefinitely. Lines still being
+    written are only yielded once complete; a truncated or replaced file
+    is followed from its start.
+    """
+    path = history_file or config['history_file']
+    position = offset
+    if position is None:
+        try:
+            position = os.path.getsize(path)
+        except OSError:
+            position = 0
+    pending = b''
+    identity = None
+    while True:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            stat = None
+        if stat is not None:
+            replaced = identity and (stat.st_dev, stat.st_ino) != identity
+            if replaced or stat.st_size < position:
+                position, pending = 0, b''
+            identity = (stat.st_dev, stat.st_ino)
+
+        if stat is not None and stat.st_size > position:
+            with open(path, 'rb') as handle:
+                handle.seek(position)
+                data = handle.read()
+            position += len(data)
+            lines = (pending + data).split(b'\n')
+            pending = lines.pop()
+            for line in lines:
+                record = _decode(line)
+                if record is not None:
+                    yield record
+            continue
+        sleep(interval)
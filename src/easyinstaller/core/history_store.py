@@ -0,0 +1,365 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from easyinstaller.core.config import CACHE_DIR, config
+
+# Indexed copy of history.jsonl. The JSONL file stays the append-only
+# record; this index is rebuilt from it whenever it is missing or stale.
+HISTORY_INDEX_FILE = CACHE_DIR / 'history.sqlite3'
+SCHEMA_VERSION = 1
+
+# Bytes of history read per step while indexing new lines.
+SYNC_CHUNK = 4 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS operations (
+    id INTEGER PRIMARY KEY,
+    offset INTEGER NOT NULL UNIQUE,
+    timestamp TEXT NOT NULL,
+    action TEXT NOT NULL,
+    manager TEXT NOT NULL,
+    package TEXT NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS operation_packages (
+    name TEXT NOT NULL,
+    operation_id INTEGER NOT NULL,
+    PRIMARY KEY (name, operation_id)
+) WITHOUT ROWID;
+"""
+
+# Secondary indices, created after a full rebuild has loaded its rows.
+_INDICES = """
+CREATE INDEX IF NOT EXISTS operations_by_time
+    ON operations (timestamp, id);
+CREATE INDEX IF NOT EXISTS operations_by_manager
+    ON operations (manager, timestamp);
+CREATE INDEX IF NOT EXISTS operations_by_action
+    ON operations (action, timestamp);
+"""
+_INDEX_NAMES = (
+    'operations_by_time',
+    'operations_by_manager',
+    'operations_by_action',
+)
+
+
+def record_packages(record: Dict) -> List[str]:
+    """Returns every package an operation mentions, for the package index."""
+    names = set()
+    if isinstance(record.get('package'), str):
+        names.add(record['package'])
+    for key in ('packages', 'installed_packages', 'removed_packages'):
+        values = record.get(key)
+        if isinstance(values, list):
+            names.update(v for v in values if isinstance(v, str))
+    return sorted(names)
+
+
+def record_label(record: Dict) -> str:
+    """Returns the package column shown for an operation."""
+    if isinstance(record.get('package'), str):
+        return record['package']
+    packages = record.get('packages')
+    if isinstance(packages, list):
+        return ', '.join(str(pkg) for pkg in packages)
+    return ''
+
+
+class HistoryStore:
+    """
+    SQLite index over the history file, kept in sync incrementally: it
+    remembers how many bytes of the file it has indexed and only reads the
+    lines appended since. Lookups by id, package, manager, action and date
+    use indices, and results come newest first, one page at a time.
+    """
+
+    def __init__(
+        self,
+        history_file: str | Path,
+        index_file: Optional[str | Path] = None,
+    ):
+        self.history_file = Path(history_file)
+        # Looked up at call time so the default location can be patched.
+        self.index_file = Path(index_file or HISTORY_INDEX_FILE)
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            str(self.index_file), timeout=10, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        # The index can always be rebuilt, so it need not survive a crash.
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != SCHEMA_VERSION:
+            self._conn.executescript(
+                'DROP TABLE IF EXISTS operation_packages;'
+                'DROP TABLE IF EXISTS operations;'
+                'DROP TABLE IF EXISTS meta;'
+            )
+            self._conn.executescript(_SCHEMA + _INDICES)
+            self._conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> 'HistoryStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _meta(self) -> Dict[str, str]:
+        return {
+            row['key']: row['value']
+            for row in self._conn.execute('SELECT key, value FROM meta')
+        }
+
+    def _reset(self) -> None:
+        self._conn.execute('DELETE FROM operation_packages')
+        self._conn.execute('DELETE FROM operations')
+        self._conn.execute('DELETE FROM meta')
+        # Loading everything first and indexing once is much faster.
+        for name in _INDEX_NAMES:
+            self._conn.execute(f'DROP INDEX IF EXISTS {name}')
+
+    def sync(self) -> int:
+        """
+        Indexes the lines appended to the history file since the last sync
+        and returns how many operations were added. The first sync migrates
+        the whole file. A replaced or truncated file is re-indexed from
+        scratch; an unterminated last line is left for a later sync.
+        """
+        try:
+            stat = os.stat(self.history_file)
+        except FileNotFoundError:
+            stat = None
+
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            added = self._sync_locked(stat)
+            self._conn.execute('COMMIT')
+        except BaseException:
+            self._conn.execute('ROLLBACK')
+            raise
+        return added
+
+    def _sync_locked(self, stat: Optional[os.stat_result]) -> int:
+        meta = self._meta()
+        identity = (
+            f'{self.history_file}:{stat.st_dev}:{stat.st_ino}' if stat else ''
+        )
+        offset = int(meta.get('offset', 0))
+        skipped = int(meta.get('skipped', 0))
+        if meta.get('source') != identity or (stat and offset > stat.st_size):
+            self._reset()
+            offset = skipped = 0
+        if stat is None or offset == stat.st_size:
+            self._set_meta(identity, offset, skipped)
+            return 0
+
+        next_id = (
+            self._conn.execute(
+                'SELECT COALESCE(MAX(id), 0) FROM operations'
+            ).fetchone()[0]
+            + 1
+        )
+        added = 0
+        with open(self.history_file, 'rb') as handle:
+            handle.seek(offset)
+            pending = b''
+            while True:
+                chunk = handle.read(SYNC_CHUNK)
+                if not chunk:
+                    break
+                pending += chunk
+                end = pending.rfind(b'\n') + 1
+                if not end:
+                    continue
+                corrupt = []
+                rows = list(
+                    _parse_lines(pending[:end], offset, corrupt.append)
+                )
+                skipped += len(corrupt)
+                self._insert(rows, next_id)
+                next_id += len(rows)
+                added += len(rows)
+                offset += end
+                pending = pending[end:]
+        # executescript() would commit, so run the statements one by one.
+        for statement in _INDICES.split(';'):
+            if statement.strip():
+                self._conn.execute(statement)
+        self._set_meta(identity, offset, skipped)
+        return added
+
+    def _set_meta(self, identity: str, offset: int, skipped: int) -> None:
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+            [
+                ('source', identity),
+                ('offset', str(offset)),
+                ('skipped', str(skipped)),
+            ],
+        )
+
+    @property
+    def skipped_lines(self) -> int:
+        """Number of unreadable (e.g. torn) lines left out of the index."""
+        return int(self._meta().get('skipped', 0))
+
+    def _insert(
+        self, rows: List[Tuple[int, str, Dict]], first_id: int
+    ) -> None:
+        operations = []
+        packages = []
+        for op_id, (line_offset, text, record) in enumerate(rows, first_id):
+            operations.append(
+                (
+                    op_id,
+                    line_offset,
+                    str(record.get('timestamp') or ''),
+                    str(record.get('action') or ''),
+                    str(record.get('manager') or ''),
+                    record_label(record),
+                    text,
+                )
+            )
+            packages.extend((name, op_id) for name in record_packages(record))
+        self._conn.executemany(
+            'INSERT INTO operations '
+            '(id, offset, timestamp, action, manager, package, record) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            operations,
+        )
+        self._conn.executemany(
+            'INSERT OR IGNORE INTO operation_packages (name, operation_id) '
+            'VALUES (?, ?)',
+            packages,
+        )
+
+    @staticmethod
+    def _where(
+        package: Optional[str],
+        manager: Optional[str],
+        action: Optional[str],
+        since: Optional[str],
+        until: Optional[str],
+    ) -> Tuple[str, List]:
+        clauses = []
+        params: List = []
+        if package:
+            # GLOB keeps exact names and prefixes (vim*) on the index.
+            clauses.append(
+                'id IN (SELECT operation_id FROM operation_packages '
+                'WHERE name GLOB ?)'
+            )
+            params.append(package)
+        if manager:
+            clauses.append('manager = ?')
+            params.append(manager)
+        if action:
+            clauses.append('action = ?')
+            params.append(action)
+        if since:
+            clauses.append('timestamp >= ?')
+            params.append(since)
+        if until:
+            clauses.append('timestamp < ?')
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return where, params
+
+    def query(
+        self,
+        package: Optional[str] = None,
+        manager: Optional[str] = None,
+        action: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Dict]:
+        """
+        Returns matching operations newest first, each with its 'id'.
+        `since` is inclusive and `until` exclusive; both are ISO timestamps
+        or prefixes of one (e.g. '2024-05-01').
+        """
+        where, params = self._where(package, manager, action, since, until)
+        rows = self._conn.execute(
+            f'SELECT id, record FROM operations {where} '
+            'ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?',
+            [*params, -1 if limit is None else limit, offset],
+        )
+        return [_with_id(row) for row in rows]
+
+    def count(
+        self,
+        package: Optional[str] = None,
+        manager: Optional[str] = None,
+        action: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> int:
+        where, params = self._where(package, manager, action, since, until)
+        return self._conn.execute(
+            f'SELECT COUNT(*) FROM operations {where}', params
+        ).fetchone()[0]
+
+    def get(self, op_id: int) -> Optional[Dict]:
+        row = self._conn.execute(
+            'SELECT id, record FROM operations WHERE id = ?', (op_id,)
+        ).fetchone()
+        return _with_id(row) if row else None
+
+
+def _with_id(row: sqlite3.Row) -> Dict:
+    record = json.loads(row['record'])
+    record['id'] = row['id']
+    return record
+
+
+def _parse_lines(
+    data: bytes,
+    offset: int,
+    on_corrupt: Optional[Callable[[bytes], None]] = None,
+) -> Iterable[Tuple[int, str, Dict]]:
+    """
+    Yields (offset, text, record) for every valid JSON object line; the
+    other non-empty lines are passed to `on_corrupt`.
+    """
+    position = offset
+    for line in data.splitlines(keepends=True):
+        line_offset = position
+        position += len(line)
+        if not line.strip():
+            continue
+        try:
+            text = line.decode('utf-8').strip()
+            record = json.loads(text)
+        except ValueError:
+            record = None
+        if isinstance(record, dict):
+            yield line_offset, text, record
+        elif on_corrupt:
+            on_corrupt(line)
+
+
+def open_history_store() -> HistoryStore:
+    """Opens the index of the configured history file, synced."""
+    store = HistoryStore(config['history_file'])
+    try:
+        store.sync()
+    except BaseException:
+        store.close()
+        raise
+    return store
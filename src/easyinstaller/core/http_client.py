@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Points every backend at a local stand-in server (e.g. for offline tests).
+BASE_URL_ENV = 'EI_HTTP_BASE_URL'
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+@dataclass(frozen=True)
+class Backend:
+    base_url: str
+    # (connect, read) timeout in seconds
+    timeout: Timeout
+
+
+BACKENDS: Dict[str, Backend] = {
+    'flathub': Backend('https://flathub.org', (3.05, 10)),
+    'snapcraft': Backend('https://api.snapcraft.io', (3.05, 10)),
+    'github': Backend('https://api.github.com', (3.05, 30)),
+}
+
+DOWNLOAD_TIMEOUT: Timeout = (3.05, 60)
+USER_AGENT = 'easyinstaller'
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=2,
+        connect=2,
+        read=1,
+        status=2,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({'GET', 'HEAD'}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=4, pool_maxsize=8, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+def get_session() -> requests.Session:
+    """Returns the process-wide pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def backend_url(backend: str, path: str) -> str:
+    """Builds the URL of `path` on a backend, honouring the stand-in URL."""
+    base_url = os.environ.get(BASE_URL_ENV) or BACKENDS[backend].base_url
+    return base_url.rstrip('/') + '/' + path.lstrip('/')
+
+
+def http_get(
+    backend: str,
+    path: str,
+    timeout: Optional[Timeout] = None,
+    **kwargs,
+) -> requests.Response:
+    """
+    Sends a GET request to a backend through the pooled session.
+    Raises requests.RequestException on network errors and timeouts.
+    """
+    return get_session().get(
+        backend_url(backend, path),
+        timeout=timeout if timeout is not None else BACKENDS[backend].timeout,
+        **kwargs,
+    )
+
+
+def open_download(
+    url: str, timeout: Timeout = DOWNLOAD_TIMEOUT
+) -> requests.Response:
+    """Starts a streamed download of an absolute URL."""
+    return get_session().get(url, stream=True, timeout=timeout)
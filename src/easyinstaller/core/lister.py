@@ -1,10 +1,28 @@
 import os
 import subprocess
-from concurrent.futures import ThreadPoolExecutor
+
+from easyinstaller.core import aio
+from easyinstaller.core.dpkg_status import (
+    APT_EXTENDED_STATES_FILE,
+    DPKG_STATUS_FILE,
+    INSTALLED_STATES,
+    iter_known_packages,
+    read_installed_packages,
+    read_manual_packages,
+)
+from easyinstaller.core.snapshot import (
+    cached_packages,
+    load_snapshot,
+    save_snapshot,
+    state_fingerprint,
+)
 
 
 def list_snap_packages():
-    """Lists installed Snap packages."""
+    """
+    Lists installed Snap packages. Returns None when `snap list` fails,
+    e.g. while snapd is down, so the failure is not cached as no packages.
+    """
     try:
         env = dict(os.environ, LC_ALL='C')
         result = subprocess.run(
@@ -28,12 +46,18 @@ def list_snap_packages():
                     }
                 )
         return packages
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    except FileNotFoundError:
+        # The manager is not installed: nothing is installed with it.
         return []
+    except subprocess.CalledProcessError:
+        return None
 
 
 def list_flatpak_packages():
-    """Lists installed Flatpak packages."""
+    """
+    Lists installed Flatpak packages. Returns None when `flatpak list`
+    fails, so the failure is not cached as no packages.
+    """
     try:
         env = dict(os.environ, LC_ALL='C')
         result = subprocess.run(
@@ -63,17 +87,75 @@ def list_flatpak_packages():
                     }
                 )
         return packages
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    except FileNotFoundError:
+        # The manager is not installed: nothing is installed with it.
         return []
+    except subprocess.CalledProcessError:
+        return None
+
+
+def _apt_entry(
+    name: str,
+    version: str,
+    installed_size: str,
+    section: str = '',
+    priority: str = '',
+) -> dict | None:
+    """Builds a lister entry for an apt package, or None without a size."""
+    try:
+        size_kb = int(installed_size)
+    except ValueError:
+        return None
+
+    size_mb = size_kb / 1024
+    entry = {
+        'name': name,
+        'version': version,
+        'size': f'{size_mb:.2f} MB',
+        'source': 'apt',
+    }
+    if section:
+        entry['section'] = section
+    if priority:
+        entry['priority'] = priority
+    return entry
 
 
 def list_apt_packages():
-    """Lists installed APT packages."""
+    """
+    Lists installed APT packages by streaming the dpkg status database.
+    Falls back to dpkg-query when the database cannot be read.
+    """
+    try:
+        packages = []
+        for stanza in iter_known_packages(DPKG_STATUS_FILE):
+            entry = _apt_entry(
+                stanza['Package'],
+                stanza.get('Version', ''),
+                stanza.get('Installed-Size', ''),
+                stanza.get('Section', ''),
+                stanza.get('Priority', ''),
+            )
+            if entry:
+                packages.append(entry)
+        return packages
+    except OSError:
+        return _list_apt_packages_dpkg_query()
+
+
+def _list_apt_packages_dpkg_query(admindir: str | None = None):
+    """
+    Lists installed APT packages using dpkg-query. Returns None when it
+    fails, e.g. because the dpkg database is locked.
+    """
+    cmd = ['dpkg-query']
+    if admindir:
+        cmd.append(f'--admindir={admindir}')
     try:
         env = dict(os.environ, LC_ALL='C')
         result = subprocess.run(
             [
-                'dpkg-query',
+                *cmd,
                 '-W',
                 "-f='${Package}\t${Version}\t${Installed-Size}\t${Section}\t${Priority}\n'",
             ],
@@ -89,33 +171,22 @@ def list_apt_packages():
             if len(parts) < 3:
                 continue
 
-            try:
-                size_kb = int(parts[2])
-            except ValueError:
-                continue
-
-            size_mb = size_kb / 1024
-            size_str = f'{size_mb:.2f} MB'
-            entry = {
-                'name': parts[0],
-                'version': parts[1],
-                'size': size_str,
-                'source': 'apt',
-            }
-
-            if len(parts) > 3 and parts[3]:
-                entry['section'] = parts[3]
-            if len(parts) > 4 and parts[4]:
-                entry['priority'] = parts[4]
-
-            packages.append(entry)
+            entry = _apt_entry(*parts[:5])
+            if entry:
+                packages.append(entry)
         return packages
-    except (subprocess.CalledProcessError, FileNotFoundError, ValueError):
+    except FileNotFoundError:
         return []
+    except (subprocess.CalledProcessError, ValueError):
+        return None
 
 
-def unified_lister(managers: list[str] | None = None):
-    """Performs listing across specified managers in parallel, or all if none specified."""
+def unified_lister(managers: list[str] | None = None, use_cache: bool = True):
+    """
+    Performs listing across specified managers in parallel, or all if none specified.
+    Results are reused from the on-disk snapshot for every manager whose
+    backing state (dpkg status, flatpak installations, snapd state) is unchanged.
+    """
     if managers is None:
         managers = ['apt', 'flatpak', 'snap']
 
@@ -124,36 +195,75 @@ def unified_lister(managers: list[str] | None = None):
         'flatpak': list_flatpak_packages,
         'snap': list_snap_packages,
     }
+    requested = [manager for manager in managers if manager in source_map]
 
-    with ThreadPoolExecutor() as executor:
-        futures = {
-            executor.submit(source_map[manager])
-            for manager in managers
-            if manager in source_map
-        }
+    snapshot = load_snapshot() if use_cache else {}
+    results: dict[str, list] = {}
+    stale: dict[str, list | None] = {}
+    for manager in requested:
+        fingerprint = state_fingerprint(manager)
+        cached = cached_packages(snapshot, manager, fingerprint)
+        if cached is not None:
+            results[manager] = cached
+        else:
+            stale[manager] = fingerprint
+
+    if stale:
+        scanned = aio.run(
+            aio.gather_calls(
+                {manager: source_map[manager] for manager in stale}
+            )
+        )
+        for manager, packages in scanned.items():
+            if packages is None or isinstance(packages, Exception):
+                # A failed scan is shown as empty but never cached, so the
+                # next call scans again instead of trusting it.
+                continue
+            if isinstance(packages, BaseException):
+                raise packages
+            results[manager] = packages
+            fingerprint = stale[manager]
+            if fingerprint is not None:
+                snapshot[manager] = {
+                    'fingerprint': fingerprint,
+                    'packages': packages,
+                }
 
-        all_results = []
-        for future in futures:
-            try:
-                all_results.extend(future.result())
-            except Exception:
-                pass
+        if use_cache:
+            save_snapshot(snapshot)
 
+    all_results = []
+    for manager in requested:
+        all_results.extend(results.get(manager, []))
     return all_results
 
 
 def get_installed_apt_packages_set() -> set:
-    """Returns a set of installed apt package names."""
+    """
+    Returns a set of installed apt package names. Packages removed down
+    to their configuration files are not installed.
+    """
+    try:
+        return read_installed_packages(DPKG_STATUS_FILE)
+    except OSError:
+        pass
+
     try:
         env = dict(os.environ, LC_ALL='C')
         result = subprocess.run(
-            ['dpkg-query', '-W', "-f='${Package}\n'"],
+            ['dpkg-query', '-W', '-f=${db:Status-Status} ${Package}\n'],
             capture_output=True,
             text=True,
             check=True,
             env=env,
         )
-        return set(result.stdout.replace("'", '').strip().split('\n'))
+        return {
+            name
+            for state, _, name in (
+                line.partition(' ') for line in result.stdout.splitlines()
+            )
+            if state in INSTALLED_STATES
+        }
     except (subprocess.CalledProcessError, FileNotFoundError):
         return set()
 
@@ -193,6 +303,11 @@ def get_installed_snap_packages_set() -> set:
 
 def get_manual_apt_packages_set() -> set:
     """Returns a set of manually installed apt packages."""
+    try:
+        return read_manual_packages(DPKG_STATUS_FILE, APT_EXTENDED_STATES_FILE)
+    except OSError:
+        pass
+
     try:
         env = dict(os.environ, LC_ALL='C')
         result = subprocess.run(
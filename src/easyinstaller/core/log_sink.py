@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import gzip
+import os
+import shutil
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+# Buffered output is written once this much is pending, or when the oldest
+# pending chunk is this many seconds old.
+FLUSH_BYTES = 64 * 1024
+FLUSH_INTERVAL = 1.0
+
+# Per-operation logs live in this subdirectory of the log directory.
+OPERATIONS_DIRNAME = 'operations'
+
+# Retention of operation logs: the oldest go first once any limit is hit.
+MAX_LOG_FILES = 200
+MAX_LOG_BYTES = 100 * 1024 * 1024
+MAX_LOG_AGE_DAYS = 30
+# Logs untouched for this long are finished and get gzip-compressed.
+COMPRESS_AFTER = 10 * 60
+
+
+class LogSink:
+    """
+    Append-only log writer that batches chunks in memory and writes them
+    with a single syscall once FLUSH_BYTES are pending or FLUSH_INTERVAL
+    has passed, instead of writing and flushing every chunk.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        flush_bytes: int = FLUSH_BYTES,
+        flush_interval: float = FLUSH_INTERVAL,
+    ):
+        self.path = Path(path)
+        self._flush_bytes = flush_bytes
+        self._flush_interval = flush_interval
+        self._pending: List[bytes] = []
+        self._pending_size = 0
+        self._first_pending_at = 0.0
+        self._handle = None
+
+    def write(self, text: str | bytes) -> None:
+        if not text:
+            return
+        data = (
+            text
+            if isinstance(text, bytes)
+            else text.encode('utf-8', errors='replace')
+        )
+        if not self._pending:
+            self._first_pending_at = time.monotonic()
+        self._pending.append(data)
+        self._pending_size += len(data)
+        if (
+            self._pending_size >= self._flush_bytes
+            or time.monotonic() - self._first_pending_at
+            >= self._flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        if self._handle is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = open(self.path, 'ab', buffering=0)
+        self._handle.write(b''.join(self._pending))
+        self._pending = []
+        self._pending_size = 0
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+    def __enter__(self) -> 'LogSink':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _compress(path: Path) -> None:
+    target = path.with_name(path.name + '.gz')
+    # Other processes and threads may rotate the same directory at once.
+    tmp_target = target.with_name(
+        f'{target.name}.{os.getpid()}.{threading.get_ident()}.tmp'
+    )
+    try:
+        with open(path, 'rb') as source, gzip.open(tmp_target, 'wb') as dest:
+            shutil.copyfileobj(source, dest)
+        if not path.exists():
+            # Compressed or dropped by a concurrent rotation meanwhile.
+            raise FileNotFoundError(path)
+        os.replace(tmp_target, target)
+        path.unlink(missing_ok=True)
+    except OSError:
+        try:
+            tmp_target.unlink()
+        except OSError:
+            pass
+
+
+def rotate_logs(
+    directory: str | Path,
+    compress: bool = True,
+    max_files: int = MAX_LOG_FILES,
+    max_bytes: int = MAX_LOG_BYTES,
+    max_age_days: float = MAX_LOG_AGE_DAYS,
+) -> None:
+    """
+    Applies the retention policy to a directory of operation logs: drops
+    logs older than `max_age_days`, compresses finished ones, then drops
+    the oldest until at most `max_files` files and `max_bytes` remain.
+    Failures are not fatal.
+    """
+    directory = Path(directory)
+    now = time.time()
+    logs = []
+    try:
+        # Names start with a timestamp, so they sort oldest first.
+        candidates = sorted(directory.iterdir())
+    except OSError:
+        return
+
+    for path in candidates:
+        if not (path.name.endswith('.log') or path.name.endswith('.log.gz')):
+            continue
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        age = now - stat.st_mtime
+        if age > max_age_days * 86400:
+            path.unlink(missing_ok=True)
+            continue
+        if compress and path.suffix == '.log' and age > COMPRESS_AFTER:
+            _compress(path)
+            path = path.with_name(path.name + '.gz')
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+        logs.append((path, stat.st_size))
+
+    total = sum(size for _path, size in logs)
+    while logs and (len(logs) > max_files or total > max_bytes):
+        path, size = logs.pop(0)
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def new_operation_log(
+    log_dir: str | Path, action: str, manager: str, compress: bool = True
+) -> Path:
+    """
+    Returns a fresh log path for one install/remove operation, applying
+    the retention policy to the older ones first.
+    """
+    directory = Path(log_dir) / OPERATIONS_DIRNAME
+    directory.mkdir(parents=True, exist_ok=True)
+    rotate_logs(directory, compress=compress)
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    return directory / f'{stamp}-{action}-{manager}-{os.getpid()}.log'
+
+
+def resolve_operation_log(path: str | Path) -> Optional[Path]:
+    """Finds an operation log referenced from history, even if compressed."""
+    path = Path(path)
+    for candidate in (path, path.with_name(path.name + '.gz')):
+        if candidate.exists():
+            return candidate
+    return None
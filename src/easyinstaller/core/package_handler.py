@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import re
 import shlex
 import shutil
 import subprocess
@@ -9,15 +10,18 @@ from typing import Sequence
 
 from rich.console import Console
 
+from easyinstaller.core import artifact_cache
+from easyinstaller.core.change_tracker import tracker_for_manager
 from easyinstaller.core.config import config, default_paths
 from easyinstaller.core.distro_detector import get_native_manager_type
 from easyinstaller.core.history_handler import log_operation
+from easyinstaller.core.log_sink import new_operation_log
 from easyinstaller.core.lister import (
     get_installed_apt_packages_set,
     get_installed_flatpak_packages_set,
     get_installed_snap_packages_set,
 )
-from easyinstaller.core.runner import run_cmd_smart
+from easyinstaller.core.runner import is_non_interactive, run_cmd_smart
 from easyinstaller.i18n.i18n import _
 
 console = Console()
@@ -28,18 +32,22 @@ MANAGER_CMDS = {
         'install': 'sudo -E apt-get install -y',
         'remove': 'sudo -E apt-get remove -y',
         'purge': 'sudo -E apt-get purge -y',
+        'prefetch': 'sudo -E apt-get install -y --download-only',
     },
     'pacman': {
         'install': 'sudo pacman -S --noconfirm',
         'remove': 'sudo pacman -Rns --noconfirm',
+        'prefetch': 'sudo pacman -Sw --noconfirm',
     },
     'dnf': {
         'install': 'sudo dnf install -y',
         'remove': 'sudo dnf remove -y',
+        'prefetch': 'sudo dnf install -y --downloadonly',
     },
     'flatpak': {
         'install': 'flatpak install -y flathub',
         'remove': 'flatpak uninstall -y',
+        'prefetch': 'flatpak install -y --no-deploy flathub',
     },
     'snap': {
         'install': 'sudo snap install',
@@ -47,6 +55,23 @@ MANAGER_CMDS = {
     },
 }
 
+# Output lines through which each manager names the requested packages it
+# could not install, used to recover per-package results from a batch.
+FAILED_PACKAGE_PATTERNS = {
+    'apt': (
+        re.compile(r'Unable to locate package (\S+)'),
+        re.compile(r"Package '?([^'\s]+)'? has no installation candidate"),
+    ),
+    'flatpak': (
+        re.compile(r'Nothing matches (\S+) in'),
+        re.compile(r'No remote refs found (?:similar to|for) .?([\w.-]+)'),
+    ),
+    'snap': (
+        re.compile(r'snap "([^"]+)" not found'),
+        re.compile(r'snap "([^"]+)" is not available'),
+    ),
+}
+
 MANAGER_TO_LISTER = {
     'apt': get_installed_apt_packages_set,
     'flatpak': get_installed_flatpak_packages_set,
@@ -54,9 +79,9 @@ MANAGER_TO_LISTER = {
 }
 
 
-def _get_log_file_path() -> str:
+def _get_log_file_path(action: str, manager: str) -> str:
     """
-    Returns the absolute path to the default log file, ensuring the directory exists.
+    Returns the absolute path to a new log file for one operation, ensuring the directory exists.
     Falls back to default paths if configuration keys are missing.
     """
     log_dir = (
@@ -68,8 +93,13 @@ def _get_log_file_path() -> str:
     if not log_dir:
         raise RuntimeError('Unable to determine log directory path.')
 
-    os.makedirs(log_dir, exist_ok=True)
-    return os.path.join(log_dir, 'ei.log')
+    compress = str(config.get('log_compress', True)).lower() not in (
+        '0',
+        'false',
+        'no',
+        'off',
+    )
+    return str(new_operation_log(log_dir, action, manager, compress))
 
 
 def prime_sudo_session() -> bool:
@@ -77,12 +107,21 @@ def prime_sudo_session() -> bool:
     Runs `sudo -v` to refresh the user's sudo timestamp.
     This should be called before a batch of operations requiring sudo.
     Returns True if successful or not needed, False on failure.
+
+    sudo runs on the controlling terminal itself rather than in a PTY of
+    its own: sudo caches credentials per terminal, and the unattended jobs
+    started afterwards run from this one. In non-interactive mode it only
+    checks for cached credentials instead of asking for a password.
     """
     if os.geteuid() == 0:
         return True
 
     console.print(_('[cyan]Refreshing sudo credentials...[/cyan]'))
-    returncode = run_cmd_smart('sudo -v')
+    args = ['sudo', '-n', '-v'] if is_non_interactive() else ['sudo', '-v']
+    try:
+        returncode = subprocess.run(args).returncode
+    except FileNotFoundError:
+        returncode = 127
     if returncode != 0:
         console.print(
             _(
@@ -159,8 +198,8 @@ def _ensure_manager_installed(manager_to_check: str):
     )
 
     cmd = _build_cmd(native_manager, 'install', package_to_install)
-    log_path = _get_log_file_path()
-    code = run_cmd_smart(cmd, log_path=log_path)
+    log_path = _get_log_file_path('install', native_manager)
+    code = run_cmd_smart(cmd, log_path=log_path, progress=native_manager)
 
     if code != 0:
         console.print(
@@ -177,7 +216,13 @@ def _ensure_manager_installed(manager_to_check: str):
     )
 
 
-def remove_with_manager(package_name: str, manager: str, purge: bool = False):
+def remove_with_manager(
+    package_name: str | Sequence[str], manager: str, purge: bool = False
+):
+    """
+    Removes one or more packages in a single transaction of the given
+    manager and records what disappeared in the history.
+    """
     lister_func = MANAGER_TO_LISTER.get(manager) or MANAGER_TO_LISTER.get(
         get_native_manager_type()
     )
@@ -189,17 +234,24 @@ def remove_with_manager(package_name: str, manager: str, purge: bool = False):
         )
         raise SystemExit(1)
 
-    cmd = _build_cmd(manager, 'remove', package_name, purge=purge)
-    log_path = _get_log_file_path()
+    if isinstance(package_name, str):
+        package_list = [package_name]
+    else:
+        package_list = [pkg for pkg in package_name if pkg]
+    package_label = ', '.join(package_list)
+
+    cmd = _build_cmd(manager, 'remove', package_list, purge=purge)
+    log_path = _get_log_file_path('remove', manager)
 
-    before_set = lister_func()
-    code = run_cmd_smart(cmd, log_path=log_path)
+    tracker = tracker_for_manager(manager, lister_func)
+    tracker.begin()
+    code = run_cmd_smart(cmd, log_path=log_path, progress=manager)
 
     if code != 0:
         console.print(
             _(
                 '[bold red]Error removing {package_name} (manager: {manager}, exit code: {code}).[/bold red]'
-            ).format(package_name=package_name, manager=manager, code=code)
+            ).format(package_name=package_label, manager=manager, code=code)
         )
         console.print(
             _('Check the log for details: {log_path}').format(
@@ -208,36 +260,166 @@ def remove_with_manager(package_name: str, manager: str, purge: bool = False):
         )
         raise SystemExit(code)
 
-    after_set = lister_func()
-    removed_packages = sorted(list(before_set - after_set))
+    removed_packages = tracker.finish().removed
 
     # If nothing was removed, it might be because the package didn't exist
     if not removed_packages:
         console.print(
             _(
                 '[bold yellow]Package {package_name} was not installed or no changes were detected.[/bold yellow]'
-            ).format(package_name=package_name)
+            ).format(package_name=package_label)
         )
         return
 
-    log_operation(
-        {
-            'action': 'remove',
-            'package': package_name,
-            'manager': manager,
-            'timestamp': datetime.now().isoformat(),
-            'removed_packages': removed_packages,
-        }
-    )
+    payload = {
+        'action': 'remove',
+        'manager': manager,
+        'timestamp': datetime.now().isoformat(),
+        'removed_packages': removed_packages,
+        'log_file': log_path,
+    }
+    if len(package_list) == 1:
+        payload['package'] = package_list[0]
+    else:
+        payload['packages'] = package_list
+
+    log_operation(payload)
 
     console.print(
         _(
             '[bold green]✔ Successfully removed {package_name}.[/bold green]'
-        ).format(package_name=package_name)
+        ).format(package_name=package_label)
+    )
+
+
+def _log_size(log_path: str) -> int:
+    try:
+        return os.path.getsize(log_path)
+    except OSError:
+        return 0
+
+
+def _read_log_since(log_path: str, offset: int) -> str:
+    """Returns what the last command appended to the log file."""
+    try:
+        with open(log_path, 'rb') as handle:
+            handle.seek(offset)
+            return handle.read().decode('utf-8', errors='replace')
+    except OSError:
+        return ''
+
+
+def failed_packages_from_output(
+    manager: str, output: str, requested: Sequence[str]
+) -> list[str]:
+    """
+    Attributes a failed transaction to the requested packages the manager
+    reported as unknown or uninstallable.
+    """
+    reported = set()
+    for pattern in FAILED_PACKAGE_PATTERNS.get(manager, ()):
+        reported.update(pattern.findall(output))
+    return [pkg for pkg in requested if pkg in reported]
+
+
+def prefetch_with_manager(
+    package_names: str | Sequence[str], manager: str
+) -> int:
+    """
+    Downloads packages into the manager's cache without installing them,
+    so installing them afterwards only does local work. Managers without a
+    download-only mode (snap) are skipped. Returns the exit code; nothing
+    is recorded in the history.
+
+    With an artifact cache configured, apt first gets the .debs the cache
+    already has and adds the ones it downloaded, and flatpak pulls from the
+    cached repo through --sideload-repo.
+    """
+    command_manager = (
+        get_native_manager_type() if manager == 'apt' else manager
+    )
+    if 'prefetch' not in MANAGER_CMDS.get(command_manager, {}):
+        return 0
+    if manager in ('flatpak', 'snap') and not shutil.which(manager):
+        return 0
+
+    package_list = (
+        [package_names] if isinstance(package_names, str) else package_names
     )
+    cmd = _build_cmd(manager, 'prefetch', package_list)
+    log_path = _get_log_file_path('prefetch', manager)
+
+    archives: list[str] = []
+    if command_manager == 'apt' and artifact_cache.cache_dir():
+        archives = artifact_cache.apt_archive_names(package_list)
+        seed_cmd = artifact_cache.seed_apt_command(archives)
+        if seed_cmd:
+            run_cmd_smart(seed_cmd, log_path=log_path)
+    if manager == 'flatpak':
+        sideload_repo = artifact_cache.flatpak_sideload_repo()
+        if sideload_repo:
+            option = f'--sideload-repo={shlex.quote(str(sideload_repo))}'
+            cmd = cmd.replace(
+                'flatpak install', f'flatpak install {option}', 1
+            )
+
+    code = run_cmd_smart(cmd, log_path=log_path, progress=manager)
+    if code == 0 and archives:
+        try:
+            artifact_cache.store_apt_archives(archives)
+        except OSError as e:
+            console.print(
+                _(
+                    '[yellow]Could not update the artifact cache: {error}[/yellow]'
+                ).format(error=e)
+            )
+    return code
 
 
-def install_with_manager(package_names: str | Sequence[str], manager: str):
+def cache_artifacts(package_names: Sequence[str], manager: str) -> None:
+    """
+    Exports installed flatpaks into the artifact cache, if one is
+    configured, so other machines can sideload them. apt's .debs are
+    cached by prefetch_with_manager already.
+
+    Caching is best effort: an unwritable or full cache only prints a
+    warning and never changes the outcome of the install.
+    """
+    if manager != 'flatpak':
+        return
+    try:
+        cmd = artifact_cache.store_flatpak_command(package_names)
+        if not cmd:
+            return
+        log_path = _get_log_file_path('cache', manager)
+        code = run_cmd_smart(cmd, log_path=log_path)
+        artifact_cache.evict()
+    except OSError as e:
+        console.print(
+            _(
+                '[yellow]Could not update the artifact cache: {error}[/yellow]'
+            ).format(error=e)
+        )
+        return
+    if code != 0:
+        console.print(
+            _(
+                '[yellow]Could not export {manager} packages to the artifact cache (exit code {code}). Check the log for details: {log_path}[/yellow]'
+            ).format(manager=manager, code=code, log_path=log_path)
+        )
+
+
+def install_with_manager(
+    package_names: str | Sequence[str], manager: str
+) -> dict[str, str]:
+    """
+    Installs all packages in a single transaction of the given manager.
+
+    When the transaction fails because of packages the manager could not
+    find, those packages are dropped and the rest is retried once more as a
+    single transaction. Returns the outcome of each requested package:
+    'installed', 'unchanged' or 'failed'.
+    """
     if isinstance(package_names, str):
         package_list = [package_names]
     else:
@@ -247,7 +429,7 @@ def install_with_manager(package_names: str | Sequence[str], manager: str):
         console.print(
             _('[yellow]No packages were provided for installation.[/yellow]')
         )
-        return
+        return {}
 
     lister_func = MANAGER_TO_LISTER.get(manager) or MANAGER_TO_LISTER.get(
         get_native_manager_type()
@@ -270,58 +452,91 @@ def install_with_manager(package_names: str | Sequence[str], manager: str):
             'flatpak remote-add --if-not-exists flathub https://dl.flathub.org/repo/flathub.flatpakrepo'
         )
 
-    cmd = _build_cmd(manager, 'install', package_list)
-    log_path = _get_log_file_path()
-
-    before_set = lister_func()
-    code = run_cmd_smart(cmd, log_path=log_path)
+    log_path = _get_log_file_path('install', manager)
+    tracker = tracker_for_manager(manager, lister_func)
+    tracker.begin()
+
+    attempt = list(package_list)
+    failed: list[str] = []
+    while True:
+        cmd = _build_cmd(manager, 'install', attempt)
+        offset = _log_size(log_path)
+        code = run_cmd_smart(cmd, log_path=log_path, progress=manager)
+        if code == 0:
+            break
+
+        culprits = failed_packages_from_output(
+            manager, _read_log_since(log_path, offset), attempt
+        )
+        remaining = [pkg for pkg in attempt if pkg not in culprits]
+        if not culprits or not remaining:
+            console.print(
+                _(
+                    '[bold red]Error installing {package_name} (manager: {manager}, exit code: {code}).[/bold red]'
+                ).format(
+                    package_name=', '.join(attempt),
+                    manager=manager,
+                    code=code,
+                )
+            )
+            console.print(
+                _('Check the log for details: {log_path}').format(
+                    log_path=log_path
+                )
+            )
+            raise SystemExit(code)
 
-    if code != 0:
         console.print(
             _(
-                '[bold red]Error installing {package_name} (manager: {manager}, exit code: {code}).[/bold red]'
-            ).format(
-                package_name=', '.join(package_list),
-                manager=manager,
-                code=code,
-            )
-        )
-        console.print(
-            _('Check the log for details: {log_path}').format(
-                log_path=log_path
-            )
+                '[yellow]{manager} could not install {packages}; retrying without them.[/yellow]'
+            ).format(manager=manager, packages=', '.join(culprits))
         )
-        raise SystemExit(code)
+        failed.extend(culprits)
+        attempt = remaining
 
-    after_set = lister_func()
-    newly_installed = sorted(list(after_set - before_set))
+    newly_installed = tracker.finish().installed
+    results = {pkg: 'failed' for pkg in failed}
+    results.update(
+        {
+            pkg: 'installed' if pkg in newly_installed else 'unchanged'
+            for pkg in attempt
+        }
+    )
     package_label = (
-        package_list[0]
-        if len(package_list) == 1
-        else _('{} packages').format(len(package_list))
+        attempt[0]
+        if len(attempt) == 1
+        else _('{} packages').format(len(attempt))
     )
 
+    if failed:
+        console.print(
+            _('[bold red]Failed to install:[/bold red] {packages}').format(
+                packages=', '.join(failed)
+            )
+        )
+
     if not newly_installed:
         console.print(
             _(
                 '[bold yellow]{package_name} is already installed or no changes were detected.[/bold yellow]'
             ).format(package_name=package_label)
         )
-        return
+        return results
 
     payload = {
         'action': 'install',
         'manager': manager,
         'timestamp': datetime.now().isoformat(),
-        'packages': package_list,
+        'packages': attempt,
         'installed_packages': newly_installed,
+        'log_file': log_path,
     }
-    if len(package_list) == 1:
-        payload['package'] = package_list[0]
+    if len(attempt) == 1:
+        payload['package'] = attempt[0]
 
     log_operation(payload)
 
-    requested_set = set(package_list)
+    requested_set = set(attempt)
     dep_count = len(
         [pkg for pkg in newly_installed if pkg not in requested_set]
     )
@@ -335,3 +550,4 @@ def install_with_manager(package_names: str | Sequence[str], manager: str):
             '[bold green]✔ Successfully installed {package_name}[/] {dep_text}'
         ).format(package_name=package_label, dep_text=dep_text)
     )
+    return results
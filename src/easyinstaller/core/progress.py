@@ -0,0 +1,401 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, List, Optional, Tuple
+
+from rich.console import Console
+from rich.filesize import decimal
+from rich.progress import (
+    BarColumn,
+    Progress,
+    SpinnerColumn,
+    TaskProgressColumn,
+    TextColumn,
+)
+
+from easyinstaller.i18n.i18n import _
+
+# JSON-lines file (or '-' for stderr) that receives every progress event.
+PROGRESS_EVENTS_ENV = 'EI_PROGRESS_EVENTS'
+
+# Makes apt write machine-readable status lines into its normal output.
+APT_STATUS_OPTION = '-o APT::Status-Fd=1'
+
+_SIZE_UNITS = {
+    'b': 1,
+    'kb': 1000,
+    'mb': 1000**2,
+    'gb': 1000**3,
+    'kib': 1024,
+    'mib': 1024**2,
+    'gib': 1024**3,
+}
+_SIZE = r'([\d.,]+)\s*([kMG]i?B|B)'
+_PERCENT = re.compile(r'(\d+(?:\.\d+)?)%')
+_RATE = re.compile(r'([\d.]+\s*[kMG]?B/s)')
+# Terminal escapes flatpak and snap use to redraw their progress bars.
+_ANSI = re.compile(r'\x1b\[[0-9;?]*[A-Za-z]')
+
+
+def parse_size(number: str, unit: str) -> Optional[int]:
+    """Converts sizes like ('1,234', 'kB') or ('12.3', 'MB') to bytes."""
+    factor = _SIZE_UNITS.get(unit.lower())
+    if factor is None:
+        return None
+    try:
+        return int(float(number.replace(',', '')) * factor)
+    except ValueError:
+        return None
+
+
+@dataclass
+class ProgressEvent:
+    """
+    One step of a package manager operation.
+
+    kind is 'download' (bytes and/or percent of the download phase),
+    'stage' (a package entered a stage such as unpacking or configuring),
+    'package_done' (a package finished) or 'error'.
+    """
+
+    manager: str
+    kind: str
+    package: Optional[str] = None
+    stage: Optional[str] = None
+    percent: Optional[float] = None
+    downloaded: Optional[int] = None
+    total: Optional[int] = None
+    rate: Optional[str] = None
+    message: str = ''
+
+
+class ProgressParser:
+    """
+    Turns a manager's raw output stream into ProgressEvents.
+
+    `feed(chunk)` returns the events completed by the chunk and the text
+    meant for humans, i.e. the chunk minus machine status lines. Carriage
+    returns end lines too, since progress bars redraw with them.
+    """
+
+    manager = ''
+    # Prefixes of lines that are machine status only and not shown.
+    hidden_prefixes: Tuple[str, ...] = ()
+
+    def __init__(self):
+        self._partial = ''
+        self._partial_shown = 0
+
+    def prepare_command(self, cmd: str) -> str:
+        """Adds the options that make the manager report its progress."""
+        return cmd
+
+    def _maybe_hidden(self, text: str) -> bool:
+        return any(
+            text.startswith(prefix) or prefix.startswith(text)
+            for prefix in self.hidden_prefixes
+        )
+
+    def feed(self, chunk: str) -> Tuple[List[ProgressEvent], str]:
+        events: List[ProgressEvent] = []
+        shown: List[str] = []
+        pieces = re.split(r'(\r\n|\n|\r)', chunk)
+        # re.split with a group alternates text and separators.
+        for index in range(0, len(pieces) - 1, 2):
+            line = self._partial + pieces[index]
+            separator = pieces[index + 1]
+            hidden = self._maybe_hidden(line) and line != ''
+            if not hidden:
+                shown.append(line[self._partial_shown :] + separator)
+            events.extend(self.parse_line(_ANSI.sub('', line)))
+            self._partial = ''
+            self._partial_shown = 0
+
+        self._partial += pieces[-1]
+        if self._partial and not self._maybe_hidden(self._partial):
+            # Unterminated text may be a prompt; show it right away.
+            shown.append(self._partial[self._partial_shown :])
+            self._partial_shown = len(self._partial)
+        return events, ''.join(shown)
+
+    def parse_line(self, line: str) -> List[ProgressEvent]:
+        return []
+
+
+class AptProgressParser(ProgressParser):
+    """Parses APT::Status-Fd lines plus apt's download summary lines."""
+
+    manager = 'apt'
+    hidden_prefixes = (
+        'dlstatus:',
+        'pmstatus:',
+        'pmerror:',
+        'pmconffile:',
+        'media-change:',
+    )
+
+    _NEED = re.compile(r'^Need to get (?:' + _SIZE + r'/)?' + _SIZE)
+    _GET = re.compile(r'^Get:\d+ .*\[' + _SIZE + r'\]\s*$')
+    _FETCHED = re.compile(r'^Fetched ' + _SIZE + r' in .*\(([^)]+/s)\)')
+
+    def __init__(self):
+        super().__init__()
+        self.total: Optional[int] = None
+        self.downloaded = 0
+
+    def prepare_command(self, cmd: str) -> str:
+        return re.sub(
+            r'\bapt-get\b', f'apt-get {APT_STATUS_OPTION}', cmd, count=1
+        )
+
+    def parse_line(self, line: str) -> List[ProgressEvent]:
+        if line.startswith(self.hidden_prefixes):
+            return self._status_line(line)
+
+        match = self._NEED.match(line)
+        if match:
+            number, unit = match.group(3), match.group(4)
+            if match.group(1):
+                # "Need to get 1 kB/12 MB": only the first part is missing.
+                number, unit = match.group(1), match.group(2)
+            self.total = parse_size(number, unit)
+            return [
+                ProgressEvent(
+                    'apt', 'download', downloaded=0, total=self.total
+                )
+            ]
+
+        match = self._GET.match(line)
+        if match:
+            self.downloaded += parse_size(match.group(1), match.group(2)) or 0
+            return [
+                ProgressEvent(
+                    'apt',
+                    'download',
+                    downloaded=self.downloaded,
+                    total=self.total,
+                    message=line,
+                )
+            ]
+
+        match = self._FETCHED.match(line)
+        if match:
+            fetched = parse_size(match.group(1), match.group(2))
+            return [
+                ProgressEvent(
+                    'apt',
+                    'download',
+                    percent=100.0,
+                    downloaded=fetched,
+                    total=fetched,
+                    rate=match.group(3),
+                )
+            ]
+        return []
+
+    def _status_line(self, line: str) -> List[ProgressEvent]:
+        parts = line.split(':', 3)
+        if len(parts) < 4:
+            return []
+        kind, package, percent_text, message = parts
+        try:
+            percent = float(percent_text)
+        except ValueError:
+            percent = None
+
+        if kind == 'dlstatus':
+            return [
+                ProgressEvent(
+                    'apt', 'download', percent=percent, message=message
+                )
+            ]
+        if kind == 'pmerror':
+            return [
+                ProgressEvent(
+                    'apt',
+                    'error',
+                    package=package,
+                    percent=percent,
+                    message=message,
+                )
+            ]
+        if kind == 'pmstatus':
+            stage = message.split(' ', 1)[0].lower()
+            done = stage in ('installed', 'removed', 'purged')
+            return [
+                ProgressEvent(
+                    'apt',
+                    'package_done' if done else 'stage',
+                    package=package,
+                    stage=stage,
+                    percent=percent,
+                    message=message,
+                )
+            ]
+        return []
+
+
+class FlatpakProgressParser(ProgressParser):
+    """Parses `Installing 2/3… 45%  1.2 MB/s  00:10` style lines."""
+
+    manager = 'flatpak'
+
+    _STEP = re.compile(r'^\s*(Installing|Updating|Uninstalling)\s+(\d+)/(\d+)')
+
+    def parse_line(self, line: str) -> List[ProgressEvent]:
+        match = self._STEP.match(line)
+        if not match:
+            return []
+        action, step, steps = match.groups()
+        step, steps = int(step), max(int(steps), 1)
+        percent = _PERCENT.search(line, match.end())
+        rate = _RATE.search(line, match.end())
+        step_percent = float(percent.group(1)) if percent else 0.0
+        overall = ((step - 1) + step_percent / 100) / steps * 100
+        kind = 'package_done' if step_percent >= 100 else 'stage'
+        return [
+            ProgressEvent(
+                'flatpak',
+                kind,
+                stage=action.lower(),
+                percent=round(overall, 1),
+                rate=rate.group(1) if rate else None,
+                message=line.strip(),
+            )
+        ]
+
+
+class SnapProgressParser(ProgressParser):
+    """Parses `Download snap "code" (123) from channel "stable"  45% ...`."""
+
+    manager = 'snap'
+
+    _TASK = re.compile(r'^(?P<stage>[A-Z][\w ]*?) snap "(?P<name>[^"]+)"')
+    # `code 1.85.0 from Visual Studio Code (vscode✓) installed`
+    _DONE = re.compile(r'^([a-z0-9][a-z0-9-]*)(?: .*)? (?:installed|removed)$')
+
+    def parse_line(self, line: str) -> List[ProgressEvent]:
+        line = line.strip()
+        done = self._DONE.match(line)
+        if done:
+            return [
+                ProgressEvent(
+                    'snap',
+                    'package_done',
+                    package=done.group(1),
+                    percent=100.0,
+                    message=line,
+                )
+            ]
+        match = self._TASK.match(line)
+        if not match:
+            return []
+        stage = match.group('stage').split(' ', 1)[0].lower()
+        percent = _PERCENT.search(line, match.end())
+        rate = _RATE.search(line, match.end())
+        return [
+            ProgressEvent(
+                'snap',
+                'download' if stage == 'download' else 'stage',
+                package=match.group('name'),
+                stage=stage,
+                percent=float(percent.group(1)) if percent else None,
+                rate=rate.group(1) if rate else None,
+                message=line,
+            )
+        ]
+
+
+PARSERS = {
+    'apt': AptProgressParser,
+    'flatpak': FlatpakProgressParser,
+    'snap': SnapProgressParser,
+}
+
+
+def parser_for_manager(manager: str) -> Optional[ProgressParser]:
+    parser_class = PARSERS.get(manager)
+    return parser_class() if parser_class else None
+
+
+def open_event_stream() -> Optional[Callable[[ProgressEvent], None]]:
+    """
+    Returns a writer appending events as JSON lines to the file named by
+    EI_PROGRESS_EVENTS ('-' for stderr), or None when it is not set.
+    """
+    target = os.environ.get(PROGRESS_EVENTS_ENV)
+    if not target:
+        return None
+
+    def write(event: ProgressEvent) -> None:
+        record = {'time': time.time(), **asdict(event)}
+        line = json.dumps(record) + '\n'
+        if target == '-':
+            sys.stderr.write(line)
+            sys.stderr.flush()
+            return
+        try:
+            with open(target, 'a', encoding='utf-8') as handle:
+                handle.write(line)
+        except OSError:
+            pass
+
+    return write
+
+
+def describe_event(event: ProgressEvent) -> str:
+    if event.kind == 'download':
+        text = _('Downloading')
+        if event.downloaded is not None and event.total:
+            text += f' {decimal(event.downloaded)}/{decimal(event.total)}'
+        if event.rate:
+            text += f' ({event.rate})'
+        return text
+    if event.kind == 'error':
+        return _('[red]Error:[/red] {message}').format(message=event.message)
+    if event.kind == 'package_done':
+        return _('Finished {package}').format(
+            package=event.package or event.message
+        )
+    return event.message or (event.stage or '').capitalize()
+
+
+class ProgressView:
+    """Shows the events of one command as a transient progress bar."""
+
+    def __init__(self, label: str, console: Console):
+        self._label = label
+        self._progress = Progress(
+            SpinnerColumn(),
+            TextColumn('{task.description}'),
+            BarColumn(),
+            TaskProgressColumn(),
+            console=console,
+            transient=True,
+        )
+        self._task = None
+
+    def start(self) -> None:
+        self._progress.start()
+        self._task = self._progress.add_task(self._label, total=100)
+
+    def update(self, event: ProgressEvent) -> None:
+        if self._task is None:
+            return
+        percent = event.percent
+        if event.downloaded is not None and event.total:
+            percent = min(event.downloaded * 100 / event.total, 100.0)
+        fields = {'description': describe_event(event)}
+        if percent is not None:
+            fields['completed'] = percent
+        self._progress.update(self._task, **fields)
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._progress.stop()
+            self._task = None
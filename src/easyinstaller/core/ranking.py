@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import heapq
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from easyinstaller.core.config import config
+from easyinstaller.core.snapshot import load_snapshot
+
+# Number of results kept for the interactive selection list.
+DEFAULT_LIMIT = 40
+
+# Small tie-breaking bonus per source; 'preferred_source' in the config
+# adds PREFERRED_SOURCE_BONUS on top.
+SOURCE_WEIGHTS: Dict[str, float] = {'apt': 3.0, 'flatpak': 2.0, 'snap': 1.0}
+PREFERRED_SOURCE_BONUS = 8.0
+INSTALLED_BONUS = 5.0
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def installed_keys() -> Set[Tuple[str, str]]:
+    """
+    Returns (source, id) pairs of the packages in the installed snapshot.
+    The snapshot is not re-validated: a stale entry only affects ordering.
+    """
+    keys = set()
+    for manager, entry in load_snapshot().items():
+        packages = entry.get('packages') if isinstance(entry, dict) else None
+        for package in packages or []:
+            if isinstance(package, dict):
+                key = package.get('id') or package.get('name')
+                if key:
+                    keys.add((manager, key))
+    return keys
+
+
+def _text_score(text: str, query: str, query_tokens: List[str]) -> float:
+    """Scores how well a single field matches the query, from 0 to 100."""
+    text = text.lower()
+    if not text:
+        return 0.0
+    if text == query:
+        return 100.0
+    if text.startswith(query):
+        # Shorter names are closer to what was typed.
+        return 70.0 + 20.0 * len(query) / len(text)
+
+    field_tokens = _tokens(text)
+    if not field_tokens:
+        return 0.0
+    matched = 0.0
+    for token in query_tokens:
+        if token in field_tokens:
+            matched += 1.0
+        elif any(t.startswith(token) for t in field_tokens):
+            matched += 0.7
+        elif token in text:
+            matched += 0.2
+    if not matched:
+        return 0.0
+    coverage = matched / len(query_tokens)
+    # Favour fields made mostly of the query over long ones mentioning it.
+    focus = min(len(query_tokens) / len(field_tokens), 1.0)
+    return 60.0 * coverage + 10.0 * focus
+
+
+def score_result(
+    result: Dict,
+    query: str,
+    installed: Optional[Set[Tuple[str, str]]] = None,
+    preferred_source: Optional[str] = None,
+) -> float:
+    """
+    Scores a search result: name matches weigh most, then the id (whose
+    last segment is often the real name, e.g. com.visualstudio.Code), then
+    the summary; source preference, installed state and popularity break
+    ties.
+    """
+    normalized, query_tokens = _prepare_query(query)
+    return _score(
+        result, normalized, query_tokens, installed, preferred_source
+    )
+
+
+def _prepare_query(query: str) -> Tuple[str, List[str]]:
+    normalized = ' '.join(query.lower().split())
+    return normalized, _tokens(normalized) or [normalized]
+
+
+def _score(
+    result: Dict,
+    normalized: str,
+    query_tokens: List[str],
+    installed: Optional[Set[Tuple[str, str]]],
+    preferred_source: Optional[str],
+) -> float:
+    name = result.get('name') or ''
+    package_id = result.get('id') or ''
+    source = result.get('source') or ''
+
+    score = _text_score(name, normalized, query_tokens)
+    id_tail = package_id.rsplit('.', 1)[-1]
+    score = max(
+        score,
+        0.9 * _text_score(package_id, normalized, query_tokens),
+        0.9 * _text_score(id_tail, normalized, query_tokens),
+    )
+    score += 0.1 * _text_score(
+        result.get('summary') or '', normalized, query_tokens
+    )
+
+    score += SOURCE_WEIGHTS.get(source, 0.0)
+    if preferred_source and source == preferred_source:
+        score += PREFERRED_SOURCE_BONUS
+    if installed and (source, package_id) in installed:
+        score += INSTALLED_BONUS
+    popularity = result.get('popularity')
+    if isinstance(popularity, (int, float)) and popularity > 0:
+        score += min(math.log10(popularity + 1), 6.0)
+    return score
+
+
+def rank_results(
+    results: Iterable[Dict], query: str, limit: Optional[int] = DEFAULT_LIMIT
+) -> List[Dict]:
+    """
+    Returns the best `limit` results, best first, without sorting the whole
+    list. Ties keep the order the backends returned them in.
+    """
+    installed = installed_keys()
+    preferred_source = config.get('preferred_source')
+    normalized, query_tokens = _prepare_query(query)
+    key = lambda result: _score(
+        result, normalized, query_tokens, installed, preferred_source
+    )
+    results = list(results)
+    if limit is None or limit >= len(results):
+        return sorted(results, key=key, reverse=True)
+    return heapq.nlargest(limit, results, key=key)
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import os
+import subprocess
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from easyinstaller.core.history_handler import iter_history_reverse
+from easyinstaller.core.package_handler import (
+    MANAGER_TO_LISTER,
+    install_with_manager,
+    remove_with_manager,
+)
+
+# History actions a rollback knows how to revert.
+UNDOABLE_ACTIONS = ('install', 'remove')
+
+
+@dataclass
+class ManagerPlan:
+    """The transactions that revert one manager's changes."""
+
+    manager: str
+    remove: List[str] = field(default_factory=list)
+    install: List[str] = field(default_factory=list)
+    # Packages outside the plan the manager would remove along with it.
+    extra_removals: List[str] = field(default_factory=list)
+
+    @property
+    def packages(self) -> List[str]:
+        return self.remove + self.install
+
+    def pruned(self, installed: Set[str]) -> 'ManagerPlan':
+        """
+        Drops removals of packages that are already gone and installs of
+        packages that are already back, e.g. changed outside easyinstaller.
+        """
+        return ManagerPlan(
+            manager=self.manager,
+            remove=[pkg for pkg in self.remove if pkg in installed],
+            install=[pkg for pkg in self.install if pkg not in installed],
+        )
+
+
+def changed_packages(record: Dict) -> List[str]:
+    """
+    Returns the packages an operation actually installed or removed,
+    dependencies included. Records written before those were tracked only
+    name the requested packages.
+    """
+    key = (
+        'installed_packages'
+        if record.get('action') == 'install'
+        else 'removed_packages'
+    )
+    for names in (record.get(key), record.get('packages')):
+        if isinstance(names, list):
+            return [name for name in names if isinstance(name, str)]
+    if isinstance(record.get('package'), str):
+        return [record['package']]
+    return []
+
+
+def operations_to_undo(
+    count: Optional[int] = None,
+    after: Optional[str] = None,
+    history_file: Optional[str] = None,
+) -> List[Dict]:
+    """
+    Returns the operations to revert, newest first: the last `count` ones,
+    or every one recorded after the ISO timestamp `after`. The history is
+    in the order operations finished, so it is read from the end and only
+    as far back as needed.
+    """
+    operations = []
+    for record in iter_history_reverse(history_file):
+        if record.get('action') not in UNDOABLE_ACTIONS:
+            continue
+        if not record.get('manager'):
+            continue
+        if after is not None and str(record.get('timestamp') or '') <= after:
+            break
+        operations.append(record)
+        if count is not None and len(operations) >= count:
+            break
+    return operations
+
+
+def plan_rollback(operations: Iterable[Dict]) -> List[ManagerPlan]:
+    """
+    Computes the net change of `operations` (newest first) and returns,
+    per manager, the packages to remove and to reinstall to get back to
+    the state before the oldest of them. A package installed and removed
+    again in between is left alone, so each manager needs at most one
+    remove and one install transaction.
+    """
+    current: Dict[Tuple[str, str], bool] = {}
+    original: Dict[Tuple[str, str], bool] = {}
+    for record in operations:
+        present = record.get('action') == 'install'
+        for name in changed_packages(record):
+            key = (record['manager'], name)
+            current.setdefault(key, present)
+            original[key] = not present
+
+    plans: Dict[str, ManagerPlan] = {}
+    for (manager, name), was_present in original.items():
+        if current[(manager, name)] == was_present:
+            continue
+        plan = plans.setdefault(manager, ManagerPlan(manager=manager))
+        (plan.install if was_present else plan.remove).append(name)
+
+    for plan in plans.values():
+        plan.remove.sort()
+        plan.install.sort()
+    return [plans[manager] for manager in sorted(plans)]
+
+
+def simulate_apt_removal(plan: ManagerPlan) -> Optional[List[str]]:
+    """
+    Asks apt which packages removing the plan's packages would take along,
+    e.g. packages installed later that depend on them, stores them in
+    `plan.extra_removals` and returns them. Returns None when apt cannot
+    tell.
+    """
+    todo = plan.pruned(MANAGER_TO_LISTER['apt']())
+    if not todo.remove:
+        plan.extra_removals = []
+        return plan.extra_removals
+    try:
+        env = dict(os.environ, LC_ALL='C')
+        result = subprocess.run(
+            ['apt-get', '-s', 'remove', *todo.remove],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=env,
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+    # Each removal is simulated as a `Remv name [version]` line.
+    removed = {
+        line.split()[1]
+        for line in result.stdout.splitlines()
+        if line.startswith('Remv ')
+    }
+    plan.extra_removals = sorted(removed - set(todo.remove))
+    return plan.extra_removals
+
+
+def apply_plan(plan: ManagerPlan) -> Dict[str, str]:
+    """
+    Runs a manager's plan as one remove and one install transaction,
+    skipping packages already in the wanted state. Returns the outcome of
+    each package: 'removed', 'installed', 'unchanged' or 'failed'. Raises
+    SystemExit when a transaction fails.
+    """
+    lister = MANAGER_TO_LISTER.get(plan.manager)
+    todo = plan.pruned(lister()) if lister else plan
+    results = {
+        pkg: 'unchanged' for pkg in plan.packages if pkg not in todo.packages
+    }
+    if todo.remove:
+        remove_with_manager(todo.remove, plan.manager)
+        results.update({pkg: 'removed' for pkg in todo.remove})
+    if todo.install:
+        results.update(install_with_manager(todo.install, plan.manager))
+    return results
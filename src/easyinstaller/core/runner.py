@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+import codecs
 import os
 import re
+import selectors
 import shlex
 import subprocess
 import sys
 import threading
-import time
-from typing import Callable, Optional
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Sequence
 
 try:
     import pexpect  # type: ignore
@@ -18,41 +21,167 @@ except ImportError:
 
 from rich.console import Console
 
+from easyinstaller.core import aio
+from easyinstaller.core.log_sink import LogSink
+from easyinstaller.core.progress import (
+    ProgressParser,
+    ProgressView,
+    open_event_stream,
+    parser_for_manager,
+)
 from easyinstaller.i18n.i18n import _
 
 console = Console()
 
 PROMPTS = re.compile(
     r'(?i)(do you want to continue\?|'
-    r'[y/n]|[y/N]|(y/n)|'
+    r'\[y/n\]|\(y/n\)|'
     r'eula|license|terms|'
     r'configuring\s+|press enter|password:|'
     r'gpg|signature|import key|permissions)'
 )
 
 
-def _spinner(stop_event, label=_('Installing...')):
+# Lowercase literals, one of which every PROMPTS match contains. Chunks are
+# only handed to the regex when one of them shows up.
+PROMPT_KEYWORDS = (
+    'do you want to continue?',
+    '[y/n]',
+    '(y/n)',
+    'eula',
+    'license',
+    'terms',
+    'configuring',
+    'press enter',
+    'password:',
+    'gpg',
+    'signature',
+    'import key',
+    'permissions',
+)
+
+# Longest text a prompt pattern needs to match. Each scan covers this much
+# of the previous output plus the new chunk, so prompts split across
+# chunks are still found.
+PROMPT_OVERLAP = 64
+# Recent output shown to the user when a prompt hands the TTY over.
+PROMPT_CONTEXT = 4096
+
+
+class PromptDetector:
+    """
+    Finds interactive prompts in streamed output in linear time: each chunk
+    is scanned together with a short overlap of the previous output, and
+    only the last PROMPT_CONTEXT characters are kept. When `keywords` are
+    given, the regex only runs on windows containing one of them.
+    """
+
+    def __init__(
+        self,
+        pattern: re.Pattern = PROMPTS,
+        keywords: Optional[Sequence[str]] = PROMPT_KEYWORDS,
+        overlap: int = PROMPT_OVERLAP,
+        context: int = PROMPT_CONTEXT,
+    ):
+        self._pattern = pattern
+        self._keywords = keywords
+        self._overlap = overlap
+        self._context_size = max(context, overlap)
+        self._context = ''
+
+    @property
+    def context(self) -> str:
+        """The most recent output, for showing it above a prompt."""
+        return self._context
+
+    def feed(self, chunk: str) -> bool:
+        """Adds output and returns True if it completes a prompt."""
+        window = self._context[-self._overlap :] + chunk
+        self._context = (self._context + chunk)[-self._context_size :]
+        if self._keywords is not None:
+            lowered = window.lower()
+            if not any(keyword in lowered for keyword in self._keywords):
+                return False
+        return self._pattern.search(window) is not None
+
+
+# Set to a true value (or pass `ei --non-interactive`) to run every command
+# unattended: no TTY, no spinner, no prompts.
+NON_INTERACTIVE_ENV = 'EI_NON_INTERACTIVE'
+
+# Commands containing any of these need a shell; the rest are exec'd
+# directly.
+_SHELL_SYNTAX = re.compile(r'[;&|<>()$`\\*?~{}\[\]!#\n]')
+_READ_SIZE = 64 * 1024
+
+_thread_state = threading.local()
+
+
+@contextmanager
+def unattended() -> Iterator[None]:
+    """
+    Runs commands started from the current thread without a spinner and
+    without handing the TTY over to the user, so several can run at once.
+    Output still goes to the log file.
+    """
+    previous = getattr(_thread_state, 'unattended', False)
+    _thread_state.unattended = True
+    try:
+        yield
+    finally:
+        _thread_state.unattended = previous
+
+
+def is_unattended() -> bool:
+    return getattr(_thread_state, 'unattended', False) or is_non_interactive()
+
+
+def is_non_interactive() -> bool:
+    return os.environ.get(NON_INTERACTIVE_ENV, '').lower() not in (
+        '',
+        '0',
+        'false',
+        'no',
+    )
+
+
+async def _spinner(stop_event, label=_('Installing...')):
     frames = '|/-\\'
     i = 0
     while not stop_event.is_set():
         console.print(f'\r{label} {frames[i % len(frames)]}', end='')
         i += 1
-        time.sleep(0.1)
+        await asyncio.sleep(0.1)
     console.print('\r' + ' ' * (len(label) + 2) + '\r', end='')
 
 
 def run_cmd_smart(
-    cmd: str, env: Optional[dict] = None, log_path: Optional[str] = None
+    cmd: str,
+    env: Optional[dict] = None,
+    log_path: Optional[str] = None,
+    progress: Optional[str] = None,
 ) -> int:
     """
     Executes a command with a spinner and prompt detection.
     If interaction is detected, it pauses the spinner and hands over the TTY to the user.
     Requires pexpect for the full experience; otherwise, it falls back to subprocess.
+
+    `progress` names the package manager whose output the command prints;
+    its progress is then parsed into a progress bar instead of the spinner
+    and into the EI_PROGRESS_EVENTS stream.
     """
     merged_env = os.environ.copy()
     if env:
         merged_env.update(env)
 
+    parser = parser_for_manager(progress) if progress else None
+    if parser:
+        cmd = parser.prepare_command(cmd)
+    emit = open_event_stream()
+
+    if is_unattended():
+        return _run_unattended(cmd, merged_env, log_path, parser, emit)
+
     if not HAS_PEXPECT:
         # Fallback without prompt detection
         with console.status(
@@ -68,18 +197,28 @@ def run_cmd_smart(
         encoding='utf-8',
         timeout=None,
     )
+    label = _('Running: {cmd_name}...').format(cmd_name=cmd.split()[0])
     stop = threading.Event()
-    spin = threading.Thread(
-        target=_spinner,
-        args=(
-            stop,
-            _('Running: {cmd_name}...').format(cmd_name=cmd.split()[0]),
-        ),
-    )
-    spin.start()
+    view = None
+    if parser:
+        view = ProgressView(label, console)
+        view.start()
+        stop.set()
+        spin = None
+    else:
+        # The spinner runs on the shared event loop instead of its own
+        # thread.
+        spin = aio.submit(_spinner(stop, label))
 
-    log_fh = open(log_path, 'a', encoding='utf-8') if log_path else None
-    buffer = ''
+    def stop_feedback():
+        stop.set()
+        if spin:
+            spin.result()
+        if view:
+            view.stop()
+
+    log_sink = LogSink(log_path) if log_path else None
+    detector = PromptDetector()
     exit_status = 0
 
     try:
@@ -88,17 +227,21 @@ def run_cmd_smart(
                 chunk = child.read_nonblocking(size=1024, timeout=5)
                 if not chunk:
                     continue
-                buffer += chunk
-                if log_fh:
-                    log_fh.write(chunk)
-                    log_fh.flush()
-
-                if PROMPTS.search(buffer):
-                    stop.set()
-                    spin.join()
-                    sys.stdout.write(buffer)
+                if log_sink:
+                    log_sink.write(chunk)
+                if parser:
+                    events, chunk = parser.feed(chunk)
+                    for event in events:
+                        view.update(event)
+                        if emit:
+                            emit(event)
+
+                if detector.feed(chunk):
+                    stop_feedback()
+                    if log_sink:
+                        log_sink.flush()
+                    sys.stdout.write(detector.context)
                     sys.stdout.flush()
-                    buffer = ''
                     child.interact()  # User takes over
                     break
             except pexpect.exceptions.TIMEOUT:
@@ -106,11 +249,9 @@ def run_cmd_smart(
             except pexpect.exceptions.EOF:
                 break
     finally:
-        stop.set()
-        if spin.is_alive():
-            spin.join()
-        if log_fh:
-            log_fh.close()
+        stop_feedback()
+        if log_sink:
+            log_sink.close()
 
         # Ensure the child process has terminated
         if child.isalive():
@@ -123,3 +264,81 @@ def run_cmd_smart(
         )
 
     return exit_status
+
+
+def command_args(cmd: str) -> list[str]:
+    """
+    Returns the argv to run a command with nobody watching its output:
+    exec'd directly unless it needs a shell. In non-interactive mode sudo is
+    told to fail instead of asking for a password; otherwise it uses the
+    credentials prime_sudo_session() refreshed on the user's terminal.
+    """
+    if _SHELL_SYNTAX.search(cmd):
+        return ['/bin/bash', '-c', cmd]
+    args = shlex.split(cmd)
+    if (
+        is_non_interactive()
+        and args
+        and args[0] == 'sudo'
+        and '-n' not in args[1:2]
+    ):
+        args.insert(1, '-n')
+    return args
+
+
+def _run_unattended(
+    cmd: str,
+    env: dict,
+    log_path: Optional[str],
+    parser: Optional[ProgressParser] = None,
+    emit: Optional[Callable] = None,
+) -> int:
+    """
+    Runs a command without a TTY, shell (when possible), or spinner. Its
+    output is read from a pipe with the platform's poll mechanism and sent
+    to the log file only; progress events still go to `emit`.
+    """
+    env = dict(env)
+    env.setdefault('DEBIAN_FRONTEND', 'noninteractive')
+    log_sink = LogSink(log_path) if log_path else None
+    if not emit:
+        parser = None
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    try:
+        proc = subprocess.Popen(
+            command_args(cmd),
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=(
+                subprocess.PIPE if log_sink or parser else subprocess.DEVNULL
+            ),
+            stderr=subprocess.STDOUT,
+        )
+    except FileNotFoundError:
+        if log_sink:
+            log_sink.write(f'{cmd}: command not found\n')
+            log_sink.close()
+        return 127
+
+    try:
+        if proc.stdout:
+            fd = proc.stdout.fileno()
+            with selectors.DefaultSelector() as selector:
+                selector.register(fd, selectors.EVENT_READ)
+                while True:
+                    selector.select()
+                    data = os.read(fd, _READ_SIZE)
+                    if not data:
+                        break
+                    if log_sink:
+                        log_sink.write(data)
+                    if parser:
+                        events, _shown = parser.feed(decoder.decode(data))
+                        for event in events:
+                            emit(event)
+        return proc.wait()
+    finally:
+        if proc.stdout:
+            proc.stdout.close()
+        if log_sink:
+            log_sink.close()
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from easyinstaller.core.runner import unattended
+
+# Shared system resources each manager needs exclusive access to. Managers
+# with disjoint resources run concurrently; the others wait for each other.
+# 'dpkg' stands for the native package database lock.
+MANAGER_RESOURCES: Dict[str, Tuple[str, ...]] = {
+    'apt': ('dpkg',),
+    'flatpak': ('flatpak',),
+    'snap': ('snapd',),
+}
+
+# Managers that are installed through the native manager when missing.
+BOOTSTRAPPED_MANAGERS = ('flatpak', 'snap')
+
+_resource_locks: Dict[str, threading.Lock] = {}
+_resource_locks_guard = threading.Lock()
+
+
+@dataclass
+class ManagerJob:
+    manager: str
+    packages: List[str]
+
+
+@dataclass
+class JobResult:
+    manager: str
+    packages: List[str]
+    results: Dict[str, str] = field(default_factory=dict)
+    exit_code: int = 0
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.exit_code == 0 and self.error is None
+
+
+def manager_resources(manager: str) -> Tuple[str, ...]:
+    """Returns the resources a manager job locks, in acquisition order."""
+    resources = set(MANAGER_RESOURCES.get(manager, (manager,)))
+    if manager in BOOTSTRAPPED_MANAGERS and shutil.which(manager) is None:
+        resources.add('dpkg')
+    return tuple(sorted(resources))
+
+
+def _lock_for(resource: str) -> threading.Lock:
+    with _resource_locks_guard:
+        return _resource_locks.setdefault(resource, threading.Lock())
+
+
+@contextmanager
+def hold_resources(resources: Sequence[str]) -> Iterator[None]:
+    """Acquires resource locks in sorted order so jobs cannot deadlock."""
+    locks = [_lock_for(resource) for resource in sorted(resources)]
+    acquired = []
+    try:
+        for lock in locks:
+            lock.acquire()
+            acquired.append(lock)
+        yield
+    finally:
+        for lock in reversed(acquired):
+            lock.release()
+
+
+def run_manager_jobs(
+    jobs: Sequence[ManagerJob],
+    worker: Callable[[str, List[str]], Optional[Dict[str, str]]],
+    on_state: Optional[Callable[[str, str], None]] = None,
+    parallel: bool = True,
+    prefetch: Optional[Callable[[str, List[str]], object]] = None,
+) -> List[JobResult]:
+    """
+    Runs one job per manager, concurrently when their resources allow it.
+
+    `worker(manager, packages)` performs the installation and returns the
+    per-package outcome; a SystemExit or exception marks the job failed.
+    `on_state(manager, state)` is called with 'prefetching', 'waiting',
+    'running', 'done' or 'failed'. Results are returned in the order of
+    `jobs`.
+
+    `prefetch(manager, packages)`, when given, downloads a job's packages
+    ahead of its installation. All prefetches start right away, even when
+    the installs run one after another, and each install only waits for
+    its own manager's prefetch. A failed prefetch is ignored: the install
+    downloads whatever is still missing.
+    """
+
+    def notify(manager: str, state: str) -> None:
+        if on_state:
+            on_state(manager, state)
+
+    concurrent = parallel and len(jobs) > 1
+
+    def run_prefetch(job: ManagerJob) -> None:
+        with hold_resources(manager_resources(job.manager)):
+            notify(job.manager, 'prefetching')
+            try:
+                # Downloads never need the terminal.
+                with unattended():
+                    prefetch(job.manager, job.packages)
+            except (SystemExit, Exception):
+                pass
+
+    prefetch_pool = None
+    prefetches = {}
+    if prefetch and jobs:
+        prefetch_pool = ThreadPoolExecutor(
+            max_workers=len(jobs), thread_name_prefix='ei-prefetch'
+        )
+        prefetches = {
+            job.manager: prefetch_pool.submit(run_prefetch, job)
+            for job in jobs
+        }
+
+    def run(job: ManagerJob) -> JobResult:
+        result = JobResult(manager=job.manager, packages=list(job.packages))
+        pending = prefetches.get(job.manager)
+        if pending:
+            pending.result()
+        notify(job.manager, 'waiting')
+        with hold_resources(manager_resources(job.manager)):
+            notify(job.manager, 'running')
+            start = time.monotonic()
+            try:
+                # Concurrent jobs cannot share the terminal for prompts.
+                with unattended() if concurrent else nullcontext():
+                    result.results = worker(job.manager, job.packages) or {}
+            except SystemExit as exc:
+                if exc.code is None:
+                    result.exit_code = 0
+                elif isinstance(exc.code, int):
+                    result.exit_code = exc.code
+                else:
+                    result.exit_code = 1
+            except Exception as exc:
+                result.error = str(exc)
+            result.elapsed = time.monotonic() - start
+        notify(job.manager, 'done' if result.ok else 'failed')
+        return result
+
+    try:
+        if not concurrent:
+            return [run(job) for job in jobs]
+
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            futures = [executor.submit(run, job) for job in jobs]
+            return [future.result() for future in futures]
+    finally:
+        if prefetch_pool:
+            prefetch_pool.shutdown(wait=True)
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+from easyinstaller.core.config import CACHE_DIR
+
+SEARCH_CACHE_FILE = CACHE_DIR / 'search-cache.json'
+SEARCH_CACHE_VERSION = 1
+
+# Seconds a cached result list stays valid, per backend. Local apt lists
+# change with every `apt update`; the remote catalogs change more slowly.
+BACKEND_TTLS: Dict[str, float] = {
+    'apt': 60 * 60,
+    'flatpak': 6 * 60 * 60,
+    'snap': 6 * 60 * 60,
+}
+DEFAULT_TTL = 60 * 60
+
+# Bounds of the cache file; the least recently used entries go first.
+MAX_ENTRIES = 256
+MAX_BYTES = 2 * 1024 * 1024
+
+
+def normalize_query(query: str) -> str:
+    return ' '.join(query.lower().split())
+
+
+def cache_key(backend: str, query: str) -> str:
+    return f'{backend}:{normalize_query(query)}'
+
+
+def load_search_cache() -> Dict[str, Dict]:
+    """
+    Loads the cached search results, oldest use first. Unreadable or old
+    files yield an empty cache.
+    """
+    try:
+        data = json.loads(SEARCH_CACHE_FILE.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if (
+        not isinstance(data, dict)
+        or data.get('version') != SEARCH_CACHE_VERSION
+    ):
+        return {}
+    entries = data.get('entries')
+    return entries if isinstance(entries, dict) else {}
+
+
+def cached_results(
+    cache: Dict[str, Dict], backend: str, query: str
+) -> Optional[List[Dict]]:
+    """
+    Returns the cached results of a backend for a query, or None when they
+    are missing or expired. A hit becomes the most recently used entry.
+    """
+    key = cache_key(backend, query)
+    entry = cache.get(key)
+    if not isinstance(entry, dict):
+        return None
+    ttl = BACKEND_TTLS.get(backend, DEFAULT_TTL)
+    stored = entry.get('stored')
+    results = entry.get('results')
+    if (
+        not isinstance(stored, (int, float))
+        or time.time() - stored > ttl
+        or not isinstance(results, list)
+    ):
+        cache.pop(key, None)
+        return None
+    cache[key] = cache.pop(key)
+    return results
+
+
+def store_results(
+    cache: Dict[str, Dict], backend: str, query: str, results: List[Dict]
+) -> None:
+    """Stores the results of a backend as the most recently used entry."""
+    key = cache_key(backend, query)
+    cache.pop(key, None)
+    cache[key] = {'stored': time.time(), 'results': results}
+
+
+def _evict(cache: Dict[str, Dict]) -> str:
+    """Drops expired and least recently used entries until within bounds."""
+    now = time.time()
+    for key in list(cache):
+        backend = key.split(':', 1)[0]
+        stored = cache[key].get('stored') or 0
+        if now - stored > BACKEND_TTLS.get(backend, DEFAULT_TTL):
+            del cache[key]
+
+    while len(cache) > MAX_ENTRIES:
+        del cache[next(iter(cache))]
+
+    sizes = {key: len(json.dumps(entry)) for key, entry in cache.items()}
+    total = sum(sizes.values())
+    while cache and total > MAX_BYTES:
+        key = next(iter(cache))
+        total -= sizes[key]
+        del cache[key]
+
+    return json.dumps({'version': SEARCH_CACHE_VERSION, 'entries': cache})
+
+
+def save_search_cache(cache: Dict[str, Dict]) -> None:
+    """Atomically writes the bounded cache. Failures are not fatal."""
+    payload = _evict(cache)
+    tmp_file = SEARCH_CACHE_FILE.with_name(
+        f'{SEARCH_CACHE_FILE.name}.{os.getpid()}.tmp'
+    )
+    try:
+        SEARCH_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file.write_text(payload, encoding='utf-8')
+        os.replace(tmp_file, SEARCH_CACHE_FILE)
+    except OSError:
+        try:
+            tmp_file.unlink()
+        except OSError:
+            pass
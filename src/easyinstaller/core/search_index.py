@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from easyinstaller.core.config import CACHE_DIR, config
+from easyinstaller.core.http_client import http_get
+
+INDEX_FILE = CACHE_DIR / 'search-index.json'
+INDEX_VERSION = 1
+INDEX_SOURCES = ('flatpak', 'snap')
+
+# Config key holding how many days an index stays usable; 0 disables it.
+MAX_AGE_CONFIG_KEY = 'search_index_max_age_days'
+DEFAULT_MAX_AGE_DAYS = 7.0
+
+SNAP_PAGE_SIZE = 500
+SNAP_MAX_PAGES = 100
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _snap_entries(payload) -> list:
+    """Accepts both the plain list and the HAL shape of the snap API."""
+    if isinstance(payload, list):
+        return payload
+    if isinstance(payload, dict):
+        embedded = payload.get('_embedded', {})
+        packages = embedded.get('clickindex:package')
+        if isinstance(packages, list):
+            return packages
+    return []
+
+
+def fetch_flathub_catalog() -> List[Dict]:
+    """Downloads every application published on Flathub."""
+    response = http_get('flathub', '/api/v2/compat/apps', timeout=(3.05, 60))
+    response.raise_for_status()
+    apps = response.json()
+    if not isinstance(apps, list):
+        return []
+    return [
+        {
+            'id': app.get('flatpakAppId'),
+            'name': app.get('name'),
+            'summary': app.get('summary'),
+        }
+        for app in apps
+        if isinstance(app, dict) and app.get('flatpakAppId')
+    ]
+
+
+def fetch_snap_catalog() -> List[Dict]:
+    """Downloads the snap catalog page by page."""
+    entries: List[Dict] = []
+    seen = set()
+    for page in range(1, SNAP_MAX_PAGES + 1):
+        response = http_get(
+            'snapcraft',
+            '/api/v1/snaps/search',
+            params={'q': '', 'size': SNAP_PAGE_SIZE, 'page': page},
+            timeout=(3.05, 60),
+        )
+        response.raise_for_status()
+        snaps = _snap_entries(response.json())
+        for snap in snaps:
+            if not isinstance(snap, dict):
+                continue
+            name = (snap.get('package_name') or snap.get('name') or '').split(
+                '.'
+            )[0]
+            if name and name not in seen:
+                seen.add(name)
+                entries.append(
+                    {'id': name, 'name': name, 'summary': snap.get('summary')}
+                )
+        if len(snaps) < SNAP_PAGE_SIZE:
+            break
+    return entries
+
+
+CATALOG_FETCHERS: Dict[str, Callable[[], List[Dict]]] = {
+    'flatpak': fetch_flathub_catalog,
+    'snap': fetch_snap_catalog,
+}
+
+
+def build_source_index(entries: Iterable[Dict]) -> Dict:
+    """
+    Builds the stored form of one catalog: compact [id, name, summary]
+    rows plus a sorted token list with the rows each token appears in.
+    """
+    rows: List[List[str]] = []
+    postings: Dict[str, List[int]] = {}
+    for entry in entries:
+        row = [
+            entry.get('id') or '',
+            entry.get('name') or entry.get('id') or '',
+            entry.get('summary') or '',
+        ]
+        position = len(rows)
+        rows.append(row)
+        for token in set(tokenize(' '.join(row))):
+            postings.setdefault(token, []).append(position)
+
+    tokens = sorted(postings)
+    return {
+        'updated': time.time(),
+        'rows': rows,
+        'tokens': tokens,
+        'postings': [postings[token] for token in tokens],
+    }
+
+
+class SearchIndex:
+    """Read-only view over the stored catalog index."""
+
+    def __init__(self, sources: Dict[str, Dict]):
+        self._sources = sources
+
+    def updated(self, source: str) -> Optional[float]:
+        data = self._sources.get(source)
+        return data.get('updated') if data else None
+
+    def size(self, source: str) -> int:
+        data = self._sources.get(source)
+        return len(data['rows']) if data else 0
+
+    def is_fresh(self, source: str, max_age: float) -> bool:
+        updated = self.updated(source)
+        if updated is None or max_age <= 0:
+            return False
+        return time.time() - updated <= max_age
+
+    def _rows_with_prefix(self, data: Dict, prefix: str) -> set:
+        tokens = data['tokens']
+        matches: set = set()
+        position = bisect_left(tokens, prefix)
+        while position < len(tokens) and tokens[position].startswith(prefix):
+            matches.update(data['postings'][position])
+            position += 1
+        return matches
+
+    def search(self, source: str, query: str) -> List[Dict]:
+        """
+        Returns the entries in which every query token prefixes some token
+        of the id, name or summary.
+        """
+        data = self._sources.get(source)
+        query_tokens = tokenize(query)
+        if not data or not query_tokens:
+            return []
+
+        matches: Optional[set] = None
+        for token in sorted(set(query_tokens), key=len, reverse=True):
+            rows = self._rows_with_prefix(data, token)
+            matches = rows if matches is None else matches & rows
+            if not matches:
+                return []
+
+        return [
+            {
+                'id': data['rows'][position][0],
+                'name': data['rows'][position][1],
+                'summary': data['rows'][position][2],
+                'source': source,
+            }
+            for position in sorted(matches)
+        ]
+
+
+_loaded: Dict[str, object] = {}
+
+
+def load_search_index() -> Optional[SearchIndex]:
+    """Loads the index from disk, reusing it while the file is unchanged."""
+    try:
+        mtime = os.stat(INDEX_FILE).st_mtime_ns
+    except OSError:
+        return None
+    if _loaded.get('key') == (str(INDEX_FILE), mtime):
+        return _loaded['index']
+
+    try:
+        data = json.loads(INDEX_FILE.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(data, dict) or data.get('version') != INDEX_VERSION:
+        return None
+
+    index = SearchIndex(data.get('sources') or {})
+    _loaded.update(key=(str(INDEX_FILE), mtime), index=index)
+    return index
+
+
+def max_index_age() -> float:
+    """Returns the configured staleness limit in seconds."""
+    try:
+        days = float(config.get(MAX_AGE_CONFIG_KEY, DEFAULT_MAX_AGE_DAYS))
+    except (TypeError, ValueError):
+        days = DEFAULT_MAX_AGE_DAYS
+    return days * 86400
+
+
+def refresh_index(sources: Optional[Sequence[str]] = None) -> Dict[str, int]:
+    """
+    Downloads the catalogs of the given sources (all by default) and stores
+    them in the index, keeping the other sources untouched.
+    Raises requests.RequestException if a download fails.
+    """
+    selected = list(sources or INDEX_SOURCES)
+    existing: Dict[str, Dict] = {}
+    try:
+        data = json.loads(INDEX_FILE.read_text(encoding='utf-8'))
+        if isinstance(data, dict) and data.get('version') == INDEX_VERSION:
+            existing = data.get('sources') or {}
+    except (OSError, json.JSONDecodeError):
+        pass
+
+    counts = {}
+    for source in selected:
+        entries = CATALOG_FETCHERS[source]()
+        existing[source] = build_source_index(entries)
+        counts[source] = len(entries)
+
+    INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = INDEX_FILE.with_name(f'{INDEX_FILE.name}.{os.getpid()}.tmp')
+    tmp_file.write_text(
+        json.dumps(
+            {'version': INDEX_VERSION, 'sources': existing},
+            separators=(',', ':'),
+        ),
+        encoding='utf-8',
+    )
+    os.replace(tmp_file, INDEX_FILE)
+    return counts
@@ -1,49 +1,247 @@
-import subprocess
-from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import queue
+from itertools import islice
+from typing import Callable, Iterator
+from urllib.parse import quote
 
 import requests
 
+from easyinstaller.core import aio
+from easyinstaller.core.apt_lists import load_name_index
+from easyinstaller.core.http_client import http_get
+from easyinstaller.core.ranking import DEFAULT_LIMIT, rank_results
+from easyinstaller.core.search_cache import (
+    cached_results,
+    load_search_cache,
+    normalize_query,
+    save_search_cache,
+    store_results,
+)
+from easyinstaller.core.search_index import (
+    INDEX_SOURCES,
+    load_search_index,
+    max_index_age,
+)
 from easyinstaller.i18n.i18n import _
 
+# apt matches are streamed prefix matches first, so the best ones are
+# kept when a short query matches thousands of names.
+APT_RESULT_LIMIT = 200
 
-def unified_search(query: str) -> list[dict]:
-    """Performs a search across apt, flathub, and snapcraft in parallel and sorts by relevance."""
-    with ThreadPoolExecutor() as executor:
-        futures = [
-            executor.submit(search_apt, query),
-            executor.submit(search_flathub, query),
-            executor.submit(search_snap, query),
-        ]
+# Seconds a backend may take before its results are given up on, so one
+# slow API cannot hold back the others.
+BACKEND_DEADLINES = {'apt': 10.0, 'flatpak': 12.0, 'snap': 12.0}
+DEFAULT_DEADLINE = 12.0
+
+# Searches `search_many` runs at once; each queries every backend.
+MAX_PARALLEL_QUERIES = 4
+
+
+def _indexed_search(source: str):
+    """
+    Returns a search function answering from the local catalog index while
+    it is fresh, or None when the live API has to be queried.
+    """
+    index = load_search_index()
+    if index is not None and index.is_fresh(source, max_index_age()):
+        return lambda query: index.search(source, query)
+    return None
+
+
+async def search_backends(
+    query: str,
+    emit: Callable[[str, list[dict] | None], None],
+    use_cache: bool,
+    cache: dict,
+    deadlines: dict[str, float] | None = None,
+) -> bool:
+    """
+    Queries every backend for `query` on the shared event loop, calling
+    `emit(source, results)` as soon as each one answers; `results` is None
+    when a backend fails or misses its deadline. Cached and indexed sources
+    are emitted first. Returns True when `cache` was changed.
+    """
+    deadlines = {**BACKEND_DEADLINES, **(deadlines or {})}
+    live_backends = {
+        'apt': search_apt,
+        'flatpak': search_flathub,
+        'snap': search_snap,
+    }
+
+    cache_changed = False
+    pending = {}
+    for source, live_search in live_backends.items():
+        indexed = _indexed_search(source) if source in INDEX_SOURCES else None
+        if indexed is not None:
+            task = asyncio.ensure_future(aio.call(indexed, query))
+            pending[task] = (source, False)
+            continue
+        cached = cached_results(cache, source, query) if use_cache else None
+        if cached is not None:
+            cache_changed = True
+            emit(source, cached)
+            continue
+        task = asyncio.ensure_future(aio.call(live_search, query))
+        pending[task] = (source, True)
 
-        all_results = []
-        for future in futures:
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    while pending:
+        now = loop.time() - start
+        for task, (source, _cacheable) in list(pending.items()):
+            if deadlines.get(source, DEFAULT_DEADLINE) <= now:
+                # The executor thread cannot be interrupted; it is left to
+                # finish in the background instead of being waited for.
+                task.cancel()
+                del pending[task]
+                emit(source, None)
+        if not pending:
+            break
+
+        next_deadline = min(
+            deadlines.get(source, DEFAULT_DEADLINE)
+            for source, _cacheable in pending.values()
+        )
+        done, _not_done = await asyncio.wait(
+            pending,
+            timeout=max(next_deadline - now, 0),
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        for task in done:
+            source, cacheable = pending.pop(task)
             try:
-                all_results.extend(future.result())
+                results = task.result()
             except Exception as e:
                 # In a real app, you'd log this error
                 print(_('Error during search: {error}').format(error=e))
+                emit(source, None)
+                continue
+            # Backends report failures as an empty list; never cache those.
+            if cacheable and results:
+                store_results(cache, source, query, results)
+                cache_changed = True
+            emit(source, results)
+    return cache_changed
 
-    # Sort results by relevance
-    def sort_key(result):
-        name = result['name'].lower()
-        lower_query = query.lower()
-        if name == lower_query:
-            return (0, name)  # Exact match
-        elif name.startswith(lower_query):
-            return (1, name)  # Starts with query
-        else:
-            return (2, name)  # Contains query
 
-    all_results.sort(key=sort_key)
+def iter_search(
+    query: str,
+    use_cache: bool = True,
+    deadlines: dict[str, float] | None = None,
+    cache: dict | None = None,
+) -> Iterator[tuple[str, list[dict] | None]]:
+    """
+    Searches apt, flathub, and snapcraft in parallel, yielding
+    `(source, results)` as soon as each backend answers. Cached and indexed
+    sources come first. A backend that fails or misses its deadline (in
+    seconds, see BACKEND_DEADLINES) yields None instead of results.
 
-    return all_results
+    Live results are kept in the on-disk search cache; `use_cache=False`
+    ignores cached results but still refreshes them. Callers running
+    several searches pass one loaded `cache` and save it themselves.
+    """
+    owns_cache = cache is None
+    if owns_cache:
+        cache = load_search_cache()
+
+    answers: queue.SimpleQueue = queue.SimpleQueue()
+    finished = object()
+    future = aio.submit(
+        search_backends(
+            query,
+            lambda source, results: answers.put((source, results)),
+            use_cache,
+            cache,
+            deadlines,
+        )
+    )
+    future.add_done_callback(lambda _future: answers.put(finished))
+    try:
+        while True:
+            answer = answers.get()
+            if answer is finished:
+                break
+            yield answer
+        cache_changed = future.result()
+    finally:
+        future.cancel()
+    if owns_cache and cache_changed:
+        save_search_cache(cache)
+
+
+def unified_search(
+    query: str,
+    use_cache: bool = True,
+    limit: int | None = DEFAULT_LIMIT,
+    cache: dict | None = None,
+) -> list[dict]:
+    """
+    Performs a search across apt, flathub, and snapcraft in parallel and sorts by relevance.
+
+    Only the `limit` best ranked results are returned (all when None).
+    """
+    all_results = []
+    for _source, results in iter_search(
+        query, use_cache=use_cache, cache=cache
+    ):
+        all_results.extend(results or [])
+    return rank_results(all_results, query, limit)
+
+
+def unique_queries(queries: list[str]) -> list[str]:
+    """Drops queries that only differ in case or spacing, keeping order."""
+    seen = set()
+    unique = []
+    for query in queries:
+        key = normalize_query(query)
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(query)
+    return unique
+
+
+async def _search_many(
+    queries: list[str], use_cache: bool, cache: dict
+) -> list[list[dict]]:
+    limit = asyncio.Semaphore(MAX_PARALLEL_QUERIES)
+
+    async def collect(query: str) -> list[dict]:
+        found: list[dict] = []
+        async with limit:
+            await search_backends(
+                query,
+                lambda _source, results: found.extend(results or []),
+                use_cache,
+                cache,
+            )
+        return found
+
+    return await asyncio.gather(*(collect(query) for query in queries))
+
+
+def search_many(
+    queries: list[str], use_cache: bool = True
+) -> dict[str, list[dict]]:
+    """
+    Runs several searches at once, at most MAX_PARALLEL_QUERIES at a time
+    (each fanning out to every backend), and returns the ranked results of
+    each distinct query, in the order the queries were given.
+    """
+    queries = unique_queries(queries)
+    cache = load_search_cache()
+    found = aio.run(_search_many(queries, use_cache, cache))
+    save_search_cache(cache)
+    return {
+        query: rank_results(results, query)
+        for query, results in zip(queries, found)
+    }
 
 
 def search_flathub(query: str) -> list[dict]:
     """Searches for a package on Flathub."""
     try:
-        response = requests.get(
-            f'https://flathub.org/api/v2/compat/apps/search/{query}'
+        response = http_get(
+            'flathub', f'/api/v2/compat/apps/search/{quote(query, safe="")}'
         )
         response.raise_for_status()
         apps = response.json()
@@ -59,15 +257,15 @@ def search_flathub(query: str) -> list[dict]:
             for app in apps
             if isinstance(app, dict)
         ]
-    except requests.RequestException:
+    except (requests.RequestException, ValueError):
         return []
 
 
 def search_snap(query: str) -> list[dict]:
     """Searches for a package on Snapcraft."""
     try:
-        response = requests.get(
-            f'https://api.snapcraft.io/api/v1/snaps/search?q={query}'
+        response = http_get(
+            'snapcraft', '/api/v1/snaps/search', params={'q': query}
         )
         response.raise_for_status()
         snaps = response.json()
@@ -83,19 +281,30 @@ def search_snap(query: str) -> list[dict]:
             for snap in snaps
             if isinstance(snap, dict) and snap.get('name')
         ]
-    except requests.RequestException:
+    except (requests.RequestException, ValueError):
         return []
 
 
-def search_apt(query: str) -> list[dict]:
+def search_apt(query: str, limit: int | None = APT_RESULT_LIMIT) -> list[dict]:
+    """
+    Searches apt package names in the index built from apt's own lists,
+    stopping after `limit` matches. Falls back to apt-cache when apt has no
+    readable lists.
+    """
+    index = load_name_index()
+    if index is None:
+        return _search_apt_cache(query)
+    return list(islice(index.search(query), limit))
+
+
+def _search_apt_cache(query: str) -> list[dict]:
     """Searches for a package using apt-cache."""
     try:
-        result = subprocess.run(
-            ['apt-cache', 'search', '--names-only', query],
-            capture_output=True,
-            text=True,
-            check=True,
+        result = aio.run_process_sync(
+            ['apt-cache', 'search', '--names-only', query]
         )
+        if result.returncode != 0:
+            return []
         lines = result.stdout.strip().split('\n')
         results = []
         for line in lines:
@@ -112,5 +321,5 @@ def search_apt(query: str) -> list[dict]:
                     }
                 )
         return results
-    except (subprocess.CalledProcessError, FileNotFoundError):
+    except FileNotFoundError:
         return []
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from easyinstaller.core.config import CACHE_DIR
+from easyinstaller.core.dpkg_status import DPKG_STATUS_FILE
+
+SNAPSHOT_FILE = CACHE_DIR / 'installed.json'
+SNAPSHOT_VERSION = 1
+
+_FLATPAK_INSTALLATIONS = (
+    Path('/var/lib/flatpak'),
+    Path.home() / '.local' / 'share' / 'flatpak',
+)
+
+# Files and directories whose metadata changes whenever a manager installs,
+# removes or upgrades something. A manager is only re-scanned when one of
+# these differs from the fingerprint stored next to its cached packages.
+MANAGER_STATE_PATHS: Dict[str, tuple] = {
+    'apt': (DPKG_STATUS_FILE,),
+    'flatpak': tuple(
+        path
+        for installation in _FLATPAK_INSTALLATIONS
+        for path in (installation / '.changed', installation / 'app')
+    ),
+    'snap': (Path('/var/lib/snapd/state.json'),),
+}
+
+
+def state_fingerprint(manager: str) -> Optional[List[list]]:
+    """
+    Returns the (path, mtime, size) triples describing the backing state of
+    a manager, or None if the manager is not tracked.
+    """
+    paths = MANAGER_STATE_PATHS.get(manager)
+    if paths is None:
+        return None
+
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            fingerprint.append([str(path), None, None])
+            continue
+        fingerprint.append([str(path), stat.st_mtime_ns, stat.st_size])
+    return fingerprint
+
+
+def load_snapshot() -> Dict[str, Dict]:
+    """Loads the cached package snapshot, ignoring unreadable or old files."""
+    try:
+        data = json.loads(SNAPSHOT_FILE.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(data, dict) or data.get('version') != SNAPSHOT_VERSION:
+        return {}
+    managers = data.get('managers')
+    return managers if isinstance(managers, dict) else {}
+
+
+def save_snapshot(managers: Dict[str, Dict]) -> None:
+    """Atomically writes the package snapshot. Failures are not fatal."""
+    payload = {'version': SNAPSHOT_VERSION, 'managers': managers}
+    tmp_file = SNAPSHOT_FILE.with_name(
+        f'{SNAPSHOT_FILE.name}.{os.getpid()}.tmp'
+    )
+    try:
+        SNAPSHOT_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file.write_text(json.dumps(payload), encoding='utf-8')
+        os.replace(tmp_file, SNAPSHOT_FILE)
+    except OSError:
+        try:
+            tmp_file.unlink()
+        except OSError:
+            pass
+
+
+def cached_packages(
+    snapshot: Dict[str, Dict], manager: str, fingerprint: Optional[list]
+) -> Optional[List[Dict]]:
+    """Returns the cached packages for a manager if its state is unchanged."""
+    if fingerprint is None:
+        return None
+    entry = snapshot.get(manager)
+    if not isinstance(entry, dict):
+        return None
+    if entry.get('fingerprint') != fingerprint:
+        return None
+    packages = entry.get('packages')
+    return packages if isinstance(packages, list) else None
@@ -4,8 +4,6 @@ import sys
 from pathlib import Path
 from typing import Dict
 
-import requests
-
 # NOTE: kept compatible for str importers; `DATA_DIR` used elsewhere.
 GITHUB_REPO = 'ketteiGustavo/easyinstaller'
 DATA_DIR = Path('/usr/local/share/easyinstaller')
@@ -38,13 +36,17 @@ def get_installed_version() -> str:
     raise FileNotFoundError('VERSION file not found.')
 
 
-def fetch_latest_release_info(timeout: int = 30) -> Dict:
+def fetch_latest_release_info(timeout: float | None = None) -> Dict:
     """
     Fetches the latest release information from GitHub.
     Raises requests.exceptions.RequestException on network issues.
     """
-    api_url = f'https://api.github.com/repos/{GITHUB_REPO}/releases/latest'
-    response = requests.get(api_url, timeout=timeout)
+    # deferred: keeps `ei --version` from loading requests
+    from easyinstaller.core.http_client import http_get
+
+    response = http_get(
+        'github', f'/repos/{GITHUB_REPO}/releases/latest', timeout=timeout
+    )
     response.raise_for_status()
     return response.json()
 
@@ -1,3 +1,4 @@
+import os
 import sys
 from pathlib import Path
 
@@ -5,61 +6,120 @@ import typer
 
 from easyinstaller.core.config import config
 from easyinstaller.i18n.i18n import _, setup_i18n
+from easyinstaller.utils.lazy_group import LazyTyperGroup
 from easyinstaller.utils.update_prompt import UpdatePrompt
 
 setup_i18n(config['language'])
 
-from easyinstaller.cli import add as add_app
-from easyinstaller.cli import apt as apt_app
-from easyinstaller.cli import changelog as changelog_app
-from easyinstaller.cli import completion as completion_app
-from easyinstaller.cli import config as config_app
-from easyinstaller.cli import export as export_app
-from easyinstaller.cli import favorites as favorites_app
-from easyinstaller.cli import flatpak as flatpak_app
-from easyinstaller.cli import hist as hist_app
-from easyinstaller.cli import import_app
-from easyinstaller.cli import license as license_app
-from easyinstaller.cli import list as list_app
-from easyinstaller.cli import remove as rm_app
-from easyinstaller.cli import snap as snap_app
-from easyinstaller.cli import uninstall as uninstall_app
-from easyinstaller.cli import update as update_app
+# Mirrors easyinstaller.core.runner.NON_INTERACTIVE_ENV; the runner is not
+# imported here to keep startup light.
+NON_INTERACTIVE_ENV = 'EI_NON_INTERACTIVE'
+
+COMMANDS = {
+    'add': (
+        'easyinstaller.cli.add',
+        _('Searches for and installs packages from apt, flatpak, and snap.'),
+    ),
+    'rm': (
+        'easyinstaller.cli.remove',
+        _('Finds and removes an installed package by its exact name.'),
+    ),
+    'list': (
+        'easyinstaller.cli.list',
+        _(
+            'Lists all installed packages, with an option to filter by manager.'
+        ),
+    ),
+    'export': (
+        'easyinstaller.cli.export',
+        _('Exports lists of applications or full system setups to JSON.'),
+    ),
+    'import': (
+        'easyinstaller.cli.import_app',
+        _('Installs packages from a previously exported JSON file.'),
+    ),
+    'hist': (
+        'easyinstaller.cli.hist',
+        _(
+            'Displays the history of packages installed and removed by easyinstaller.'
+        ),
+    ),
+    'undo': (
+        'easyinstaller.cli.rollback',
+        _('Undoes the last operations recorded in the history.'),
+    ),
+    'rollback': (
+        'easyinstaller.cli.rollback',
+        _(
+            'Undoes the last operations, or every operation since a point in time.'
+        ),
+    ),
+    'config': (
+        'easyinstaller.cli.config',
+        _('Manages EasyInstaller configuration.'),
+    ),
+    'favorites': (
+        'easyinstaller.cli.favorites',
+        _('Manage and export your favorite applications.'),
+    ),
+    'uninstall': (
+        'easyinstaller.cli.uninstall',
+        _('Uninstalls the easyinstaller (ei) application from the system.'),
+    ),
+    'apt': ('easyinstaller.cli.apt', _('Install a package using APT.')),
+    'flatpak': (
+        'easyinstaller.cli.flatpak',
+        _('Install a package using Flatpak.'),
+    ),
+    'snap': ('easyinstaller.cli.snap', _('Install a package using Snap.')),
+    'index': (
+        'easyinstaller.cli.index',
+        _('Manages the local search index of Flathub and Snap catalogs.'),
+    ),
+    'license': (
+        'easyinstaller.cli.license',
+        _('Displays the easyinstaller license information.'),
+    ),
+    'completion': (
+        'easyinstaller.cli.completion',
+        _('Manages shell completion for easyinstaller.'),
+    ),
+    'changelog': (
+        'easyinstaller.cli.changelog',
+        _('Shows recent commits grouped by conventional commit type.'),
+    ),
+    'news': (
+        'easyinstaller.cli.changelog',
+        _('Shows recent commits grouped by conventional commit type.'),
+    ),
+    'update': (
+        'easyinstaller.cli.update',
+        _('Checks for and installs updates for easyinstaller.'),
+    ),
+}
+
+ALIASES = {
+    'fp': 'flatpak',
+    'sp': 'snap',
+}
+
+
+class EasyInstallerGroup(LazyTyperGroup):
+    lazy_commands = COMMANDS
+    aliases = ALIASES
+
 
 app = typer.Typer(
     name='ei',
     help=_(
         '[bold green]EasyInstaller[/bold green]: A universal package manager for Linux, simplifying apt, flatpak, and snap.'
     ),
+    cls=EasyInstallerGroup,
     add_completion=False,
     rich_markup_mode='rich',
     no_args_is_help=True,
 )
 
-app.add_typer(add_app.app, name='add')
-app.add_typer(rm_app.app, name='rm')
-app.add_typer(list_app.app, name='list')
-app.add_typer(export_app.app, name='export')
-app.add_typer(import_app.app, name='import')
-app.add_typer(hist_app.app, name='hist')
-app.add_typer(config_app.app, name='config')
-app.add_typer(favorites_app.app, name='favorites')
-app.add_typer(uninstall_app.app, name='uninstall')
-app.add_typer(apt_app.app, name='apt')
-app.add_typer(flatpak_app.app, name='flatpak')
-app.add_typer(snap_app.app, name='snap')
-app.add_typer(license_app.app, name='license')
-app.add_typer(completion_app.app, name='completion')
-app.add_typer(changelog_app.app, name='changelog')
-app.add_typer(changelog_app.app, name='news')
-app.add_typer(update_app.app, name='update')
-
-
-ALIASES = {
-    'fp': 'flatpak',
-    'sp': 'snap',
-}
-
 _update_prompt = UpdatePrompt()
 
 
@@ -93,12 +153,23 @@ def main(
         '-V',
         help=_('Show EasyInstaller version and exit.'),
     ),
+    non_interactive: bool = typer.Option(
+        False,
+        '--non-interactive',
+        help=_(
+            'Run package manager commands without prompts, TTY or spinner (also set by {env}=1).'
+        ).format(env=NON_INTERACTIVE_ENV),
+    ),
 ):
     """A universal installation manager for Linux."""
     if version:
         typer.echo(_resolve_version())
         raise typer.Exit()
 
+    if non_interactive:
+        # Exported so commands run from worker threads see it as well.
+        os.environ[NON_INTERACTIVE_ENV] = '1'
+
     _update_prompt.begin()
 
     # schedule update notification after the command finishes
@@ -110,7 +181,4 @@ def main(
 
 
 if __name__ == '__main__':
-    if len(sys.argv) > 1 and sys.argv[1] in ALIASES:
-        sys.argv[1] = ALIASES[sys.argv[1]]
-    _update_prompt.begin()
     app()
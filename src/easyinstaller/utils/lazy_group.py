@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import importlib
+from typing import Dict, List, Optional, Tuple
+
+import click
+import typer
+from typer.core import TyperGroup
+
+
+class LazyTyperGroup(TyperGroup):
+    """
+    Typer group that only imports the module of the subcommand being invoked.
+
+    Subclasses declare `lazy_commands` as a mapping of command name to a
+    `(module_path, help_text)` tuple. Each module must expose a Typer `app`.
+    Help listings are rendered from the static registry, so `ei --help` does
+    not import any subcommand module either.
+    """
+
+    lazy_commands: Dict[str, Tuple[str, str]] = {}
+    aliases: Dict[str, str] = {}
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._listing_help = False
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        # Resolved lazy commands are cached in `self.commands`; keep the
+        # registry order regardless of which ones were already imported.
+        eager = [
+            name
+            for name in super().list_commands(ctx)
+            if name not in self.lazy_commands
+        ]
+        return eager + list(self.lazy_commands)
+
+    def resolve_alias(self, cmd_name: str) -> str:
+        return self.aliases.get(cmd_name, cmd_name)
+
+    def get_command(
+        self, ctx: click.Context, cmd_name: str
+    ) -> Optional[click.Command]:
+        cmd_name = self.resolve_alias(cmd_name)
+        if cmd_name in self.commands:
+            return self.commands[cmd_name]
+
+        entry = self.lazy_commands.get(cmd_name)
+        if entry is None:
+            return None
+
+        module_path, help_text = entry
+        if self._listing_help:
+            # Lightweight placeholder, only used to render the commands panel.
+            return click.Command(name=cmd_name, help=help_text)
+
+        module = importlib.import_module(module_path)
+        command = typer.main.get_group(module.app)
+        command.name = cmd_name
+        self.commands[cmd_name] = command
+        return command
+
+    def format_help(
+        self, ctx: click.Context, formatter: click.HelpFormatter
+    ) -> None:
+        self._listing_help = True
+        try:
+            return super().format_help(ctx, formatter)
+        finally:
+            self._listing_help = False
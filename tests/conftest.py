@@ -1,8 +1,97 @@
+import json
 import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlparse
+
+import pytest
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 SRC_DIR = ROOT_DIR / 'src'
 
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
+
+
+@pytest.fixture(autouse=True)
+def isolated_snapshot(tmp_path, monkeypatch):
+    """Keeps the installed-package snapshot cache out of the real HOME."""
+    from easyinstaller.core import snapshot
+
+    monkeypatch.setattr(
+        snapshot, 'SNAPSHOT_FILE', tmp_path / 'cache' / 'installed.json'
+    )
+
+
+@pytest.fixture(autouse=True)
+def isolated_search_index(tmp_path, monkeypatch):
+    """Keeps searches away from the real indices and result cache."""
+    from easyinstaller.core import apt_lists, search_cache, search_index
+
+    monkeypatch.setattr(
+        search_index, 'INDEX_FILE', tmp_path / 'cache' / 'search-index.json'
+    )
+    monkeypatch.setattr(
+        search_cache,
+        'SEARCH_CACHE_FILE',
+        tmp_path / 'cache' / 'search-cache.json',
+    )
+    monkeypatch.setattr(
+        apt_lists, 'APT_NAME_INDEX_FILE', tmp_path / 'cache' / 'apt-names.tsv'
+    )
+
+
+@pytest.fixture(autouse=True)
+def isolated_history_index(tmp_path, monkeypatch):
+    """Keeps the history index out of the real cache directory."""
+    from easyinstaller.core import history_store
+
+    monkeypatch.setattr(
+        history_store,
+        'HISTORY_INDEX_FILE',
+        tmp_path / 'cache' / 'history.sqlite3',
+    )
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    routes: dict = {}
+    hits: list = []
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        self.hits.append(self.path)
+        body = self.routes.get(unquote(parsed.path))
+        if callable(body):
+            body = body(parse_qs(parsed.query))
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in(monkeypatch):
+    """Points every HTTP backend at a local JSON server."""
+    from easyinstaller.core import http_client
+
+    _StandInHandler.routes = {}
+    _StandInHandler.hits = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv(
+        http_client.BASE_URL_ENV, f'http://127.0.0.1:{server.server_port}'
+    )
+    yield _StandInHandler
+    server.shutdown()
+    server.server_close()
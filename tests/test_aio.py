@@ -0,0 +1,61 @@
+import asyncio
+import subprocess
+import threading
+
+import pytest
+
+from easyinstaller.core import aio
+
+
+def test_run_process_collects_output_and_exit_code():
+    result = aio.run_process_sync(
+        ['/bin/sh', '-c', 'echo out; echo err >&2; exit 3']
+    )
+    assert result == aio.ProcessResult(3, 'out\n', 'err\n')
+
+
+def test_run_process_kills_commands_past_their_timeout():
+    with pytest.raises(asyncio.TimeoutError):
+        aio.run_process_sync(['sleep', '5'], timeout=0.2)
+
+
+def test_run_process_writes_to_files(tmp_path):
+    log_file = tmp_path / 'out.log'
+    with open(log_file, 'w') as handle:
+        aio.run_process_sync(
+            ['/bin/sh', '-c', 'echo a; echo b >&2'],
+            stdout=handle,
+            stderr=subprocess.STDOUT,
+        )
+    assert sorted(log_file.read_text().split()) == ['a', 'b']
+
+
+def test_gather_calls_runs_blocking_functions_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def wait_for_peer():
+        barrier.wait()
+        return 'ok'
+
+    def broken():
+        raise ValueError('bad')
+
+    results = aio.run(
+        aio.gather_calls({'a': wait_for_peer, 'b': wait_for_peer, 'c': broken})
+    )
+
+    assert results['a'] == results['b'] == 'ok'
+    assert isinstance(results['c'], ValueError)
+
+
+def test_everything_shares_one_loop():
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    assert aio.run(current_loop()) is aio.get_loop()
+
+    async def nested():
+        aio.run(current_loop())
+
+    with pytest.raises(RuntimeError):
+        aio.run(nested())
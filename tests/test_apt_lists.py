@@ -0,0 +1,125 @@
+import gzip
+import os
+import time
+from unittest.mock import patch
+
+import easyinstaller.core.searcher as searcher
+from easyinstaller.core.apt_lists import (
+    build_name_index,
+    load_name_index,
+    package_list_files,
+)
+
+MAIN_PACKAGES = (
+    'Package: vim-tiny\n'
+    'Version: 2:9.1\n'
+    'Description: Vi IMproved - enhanced vi editor - compact version\n'
+    ' Vim is an almost compatible version of the UNIX editor Vi.\n'
+    '\n'
+    'Package: vim\n'
+    'Version: 2:9.1\n'
+    'Description: Vi IMproved - enhanced vi editor\n'
+    '\n'
+    'Package: neovim\n'
+    'Version: 0.9.5\n'
+    'Description: heavily refactored vim fork\n'
+)
+UNIVERSE_PACKAGES = (
+    'Package: vim\n'
+    'Description: duplicate from another suite\n'
+    '\n'
+    'Package: libvimcore0\n'
+    'Description: shared library\n'
+)
+
+
+def _lists(tmp_path):
+    lists = tmp_path / 'lists'
+    lists.mkdir()
+    (lists / 'archive_dists_noble_main_binary-amd64_Packages').write_text(
+        MAIN_PACKAGES
+    )
+    with gzip.open(
+        lists / 'archive_dists_noble_universe_binary-amd64_Packages.gz', 'wt'
+    ) as handle:
+        handle.write(UNIVERSE_PACKAGES)
+    (lists / 'archive_dists_noble_InRelease').write_text('ignored')
+    (lists / 'archive_dists_noble_main_binary-amd64_Packages.lz4').write_text(
+        'unsupported'
+    )
+    return lists
+
+
+def test_package_list_files_skips_unreadable_formats(tmp_path):
+    names = [p.name for p in package_list_files(_lists(tmp_path))]
+    assert names == [
+        'archive_dists_noble_main_binary-amd64_Packages',
+        'archive_dists_noble_universe_binary-amd64_Packages.gz',
+    ]
+
+
+def test_search_streams_prefix_matches_first(tmp_path):
+    index = load_name_index(_lists(tmp_path))
+
+    assert len(index) == 4
+    assert [r['name'] for r in index.search('vim')] == [
+        'vim',
+        'vim-tiny',
+        'libvimcore0',
+        'neovim',
+    ]
+    assert next(index.search('VIM')) == {
+        'id': 'vim',
+        'name': 'vim',
+        'summary': 'Vi IMproved - enhanced vi editor',
+        'source': 'apt',
+    }
+    assert [r['name'] for r in index.search('^neo')] == ['neovim']
+    assert list(index.search('[')) == []
+
+
+def test_index_is_reused_until_lists_change(tmp_path):
+    lists = _lists(tmp_path)
+    load_name_index(lists)
+
+    with patch('easyinstaller.core.apt_lists.build_name_index') as build_mock:
+        load_name_index(lists)
+    build_mock.assert_not_called()
+
+    packages = lists / 'archive_dists_noble_main_binary-amd64_Packages'
+    packages.write_text(MAIN_PACKAGES + '\nPackage: vim-gtk3\n')
+    later = time.time() + 10
+    os.utime(packages, (later, later))
+    assert [r['name'] for r in load_name_index(lists).search('vim-')] == [
+        'vim-gtk3',
+        'vim-tiny',
+    ]
+
+
+def test_search_apt_limits_results_without_forking(tmp_path):
+    lists = _lists(tmp_path)
+    with patch.object(
+        searcher, 'load_name_index', lambda: load_name_index(lists)
+    ), patch.object(searcher.aio, 'run_process_sync') as run_mock:
+        results = searcher.search_apt('vim', limit=2)
+
+    assert [r['name'] for r in results] == ['vim', 'vim-tiny']
+    run_mock.assert_not_called()
+
+
+def test_search_apt_falls_back_to_apt_cache_without_lists(tmp_path):
+    assert build_name_index(tmp_path / 'missing') is None
+    with patch.object(
+        searcher, 'load_name_index', return_value=None
+    ), patch.object(searcher.aio, 'run_process_sync') as run_mock:
+        run_mock.return_value = searcher.aio.ProcessResult(
+            0, 'vim - Vi IMproved\n'
+        )
+        results = searcher.search_apt('vim')
+
+    assert results[0]['name'] == 'vim'
+    assert run_mock.call_args[0][0][:3] == [
+        'apt-cache',
+        'search',
+        '--names-only',
+    ]
@@ -0,0 +1,153 @@
+import os
+from unittest.mock import patch
+
+import easyinstaller.core.artifact_cache as artifact_cache
+import easyinstaller.core.package_handler as ph
+from easyinstaller.core.aio import ProcessResult
+
+PRINT_URIS = (
+    "'http://deb.debian.org/debian/pool/main/v/vim/vim_9.0_amd64.deb' "
+    'vim_2%3a9.0_amd64.deb 1610000 SHA256:aa\n'
+    "'http://deb.debian.org/debian/pool/main/x/xxd/xxd_9.0_amd64.deb' "
+    'xxd_2%3a9.0_amd64.deb 84000 SHA256:bb\n'
+)
+
+
+def _fake_archives(tmp_path, monkeypatch):
+    archives = tmp_path / 'archives'
+    archives.mkdir()
+    monkeypatch.setattr(artifact_cache, 'APT_ARCHIVES_DIR', archives)
+    return archives
+
+
+def test_apt_archive_names_reads_print_uris():
+    with patch.object(
+        artifact_cache.aio,
+        'run_process_sync',
+        return_value=ProcessResult(0, PRINT_URIS),
+    ) as run_mock:
+        names = artifact_cache.apt_archive_names(['vim'])
+
+    assert names == ['vim_2%3a9.0_amd64.deb', 'xxd_2%3a9.0_amd64.deb']
+    assert '--print-uris' in run_mock.call_args.args[0]
+
+
+def test_store_then_seed_reuses_cached_debs(tmp_path, monkeypatch):
+    archives = _fake_archives(tmp_path, monkeypatch)
+    cache = tmp_path / 'cache'
+    (archives / 'vim_9.0_amd64.deb').write_bytes(b'deb')
+
+    added = artifact_cache.store_apt_archives(
+        ['vim_9.0_amd64.deb', 'xxd_9.0_amd64.deb'], root=cache
+    )
+
+    assert added == 1
+    assert (cache / 'apt' / 'vim_9.0_amd64.deb').read_bytes() == b'deb'
+    # Already in apt's archives: nothing to copy.
+    assert (
+        artifact_cache.seed_apt_command(['vim_9.0_amd64.deb'], root=cache)
+        is None
+    )
+
+    (archives / 'vim_9.0_amd64.deb').unlink()
+    cmd = artifact_cache.seed_apt_command(
+        ['vim_9.0_amd64.deb', 'xxd_9.0_amd64.deb'], root=cache
+    )
+    assert cmd == (
+        'sudo cp --reflink=auto --preserve=timestamps '
+        f"-t {archives} {cache / 'apt' / 'vim_9.0_amd64.deb'}"
+    )
+
+
+def test_evict_drops_least_recently_used_debs_first(tmp_path):
+    apt_dir = tmp_path / 'apt'
+    apt_dir.mkdir()
+    for age, name in enumerate(['new.deb', 'mid.deb', 'old.deb']):
+        path = apt_dir / name
+        path.write_bytes(b'x' * 100)
+        os.utime(path, (1000 - age * 100, 1000 - age * 100))
+
+    artifact_cache.evict(tmp_path, max_bytes=200)
+
+    assert sorted(p.name for p in apt_dir.iterdir()) == ['mid.deb', 'new.deb']
+
+
+def test_prefetch_uses_artifact_cache(tmp_path, monkeypatch):
+    archives = _fake_archives(tmp_path, monkeypatch)
+    cache = tmp_path / 'cache'
+    (cache / 'apt').mkdir(parents=True)
+    (cache / 'apt' / 'vim_9.0_amd64.deb').write_bytes(b'cached')
+    (cache / 'flatpak' / '.ostree' / 'repo').mkdir(parents=True)
+    commands = []
+
+    def fake_run(cmd, log_path=None, progress=None):
+        commands.append(cmd)
+        if '--download-only' in cmd:
+            (archives / 'xxd_9.0_amd64.deb').write_bytes(b'new')
+        return 0
+
+    with patch.object(
+        ph, 'config', {'log_dir': str(tmp_path / 'logs')}
+    ), patch.object(
+        artifact_cache, 'config', {'artifact_cache': str(cache)}
+    ), patch.object(
+        ph, 'get_native_manager_type', return_value='apt'
+    ), patch.object(
+        ph.shutil, 'which', return_value='/usr/bin/flatpak'
+    ), patch.object(
+        artifact_cache,
+        'apt_archive_names',
+        return_value=['vim_9.0_amd64.deb', 'xxd_9.0_amd64.deb'],
+    ), patch.object(
+        ph, 'run_cmd_smart', side_effect=fake_run
+    ):
+        assert ph.prefetch_with_manager(['vim'], 'apt') == 0
+        assert ph.prefetch_with_manager(['org.gimp.GIMP'], 'flatpak') == 0
+
+    assert commands[0].startswith('sudo cp ')
+    assert commands[1] == 'sudo -E apt-get install -y --download-only vim'
+    assert (cache / 'apt' / 'xxd_9.0_amd64.deb').read_bytes() == b'new'
+    assert commands[2] == (
+        f"flatpak install --sideload-repo={cache / 'flatpak' / '.ostree' / 'repo'}"
+        ' -y --no-deploy flathub org.gimp.GIMP'
+    )
+
+
+def test_unwritable_cache_does_not_fail_the_install(tmp_path):
+    from easyinstaller.cli import import_app
+
+    # A file where the cache directory should be: mkdir fails even as root.
+    cache = tmp_path / 'cache'
+    cache.write_text('not a directory')
+
+    with patch.object(
+        artifact_cache, 'config', {'artifact_cache': str(cache)}
+    ), patch.object(
+        import_app,
+        'install_with_manager',
+        return_value={'org.gimp.GIMP': 'installed'},
+    ), patch.object(
+        ph, 'run_cmd_smart'
+    ) as run_mock, patch.object(
+        ph.console, 'print'
+    ) as console_mock:
+        results = import_app._install_job('flatpak', ['org.gimp.GIMP'])
+
+    assert results == {'org.gimp.GIMP': 'installed'}
+    run_mock.assert_not_called()
+    assert 'artifact cache' in console_mock.call_args.args[0]
+
+
+def test_failed_flatpak_export_only_warns(tmp_path):
+    with patch.object(
+        ph, 'config', {'log_dir': str(tmp_path / 'logs')}
+    ), patch.object(
+        artifact_cache, 'config', {'artifact_cache': str(tmp_path / 'c')}
+    ), patch.object(
+        ph, 'run_cmd_smart', return_value=1
+    ), patch.object(
+        ph.console, 'print'
+    ) as console_mock:
+        ph.cache_artifacts(['org.gimp.GIMP'], 'flatpak')
+
+    assert 'exit code 1' in console_mock.call_args.args[0]
@@ -0,0 +1,108 @@
+import os
+
+import easyinstaller.core.change_tracker as ct
+
+INSTALL_LOG = """\
+2025-10-02 21:06:51 startup archives unpack
+2025-10-02 21:06:51 install libfoo1:amd64 <none> 3.2-1
+2025-10-02 21:06:51 status half-installed libfoo1:amd64 3.2-1
+2025-10-02 21:06:51 status unpacked libfoo1:amd64 3.2-1
+2025-10-02 21:06:52 install vim:amd64 <none> 2:9.1-1
+2025-10-02 21:06:52 status unpacked vim:amd64 2:9.1-1
+2025-10-02 21:06:52 upgrade libc6:amd64 2.36-1 2.36-2
+2025-10-02 21:06:52 status installed libc6:amd64 2.36-2
+2025-10-02 21:06:53 configure libfoo1:amd64 3.2-1 <none>
+2025-10-02 21:06:53 status installed libfoo1:amd64 3.2-1
+2025-10-02 21:06:53 configure vim:amd64 2:9.1-1 <none>
+2025-10-02 21:06:53 status installed vim:amd64 2:9.1-1
+"""
+
+REMOVE_LOG = """\
+2025-10-03 09:00:00 startup packages remove
+2025-10-03 09:00:00 remove vim:amd64 2:9.1-1 <none>
+2025-10-03 09:00:00 status half-configured vim:amd64 2:9.1-1
+2025-10-03 09:00:00 status config-files vim:amd64 2:9.1-1
+2025-10-03 09:00:01 purge libfoo1:amd64 3.2-1 <none>
+2025-10-03 09:00:01 status not-installed libfoo1:amd64 <none>
+"""
+
+# vim was removed earlier and only its configuration files were left.
+REINSTALL_LOG = """\
+2025-10-04 08:00:00 startup archives unpack
+2025-10-04 08:00:00 install vim:amd64 2:9.1-1 2:9.1-1
+2025-10-04 08:00:00 status half-installed vim:amd64 2:9.1-1
+2025-10-04 08:00:00 status unpacked vim:amd64 2:9.1-1
+2025-10-04 08:00:01 configure vim:amd64 2:9.1-1 <none>
+2025-10-04 08:00:01 status installed vim:amd64 2:9.1-1
+"""
+
+
+def test_parse_dpkg_log_reports_fresh_installs_only():
+    changes = ct.parse_dpkg_log(INSTALL_LOG)
+
+    assert changes.installed == ['libfoo1', 'vim']
+    assert changes.removed == []
+
+
+def test_parse_dpkg_log_reports_reinstalls_from_config_files():
+    changes = ct.parse_dpkg_log(REINSTALL_LOG)
+
+    assert changes.installed == ['vim']
+    assert changes.removed == []
+
+
+def test_parse_dpkg_log_reports_removals_and_purges():
+    changes = ct.parse_dpkg_log(REMOVE_LOG)
+
+    assert changes.installed == []
+    assert changes.removed == ['libfoo1', 'vim']
+
+
+def test_dpkg_log_tracker_reads_only_appended_lines(tmp_path):
+    log = tmp_path / 'dpkg.log'
+    log.write_text(INSTALL_LOG)
+    listed = []
+
+    tracker = ct.DpkgLogTracker(lambda: listed.append(1), log_path=log)
+    tracker.begin()
+    with open(log, 'a') as handle:
+        handle.write(REMOVE_LOG)
+    changes = tracker.finish()
+
+    assert listed == []
+    assert changes.installed == []
+    assert changes.removed == ['libfoo1', 'vim']
+
+
+def test_dpkg_log_tracker_follows_rotation(tmp_path):
+    log = tmp_path / 'dpkg.log'
+    log.write_text('2025-10-01 00:00:00 startup archives unpack\n')
+
+    tracker = ct.DpkgLogTracker(set, log_path=log)
+    tracker.begin()
+    with open(log, 'a') as handle:
+        handle.write(INSTALL_LOG)
+    os.rename(log, tmp_path / 'dpkg.log.1')
+    log.write_text(''.join(REMOVE_LOG.splitlines(keepends=True)[:4]))
+    changes = tracker.finish()
+
+    assert changes.installed == ['libfoo1']
+    assert changes.removed == ['vim']
+
+
+def test_dpkg_log_tracker_falls_back_to_set_diff(tmp_path):
+    states = iter([{'base'}, {'base', 'vim'}])
+
+    tracker = ct.DpkgLogTracker(
+        lambda: set(next(states)), log_path=tmp_path / 'missing.log'
+    )
+    tracker.begin()
+    changes = tracker.finish()
+
+    assert changes.installed == ['vim']
+    assert changes.removed == []
+
+
+def test_tracker_for_manager_uses_set_diff_outside_apt():
+    assert isinstance(ct.tracker_for_manager('snap', set), ct.SetDiffTracker)
+    assert isinstance(ct.tracker_for_manager('apt', set), ct.DpkgLogTracker)
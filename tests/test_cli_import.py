@@ -0,0 +1,78 @@
+import json
+
+from typer.testing import CliRunner
+
+from easyinstaller.cli import import_app
+from easyinstaller.core import runner
+from easyinstaller.core.scheduler import JobResult
+
+
+def _setup_file(tmp_path):
+    setup = tmp_path / 'setup.json'
+    setup.write_text(
+        json.dumps(
+            {
+                'packages': {
+                    'flatpak': [{'name': 'GIMP', 'id': 'org.gimp.GIMP'}],
+                    'snap': [{'name': 'code'}],
+                }
+            }
+        )
+    )
+    return str(setup)
+
+
+def _fake_jobs(monkeypatch):
+    ran = []
+
+    def fake_run_manager_jobs(jobs, worker, **kwargs):
+        ran.extend((job.manager, job.packages) for job in jobs)
+        return [
+            JobResult(manager=job.manager, packages=job.packages)
+            for job in jobs
+        ]
+
+    monkeypatch.setattr(import_app, 'run_manager_jobs', fake_run_manager_jobs)
+    monkeypatch.setattr(import_app, 'prime_sudo_session', lambda: True)
+    return ran
+
+
+def test_import_asks_before_each_manager(tmp_path, monkeypatch):
+    monkeypatch.delenv(runner.NON_INTERACTIVE_ENV, raising=False)
+    ran = _fake_jobs(monkeypatch)
+
+    result = CliRunner().invoke(
+        import_app.app, [_setup_file(tmp_path), '--sequential'], input='y\nn\n'
+    )
+
+    assert result.exit_code == 0, result.output
+    assert result.output.count('Do you want to install') == 2
+    assert ran == [('flatpak', ['org.gimp.GIMP'])]
+
+
+def test_import_does_not_prompt_with_yes_or_non_interactive(
+    tmp_path, monkeypatch
+):
+    ran = _fake_jobs(monkeypatch)
+    cli = CliRunner()
+
+    monkeypatch.delenv(runner.NON_INTERACTIVE_ENV, raising=False)
+    with_yes = cli.invoke(
+        import_app.app, [_setup_file(tmp_path), '--sequential', '-y']
+    )
+    monkeypatch.setenv(runner.NON_INTERACTIVE_ENV, '1')
+    unattended = cli.invoke(
+        import_app.app, [_setup_file(tmp_path), '--sequential']
+    )
+
+    for result in (with_yes, unattended):
+        assert result.exit_code == 0, result.output
+        assert 'Do you want to install' not in result.output
+    assert (
+        ran
+        == [
+            ('flatpak', ['org.gimp.GIMP']),
+            ('snap', ['code']),
+        ]
+        * 2
+    )
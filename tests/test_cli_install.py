@@ -0,0 +1,90 @@
+from typer.testing import CliRunner
+
+from easyinstaller.cli import apt as apt_module
+
+
+def test_apt_installs_all_packages_in_one_transaction(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        apt_module,
+        'install_with_manager',
+        lambda package_names, manager: calls.append((package_names, manager)),
+    )
+
+    result = CliRunner().invoke(apt_module.app, ['vim', 'git', 'curl'])
+
+    assert result.exit_code == 0
+    assert calls == [(['vim', 'git', 'curl'], 'apt')]
+
+
+def test_apt_no_batch_installs_one_package_at_a_time(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        apt_module,
+        'install_with_manager',
+        lambda package_names, manager: calls.append((package_names, manager)),
+    )
+
+    result = CliRunner().invoke(apt_module.app, ['--no-batch', 'vim', 'git'])
+
+    assert result.exit_code == 0
+    assert calls == [('vim', 'apt'), ('git', 'apt')]
+
+
+def test_add_lists_partial_results_when_a_backend_times_out(monkeypatch):
+    from easyinstaller.cli import add as add_module
+
+    def fake_iter_search(query, use_cache=True):
+        yield 'apt', [
+            {'id': 'vlc', 'name': 'vlc', 'summary': '', 'source': 'apt'}
+        ]
+        yield 'flatpak', None
+        yield 'snap', []
+
+    installs = []
+    monkeypatch.setattr(add_module, 'iter_search', fake_iter_search)
+    monkeypatch.setattr(
+        add_module,
+        'install_with_manager',
+        lambda package_names, manager: installs.append(
+            (package_names, manager)
+        ),
+    )
+    monkeypatch.setattr(add_module, 'prime_sudo_session', lambda: None)
+
+    result = CliRunner().invoke(add_module.app, ['vlc'])
+
+    assert result.exit_code == 0
+    assert 'No answer from flatpak' in result.output
+    assert installs == [(['vlc'], 'apt')]
+
+
+def test_add_prompts_for_each_query_in_argument_order(monkeypatch):
+    from easyinstaller.cli import add as add_module
+
+    def fake_search_many(queries, use_cache=True):
+        # Results may complete in any order; prompts must not.
+        return {
+            query: [
+                {'id': f'{query}-{n}', 'name': f'{query}-{n}', 'source': 'apt'}
+                for n in range(2)
+            ]
+            for query in reversed(queries)
+        }
+
+    prompted = []
+    monkeypatch.setattr(add_module, 'search_many', fake_search_many)
+    monkeypatch.setattr(
+        add_module,
+        'ask_user_to_select_packages',
+        lambda results: prompted.append(results[0]['name']) or results[:1],
+    )
+    monkeypatch.setattr(
+        add_module, 'install_with_manager', lambda package_names, manager: None
+    )
+    monkeypatch.setattr(add_module, 'prime_sudo_session', lambda: None)
+
+    result = CliRunner().invoke(add_module.app, ['vlc', 'gimp', 'VLC', 'obs'])
+
+    assert result.exit_code == 0
+    assert prompted == ['vlc-0', 'gimp-0', 'obs-0']
@@ -21,6 +21,9 @@ def reload_config(tmp_path, monkeypatch):
     reloaded = importlib.reload(config_mod)
     yield reloaded
 
+    # Reload against the real HOME again, or the lazily loaded config seen
+    # by other modules would keep pointing at the temporary one.
+    monkeypatch.undo()
     importlib.reload(config_mod)
 
 
@@ -37,3 +40,39 @@ def test_get_config_persists_aliases(reload_config):
 
     assert stored['log_dir'] == cfg['log_path']
     assert stored['export_dir'] == cfg['export_path']
+
+
+def test_import_does_no_io(reload_config):
+    config_mod = reload_config
+
+    assert not config_mod.CONFIG_FILE.exists()
+    assert not config_mod.DATA_DIR.exists()
+
+
+def test_config_is_written_only_when_it_changes(reload_config, monkeypatch):
+    config_mod = reload_config
+    config_mod.get_config()
+    stored_inode = config_mod.CONFIG_FILE.stat().st_ino
+
+    importlib.reload(config_mod)
+    writes = []
+    monkeypatch.setattr(config_mod, '_write_config', writes.append)
+    assert config_mod.config['language'] == 'en_US'
+    config_mod.set_config_value('language', 'en_US')
+
+    assert writes == []
+    assert config_mod.CONFIG_FILE.stat().st_ino == stored_inode
+    # Directories are created by the code that writes into them.
+    assert not config_mod.LOG_DIR.exists()
+
+
+def test_set_config_value_updates_the_read_only_view(reload_config):
+    config_mod = reload_config
+
+    config_mod.set_config_value('preferred_source', 'flatpak')
+
+    assert config_mod.config['preferred_source'] == 'flatpak'
+    with pytest.raises(TypeError):
+        config_mod.load_config()['preferred_source'] = 'snap'
+    stored = json.loads(config_mod.CONFIG_FILE.read_text(encoding='utf-8'))
+    assert stored['preferred_source'] == 'flatpak'
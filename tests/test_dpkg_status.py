@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import shutil
+import time
+from unittest.mock import patch
+
+import pytest
+
+import easyinstaller.core.dpkg_status as dpkg_status
+import easyinstaller.core.lister as lister
+
+STATUS = """\
+Package: vim
+Status: install ok installed
+Priority: optional
+Section: editors
+Installed-Size: 4096
+Architecture: amd64
+Version: 2:9.1.0016-1
+Description: Vi IMproved
+ Vim is an almost compatible version of the UNIX editor Vi.
+ .
+ Many new features have been added.
+
+Package: old-tool
+Status: deinstall ok config-files
+Priority: optional
+Section: utils
+Installed-Size: 12
+Architecture: amd64
+Version: 1.0
+
+Package: purged
+Status: purge ok not-installed
+Architecture: amd64
+
+Package: libfoo1
+Status: install ok installed
+Priority: optional
+Section: libs
+Installed-Size: 2048
+Architecture: amd64
+Version: 3.2-1
+"""
+
+EXTENDED_STATES = """\
+Package: libfoo1
+Architecture: amd64
+Auto-Installed: 1
+
+Package: vim
+Architecture: amd64
+Auto-Installed: 0
+"""
+
+
+@pytest.fixture
+def dpkg_files(tmp_path):
+    status = tmp_path / 'status'
+    status.write_text(STATUS)
+    extended_states = tmp_path / 'extended_states'
+    extended_states.write_text(EXTENDED_STATES)
+    with patch.object(lister, 'DPKG_STATUS_FILE', status), patch.object(
+        lister, 'APT_EXTENDED_STATES_FILE', extended_states
+    ):
+        yield status, extended_states
+
+
+def test_list_apt_packages_reads_status_database(dpkg_files):
+    with patch('easyinstaller.core.lister.subprocess.run') as run_mock:
+        packages = lister.list_apt_packages()
+
+    run_mock.assert_not_called()
+    assert packages == [
+        {
+            'name': 'vim',
+            'version': '2:9.1.0016-1',
+            'size': '4.00 MB',
+            'source': 'apt',
+            'section': 'editors',
+            'priority': 'optional',
+        },
+        {
+            'name': 'old-tool',
+            'version': '1.0',
+            'size': '0.01 MB',
+            'source': 'apt',
+            'section': 'utils',
+            'priority': 'optional',
+        },
+        {
+            'name': 'libfoo1',
+            'version': '3.2-1',
+            'size': '2.00 MB',
+            'source': 'apt',
+            'section': 'libs',
+            'priority': 'optional',
+        },
+    ]
+
+
+def test_installed_and_manual_sets_use_status_database(dpkg_files):
+    with patch('easyinstaller.core.lister.subprocess.run') as run_mock:
+        installed = lister.get_installed_apt_packages_set()
+        manual = lister.get_manual_apt_packages_set()
+
+    run_mock.assert_not_called()
+    # old-tool was removed and only left its configuration files.
+    assert installed == {'vim', 'libfoo1'}
+    assert manual == {'vim'}
+
+
+def test_manual_set_without_extended_states(dpkg_files, tmp_path):
+    status, _ = dpkg_files
+    assert dpkg_status.read_manual_packages(status, tmp_path / 'missing') == {
+        'vim',
+        'libfoo1',
+    }
+
+
+def test_manual_set_falls_back_to_apt_mark(tmp_path):
+    completed = type('Completed', (), {'stdout': 'vim\ngit\n'})()
+    with patch.object(lister, 'DPKG_STATUS_FILE', tmp_path / 'missing'), patch(
+        'easyinstaller.core.lister.subprocess.run', return_value=completed
+    ) as run_mock:
+        assert lister.get_manual_apt_packages_set() == {'vim', 'git'}
+
+    assert run_mock.call_args.args[0] == ['apt-mark', 'showmanual']
+
+
+def test_iter_stanzas_across_chunks_and_continuation_lines(
+    tmp_path, monkeypatch
+):
+    status = tmp_path / 'status'
+    status.write_text(
+        'Package: a\nDescription: x\n Package: not-a-field\n'
+        'Version:  1.0 \n\n\n\nPackage: b\nConffiles:\n /etc/b 0\n'
+        'Version: 2'
+    )
+    monkeypatch.setattr(dpkg_status, 'STANZA_CHUNK', 7)
+
+    wanted = list(dpkg_status.iter_stanzas(status, ('Package', 'Version')))
+    everything = list(dpkg_status.iter_stanzas(status))
+
+    assert wanted == [
+        {'Package': 'a', 'Version': '1.0'},
+        {'Package': 'b', 'Version': '2'},
+    ]
+    assert everything[1] == {'Package': 'b', 'Conffiles': '', 'Version': '2'}
+
+
+def _synthetic_status(count: int) -> str:
+    stanza = (
+        'Package: pkg{i}\n'
+        'Status: install ok installed\n'
+        'Priority: optional\n'
+        'Section: utils\n'
+        'Installed-Size: {size}\n'
+        'Maintainer: Example <dev@example.org>\n'
+        'Architecture: amd64\n'
+        'Version: 1.{i}-1\n'
+        'Depends: libc6 (>= 2.34), libfoo1 (>= 3.2)\n'
+        'Description: synthetic package {i}\n'
+        ' A long description line that dpkg-query never needs to print.\n'
+        ' .\n'
+        ' Another continuation line.\n'
+    )
+    return '\n'.join(stanza.format(i=i, size=100 + i) for i in range(count))
+
+
+@pytest.mark.skipif(
+    shutil.which('dpkg-query') is None, reason='dpkg-query not available'
+)
+def test_benchmark_native_parser_against_dpkg_query(tmp_path):
+    (tmp_path / 'status').write_text(_synthetic_status(10_000))
+
+    def best_of(runs, func):
+        # The fastest run is the least disturbed by other processes.
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            result = func()
+            timings.append(time.perf_counter() - start)
+        return result, min(timings)
+
+    with patch.object(lister, 'DPKG_STATUS_FILE', tmp_path / 'status'):
+        native, native_elapsed = best_of(5, lister.list_apt_packages)
+    forked, forked_elapsed = best_of(
+        5, lambda: lister._list_apt_packages_dpkg_query(admindir=str(tmp_path))
+    )
+
+    print(
+        f'\n10k packages: native {native_elapsed * 1000:.1f} ms, '
+        f'dpkg-query {forked_elapsed * 1000:.1f} ms'
+    )
+    assert len(native) == 10_000
+    # dpkg-query sorts by name, the status file is read in storage order.
+    assert sorted(native, key=lambda p: p['name']) == sorted(
+        forked, key=lambda p: p['name']
+    )
+    assert native_elapsed < forked_elapsed
@@ -0,0 +1,211 @@
+import json
+
+from typer.testing import CliRunner
+
+import easyinstaller.core.history_handler as history_handler
+import easyinstaller.core.history_store as history_store
+from easyinstaller.cli import hist as hist_module
+from easyinstaller.core.history_handler import history_batch
+
+
+def _line(day, package, action='install'):
+    return json.dumps(
+        {
+            'action': action,
+            'manager': 'apt',
+            'package': package,
+            'timestamp': f'2024-05-{day:02d}T10:00:00',
+        }
+    )
+
+
+def test_iter_lines_reverse_crosses_block_boundaries(tmp_path):
+    path = tmp_path / 'history.jsonl'
+    lines = [f'line-{n}-' + 'x' * n for n in range(50)]
+    path.write_text('\n'.join(lines) + '\n')
+
+    result = list(history_handler.iter_lines_reverse(str(path), block_size=7))
+
+    assert result == [line.encode() for line in reversed(lines)]
+
+
+def test_iter_history_reverse_reads_only_the_tail(tmp_path, monkeypatch):
+    path = tmp_path / 'history.jsonl'
+    with open(path, 'w') as fh:
+        for n in range(12000):
+            fh.write(_line(n % 28 + 1, f'pkg{n}') + '\n')
+    bytes_read = []
+    original_open = open
+
+    class CountingFile:
+        def __init__(self, handle):
+            self._handle = handle
+
+        def __getattr__(self, name):
+            return getattr(self._handle, name)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            self._handle.close()
+
+        def read(self, size=-1):
+            data = self._handle.read(size)
+            bytes_read.append(len(data))
+            return data
+
+    monkeypatch.setattr(
+        history_handler,
+        'open',
+        lambda *a, **kw: CountingFile(original_open(*a, **kw)),
+        raising=False,
+    )
+    newest = history_handler.iter_history_reverse(str(path))
+
+    assert [next(newest)['package'] for _ in range(2)] == [
+        'pkg11999',
+        'pkg11998',
+    ]
+    assert path.stat().st_size > 10 * history_handler.REVERSE_BLOCK_SIZE
+    assert sum(bytes_read) == history_handler.REVERSE_BLOCK_SIZE
+
+
+def test_follow_history_yields_complete_appended_lines(tmp_path):
+    path = tmp_path / 'history.jsonl'
+    path.write_text(_line(1, 'old') + '\n')
+    line = _line(2, 'new')
+    sleeps = []
+
+    def fake_sleep(interval):
+        sleeps.append(interval)
+        with open(path, 'a') as fh:
+            # First only half of the line, then the rest.
+            fh.write(line[:10] if len(sleeps) == 1 else line[10:] + '\n')
+
+    followed = history_handler.follow_history(str(path), sleep=fake_sleep)
+
+    assert next(followed)['package'] == 'new'
+    assert len(sleeps) == 2
+
+
+def test_hist_limit_since_and_until(tmp_path, monkeypatch):
+    path = tmp_path / 'history.jsonl'
+    path.write_text(
+        '\n'.join(_line(day, f'pkg{day:02d}') for day in range(1, 11)) + '\n'
+    )
+    monkeypatch.setattr(hist_module, 'config', {'history_file': str(path)})
+    monkeypatch.setattr(history_handler, 'config', {'history_file': str(path)})
+    monkeypatch.setattr(history_store, 'config', {'history_file': str(path)})
+    runner = CliRunner()
+
+    newest = runner.invoke(hist_module.app, ['--limit', '2'])
+    window = runner.invoke(
+        hist_module.app, ['--since', '2024-05-03', '--until', '2024-05-04']
+    )
+    bad = runner.invoke(hist_module.app, ['--since', 'yesterday'])
+
+    assert newest.exit_code == 0
+    assert 'pkg10' in newest.output and 'pkg09' in newest.output
+    assert 'pkg08' not in newest.output
+    # The ids used by --show and `ei undo` are listed as well.
+    ids = [
+        line.split('│')[1].strip()
+        for line in newest.output.splitlines()
+        if line.startswith('│')
+    ]
+    assert ids == ['10', '9']
+    assert 'pkg03' in window.output and 'pkg04' in window.output
+    assert 'pkg02' not in window.output and 'pkg05' not in window.output
+    assert bad.exit_code != 0
+
+
+def test_parse_time_accepts_relative_ages():
+    assert hist_module.parse_time('2024-05-01') == '2024-05-01T00:00:00'
+    assert hist_module.parse_time('2024-05-01', end=True) == (
+        '2024-05-02T00:00:00'
+    )
+    assert hist_module.parse_time('7d') < hist_module.parse_time('1h')
+
+
+def _append_many(args):
+    path, worker = args
+    for n in range(200):
+        history_handler.append_records(
+            [{'worker': worker, 'n': n, 'padding': 'x' * 3000}], path
+        )
+
+
+def test_concurrent_writers_never_interleave_lines(tmp_path):
+    import multiprocessing
+
+    path = str(tmp_path / 'history.jsonl')
+    with multiprocessing.get_context('spawn').Pool(4) as pool:
+        pool.map(_append_many, [(path, worker) for worker in range(4)])
+
+    corrupt = []
+    records = list(history_handler.iter_history(path, corrupt.append))
+
+    assert corrupt == []
+    assert len(records) == 800
+
+
+def test_torn_line_is_skipped_and_reported(tmp_path):
+    path = tmp_path / 'history.jsonl'
+    path.write_text(_line(1, 'vim') + '\n' + _line(2, 'git')[:25])
+
+    history_handler.append_records([json.loads(_line(3, 'htop'))], str(path))
+    corrupt = []
+    packages = [
+        r['package']
+        for r in history_handler.iter_history(str(path), corrupt.append)
+    ]
+
+    assert packages == ['vim', 'htop']
+    assert corrupt == [_line(2, 'git')[:25].encode() + b'\n']
+
+
+def test_history_batch_groups_records_from_all_threads(tmp_path, monkeypatch):
+    import threading
+
+    path = tmp_path / 'history.jsonl'
+    monkeypatch.setattr(history_handler, 'config', {'history_file': str(path)})
+    writes = []
+    original = history_handler.append_records
+    monkeypatch.setattr(
+        history_handler,
+        'append_records',
+        lambda records, *a: writes.append(len(records)) or original(records),
+    )
+
+    with history_batch():
+        thread = threading.Thread(
+            target=history_handler.log_operation, args=({'package': 'a'},)
+        )
+        thread.start()
+        thread.join()
+        with history_batch():
+            history_handler.log_operation({'package': 'b'})
+        assert writes == []
+    history_handler.log_operation({'package': 'c'})
+
+    assert writes == [2, 1]
+    assert [r['package'] for r in history_handler.iter_history()] == [
+        'a',
+        'b',
+        'c',
+    ]
+
+
+def test_hist_reports_unreadable_lines(tmp_path, monkeypatch):
+    path = tmp_path / 'history.jsonl'
+    path.write_text(_line(1, 'vim') + '\n{"action": "inst\n')
+    monkeypatch.setattr(hist_module, 'config', {'history_file': str(path)})
+    monkeypatch.setattr(history_handler, 'config', {'history_file': str(path)})
+    monkeypatch.setattr(history_store, 'config', {'history_file': str(path)})
+
+    result = CliRunner().invoke(hist_module.app, [])
+
+    assert result.exit_code == 0
+    assert 'vim' in result.output
+    assert 'Skipped 1 unreadable' in result.output
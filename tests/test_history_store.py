@@ -0,0 +1,183 @@
+import json
+
+from typer.testing import CliRunner
+
+import easyinstaller.core.history_store as history_store
+from easyinstaller.cli import hist as hist_module
+
+
+def _record(day, action, manager, packages, **extra):
+    record = {
+        'action': action,
+        'manager': manager,
+        'timestamp': f'2024-05-{day:02d}T10:00:00',
+        'packages': packages,
+        **extra,
+    }
+    if len(packages) == 1:
+        record['package'] = packages[0]
+    return record
+
+
+def _write(path, records, mode='w'):
+    with open(path, mode) as fh:
+        for record in records:
+            fh.write(json.dumps(record) + '\n')
+
+
+def _store(tmp_path):
+    return history_store.HistoryStore(
+        tmp_path / 'history.jsonl', tmp_path / 'index.sqlite3'
+    )
+
+
+def test_first_sync_migrates_existing_history(tmp_path):
+    history = tmp_path / 'history.jsonl'
+    _write(
+        history,
+        [
+            _record(1, 'install', 'apt', ['vim'], installed_packages=['vim']),
+            _record(3, 'remove', 'snap', ['code'], removed_packages=['code']),
+            _record(2, 'install', 'flatpak', ['org.gimp.GIMP', 'x.y.Z']),
+        ],
+    )
+    with open(history, 'a') as fh:
+        fh.write('{not json\n')
+
+    with _store(tmp_path) as store:
+        assert store.sync() == 3
+        assert store.sync() == 0
+        assert store.skipped_lines == 1
+        entries = store.query()
+
+    # Newest first, whatever the order in the file.
+    assert [e['manager'] for e in entries] == ['snap', 'flatpak', 'apt']
+    assert entries[0]['id'] == 2
+
+
+def test_queries_filter_and_paginate(tmp_path):
+    records = [
+        _record(day, 'install', 'apt', [f'pkg{day}']) for day in range(1, 21)
+    ]
+    records.append(_record(21, 'remove', 'apt', ['pkg1']))
+    _write(tmp_path / 'history.jsonl', records)
+
+    with _store(tmp_path) as store:
+        store.sync()
+        assert [e['timestamp'][:10] for e in store.query(package='pkg1')] == [
+            '2024-05-21',
+            '2024-05-01',
+        ]
+        assert store.count(package='pkg1*') == 12
+        assert store.count(action='remove') == 1
+        assert store.count(manager='snap') == 0
+        page = store.query(limit=5, offset=5)
+        assert [e['id'] for e in page] == [16, 15, 14, 13, 12]
+        since = store.query(since='2024-05-19', until='2024-05-21')
+        assert [e['package'] for e in since] == ['pkg20', 'pkg19']
+        assert store.get(3)['package'] == 'pkg3'
+        assert store.get(999) is None
+
+
+def test_sync_indexes_only_appended_complete_lines(tmp_path):
+    history = tmp_path / 'history.jsonl'
+    _write(history, [_record(1, 'install', 'apt', ['vim'])])
+
+    with _store(tmp_path) as store:
+        assert store.sync() == 1
+        line = json.dumps(_record(2, 'install', 'apt', ['git']))
+        with open(history, 'a') as fh:
+            fh.write(line[:10])   # A writer is still busy with this line.
+        assert store.sync() == 0
+        with open(history, 'a') as fh:
+            fh.write(line[10:] + '\n')
+        assert store.sync() == 1
+        assert store.count() == 2
+
+        # A replaced file is indexed from scratch.
+        history.unlink()
+        _write(history, [_record(5, 'remove', 'apt', ['vim'])])
+        assert store.sync() == 1
+        assert [e['action'] for e in store.query()] == ['remove']
+
+
+def test_open_history_store_uses_the_current_default_index(
+    tmp_path, monkeypatch
+):
+    history = tmp_path / 'history.jsonl'
+    _write(history, [_record(1, 'install', 'apt', ['vim'])])
+    monkeypatch.setattr(
+        history_store, 'config', {'history_file': str(history)}
+    )
+
+    store = history_store.open_history_store()
+    store.close()
+
+    # Patched by the isolated_history_index fixture.
+    assert store.index_file == history_store.HISTORY_INDEX_FILE
+    assert store.index_file.is_relative_to(tmp_path)
+    assert store.index_file.exists()
+
+
+def test_hist_command_shows_filtered_page(tmp_path, monkeypatch):
+    history = tmp_path / 'history.jsonl'
+    _write(
+        history,
+        [
+            _record(1, 'install', 'apt', ['vim'], installed_packages=['vim']),
+            _record(
+                2,
+                'install',
+                'snap',
+                ['code'],
+                installed_packages=['code', 'core22'],
+            ),
+        ],
+    )
+    monkeypatch.setattr(
+        history_store, 'config', {'history_file': str(history)}
+    )
+
+    result = CliRunner().invoke(hist_module.app, ['--manager', 'snap'])
+
+    assert result.exit_code == 0
+    assert 'code' in result.output
+    assert 'dependency' in result.output
+    assert 'vim' not in result.output
+
+
+def test_hist_show_resolves_compressed_and_rotated_logs(tmp_path, monkeypatch):
+    from rich.console import Console
+
+    history = tmp_path / 'history.jsonl'
+    compressed = tmp_path / 'install.log'
+    (tmp_path / 'install.log.gz').write_bytes(b'')
+    _write(
+        history,
+        [
+            _record(
+                1,
+                'install',
+                'apt',
+                ['vim'],
+                installed_packages=['vim', 'xxd'],
+                log_file=str(compressed),
+            ),
+            _record(2, 'remove', 'apt', ['vim'], log_file='/gone/rm.log'),
+        ],
+    )
+    monkeypatch.setattr(
+        history_store, 'config', {'history_file': str(history)}
+    )
+    monkeypatch.setattr(hist_module, 'console', Console(width=200))
+    runner = CliRunner()
+
+    first = runner.invoke(hist_module.app, ['--show', '1'])
+    second = runner.invoke(hist_module.app, ['--show', '2'])
+    missing = runner.invoke(hist_module.app, ['--show', '9'])
+
+    assert first.exit_code == 0
+    assert 'vim, xxd' in first.output
+    assert f'{compressed}.gz' in first.output
+    assert '/gone/rm.log (removed by log rotation)' in second.output
+    assert missing.exit_code == 1
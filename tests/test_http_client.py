@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import easyinstaller.core.http_client as http_client
+import easyinstaller.core.searcher as searcher
+import easyinstaller.core.versioning as versioning
+
+
+def test_backend_url_uses_stand_in(monkeypatch):
+    monkeypatch.delenv(http_client.BASE_URL_ENV, raising=False)
+    assert (
+        http_client.backend_url('github', '/repos/x')
+        == 'https://api.github.com/repos/x'
+    )
+
+    monkeypatch.setenv(http_client.BASE_URL_ENV, 'http://localhost:8080/')
+    assert (
+        http_client.backend_url('flathub', 'api/v2')
+        == 'http://localhost:8080/api/v2'
+    )
+
+
+def test_get_session_is_shared():
+    assert http_client.get_session() is http_client.get_session()
+
+
+def test_search_flathub_and_snap_offline(stand_in):
+    stand_in.routes = {
+        '/api/v2/compat/apps/search/gimp editor': [
+            {
+                'flatpakAppId': 'org.gimp.GIMP',
+                'name': 'GNU Image Manipulation Program',
+                'summary': 'Create images and edit photographs',
+            }
+        ],
+        '/api/v1/snaps/search': lambda query: [
+            {'name': f"{query['q'][0]}.snap", 'summary': 'From the snap'}
+        ],
+    }
+
+    flathub = searcher.search_flathub('gimp editor')
+    snaps = searcher.search_snap('gimp')
+
+    assert flathub == [
+        {
+            'id': 'org.gimp.GIMP',
+            'name': 'GNU Image Manipulation Program',
+            'summary': 'Create images and edit photographs',
+            'source': 'flatpak',
+        }
+    ]
+    assert snaps == [
+        {
+            'id': 'gimp',
+            'name': 'gimp',
+            'summary': 'From the snap',
+            'source': 'snap',
+        }
+    ]
+    assert '/api/v2/compat/apps/search/gimp%20editor' in stand_in.hits
+
+
+def test_search_returns_empty_when_backend_errors(stand_in):
+    assert searcher.search_flathub('missing') == []
+
+
+def test_fetch_latest_release_info_offline(stand_in):
+    stand_in.routes = {
+        f'/repos/{versioning.GITHUB_REPO}/releases/latest': {
+            'tag_name': 'v9.9.9'
+        }
+    }
+
+    assert versioning.fetch_latest_release_info()['tag_name'] == 'v9.9.9'
@@ -1,12 +1,13 @@
+import subprocess
 from unittest.mock import MagicMock, patch
 
 import easyinstaller.core.lister as lister
 
 
-def test_list_apt_packages_parses_expected_fields():
+def test_list_apt_packages_parses_expected_fields(tmp_path):
     stdout = 'pkg1\t1.0\t1024\npkg2\t2.0\t2048\n'
     completed = MagicMock(stdout=stdout)
-    with patch(
+    with patch.object(lister, 'DPKG_STATUS_FILE', tmp_path / 'missing'), patch(
         'easyinstaller.core.lister.subprocess.run', return_value=completed
     ) as run_mock:
         packages = lister.list_apt_packages()
@@ -28,8 +29,8 @@ def test_list_apt_packages_parses_expected_fields():
     ]
 
 
-def test_list_apt_packages_returns_empty_on_error():
-    with patch(
+def test_list_apt_packages_returns_empty_on_error(tmp_path):
+    with patch.object(lister, 'DPKG_STATUS_FILE', tmp_path / 'missing'), patch(
         'easyinstaller.core.lister.subprocess.run',
         side_effect=FileNotFoundError,
     ):
@@ -95,3 +96,13 @@ def test_unified_lister_aggregates_requested_managers():
     snap_mock.assert_called_once()
     flatpak_mock.assert_not_called()
     assert {entry['source'] for entry in results} == {'apt', 'snap'}
+
+
+def test_listers_report_failed_scans_as_none(tmp_path):
+    error = subprocess.CalledProcessError(1, ['x'])
+    with patch.object(lister, 'DPKG_STATUS_FILE', tmp_path / 'missing'), patch(
+        'easyinstaller.core.lister.subprocess.run', side_effect=error
+    ):
+        assert lister.list_apt_packages() is None
+        assert lister.list_flatpak_packages() is None
+        assert lister.list_snap_packages() is None
@@ -0,0 +1,129 @@
+import gzip
+import os
+import threading
+import time
+from unittest.mock import patch
+
+import easyinstaller.core.log_sink as log_sink
+from easyinstaller.core.log_sink import (
+    LogSink,
+    new_operation_log,
+    resolve_operation_log,
+    rotate_logs,
+)
+
+
+def test_sink_batches_writes_until_size_threshold(tmp_path):
+    path = tmp_path / 'op.log'
+    sink = LogSink(path, flush_bytes=10, flush_interval=60)
+
+    sink.write('abc')
+    sink.write('def')
+    assert not path.exists()
+
+    sink.write('ghijk')
+    assert path.read_text() == 'abcdefghijk'
+
+    sink.write('tail')
+    sink.close()
+    assert path.read_text() == 'abcdefghijktail'
+
+
+def test_sink_flushes_after_interval(tmp_path):
+    path = tmp_path / 'op.log'
+    with LogSink(path, flush_bytes=1024, flush_interval=5) as sink:
+        with patch.object(log_sink.time, 'monotonic', return_value=100.0):
+            sink.write('first ')
+        assert not path.exists()
+        with patch.object(log_sink.time, 'monotonic', return_value=106.0):
+            sink.write('second')
+        assert path.read_text() == 'first second'
+
+
+def _age(path, seconds):
+    stamp = time.time() - seconds
+    os.utime(path, (stamp, stamp))
+
+
+def test_rotation_drops_old_and_compresses_finished_logs(tmp_path):
+    expired = tmp_path / '20240101-000000-000000-install-apt-1.log'
+    finished = tmp_path / '20260101-000000-000000-install-apt-1.log'
+    active = tmp_path / '20260102-000000-000000-install-apt-1.log'
+    for path in (expired, finished, active):
+        path.write_text(f'output of {path.name}\n')
+    _age(expired, 40 * 86400)
+    _age(finished, 3600)
+
+    rotate_logs(tmp_path)
+
+    assert not expired.exists()
+    assert not finished.exists()
+    with gzip.open(str(finished) + '.gz', 'rt') as handle:
+        assert handle.read() == f'output of {finished.name}\n'
+    assert active.read_text() == f'output of {active.name}\n'
+    assert resolve_operation_log(finished) == finished.with_name(
+        finished.name + '.gz'
+    )
+
+
+def test_concurrent_rotations_compress_each_log_once(tmp_path):
+    logs = [
+        tmp_path / f'2026010{n}-000000-000000-install-apt-1.log'
+        for n in range(1, 6)
+    ]
+    for path in logs:
+        path.write_text(f'output of {path.name}\n' * 1000)
+        _age(path, 3600)
+
+    threads = [
+        threading.Thread(target=rotate_logs, args=(tmp_path,))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        path.name + '.gz' for path in logs
+    ]
+    for path in logs:
+        with gzip.open(str(path) + '.gz', 'rt') as handle:
+            assert handle.read() == f'output of {path.name}\n' * 1000
+
+
+def test_compress_skips_a_log_removed_while_compressing(tmp_path):
+    path = tmp_path / '20260101-000000-000000-install-apt-1.log'
+    path.write_text('output\n')
+
+    def copy_then_lose_source(source, dest):
+        dest.write(source.read())
+        path.unlink()
+
+    with patch.object(log_sink.shutil, 'copyfileobj', copy_then_lose_source):
+        log_sink._compress(path)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_rotation_caps_file_count_and_size(tmp_path):
+    for n in range(5):
+        (tmp_path / f'2026010{n}-000000-000000-install-apt-1.log').write_text(
+            'x' * 100
+        )
+
+    rotate_logs(tmp_path, compress=False, max_files=3, max_bytes=250)
+
+    assert sorted(p.name[:8] for p in tmp_path.iterdir()) == [
+        '20260103',
+        '20260104',
+    ]
+
+
+def test_new_operation_log_is_unique_per_operation(tmp_path):
+    first = new_operation_log(tmp_path, 'install', 'apt')
+    second = new_operation_log(tmp_path, 'remove', 'snap')
+
+    assert first != second
+    assert first.parent == tmp_path / 'operations'
+    assert second.name.endswith(f'-remove-snap-{os.getpid()}.log')
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+import click
+from typer.testing import CliRunner
+
+from easyinstaller import main
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'src')
+HEAVY_MODULES = ('questionary', 'requests', 'pexpect')
+
+# Maximum time, in seconds, that importing easyinstaller.main and running
+# `ei --version` may take. Override with EI_STARTUP_BUDGET on slow runners.
+STARTUP_BUDGET = float(os.environ.get('EI_STARTUP_BUDGET', '0.5'))
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+sys.argv = ['ei'] + sys.argv[1:]
+from easyinstaller.main import app
+try:
+    app()
+except SystemExit:
+    pass
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print('RESULT', elapsed, ','.join(heavy) or '-')
+"""
+
+
+def _probe(*args: str) -> tuple[float, list[str]]:
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    completed = subprocess.run(
+        [sys.executable, '-c', _PROBE.format(heavy=HEAVY_MODULES), *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    line = next(
+        line
+        for line in completed.stdout.splitlines()
+        if line.startswith('RESULT')
+    )
+    _, elapsed, heavy = line.split(' ')
+    return float(elapsed), [m for m in heavy.split(',') if m != '-']
+
+
+def test_version_does_not_import_subcommand_dependencies():
+    _, heavy = _probe('--version')
+    assert heavy == []
+
+
+def test_help_lists_commands_without_importing_them():
+    _, heavy = _probe('--help')
+    assert heavy == []
+
+
+def test_version_startup_within_budget():
+    elapsed = min(_probe('--version')[0] for _ in range(3))
+    assert (
+        elapsed < STARTUP_BUDGET
+    ), f'`ei --version` took {elapsed:.3f}s (budget {STARTUP_BUDGET}s)'
+
+
+def test_lazy_group_resolves_aliases_and_unknown_commands():
+    group = main.EasyInstallerGroup(name='ei')
+    ctx = click.Context(group)
+
+    command = group.get_command(ctx, 'sp')
+    assert command is not None
+    assert command.name == 'snap'
+    assert group.get_command(ctx, 'does-not-exist') is None
+    assert group.list_commands(ctx) == list(main.COMMANDS)
+
+
+def test_help_lists_every_registered_command():
+    result = CliRunner().invoke(main.app, ['--help'])
+
+    assert result.exit_code == 0
+    for name in main.COMMANDS:
+        assert name in result.output
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -62,14 +63,17 @@ def test_install_with_manager_success(tmp_path):
             ):
                 ph.install_with_manager(package_name, 'snap')
 
-    # Command invocation.
-    run_mock.assert_called_once_with(
-        f'sudo snap install {package_name}', log_path=str(tmp_path / 'ei.log')
-    )
+    # Command invocation, logged to a file of its own.
+    run_mock.assert_called_once()
+    assert run_mock.call_args.args == (f'sudo snap install {package_name}',)
+    log_path = run_mock.call_args.kwargs['log_path']
+    assert log_path.startswith(str(tmp_path / 'operations'))
+    assert log_path.endswith('-install-snap-' + str(os.getpid()) + '.log')
 
     # Operation log payload.
     log_mock.assert_called_once()
     logged_payload = log_mock.call_args.args[0]
+    assert logged_payload['log_file'] == log_path
     assert logged_payload['action'] == 'install'
     assert logged_payload['manager'] == 'snap'
     assert logged_payload['packages'] == [package_name]
@@ -137,10 +141,8 @@ def test_install_with_manager_multiple_packages(tmp_path):
             ):
                 ph.install_with_manager(package_names, 'snap')
 
-    run_mock.assert_called_once_with(
-        'sudo snap install pkg-one pkg-two',
-        log_path=str(tmp_path / 'ei.log'),
-    )
+    run_mock.assert_called_once()
+    assert run_mock.call_args.args == ('sudo snap install pkg-one pkg-two',)
 
     log_mock.assert_called_once()
     logged_payload = log_mock.call_args.args[0]
@@ -175,13 +177,122 @@ def test_remove_with_manager_success(tmp_path):
             ):
                 ph.remove_with_manager(package_name, 'snap')
 
-    run_mock.assert_called_once_with(
-        f'sudo snap remove {package_name}', log_path=str(tmp_path / 'ei.log')
-    )
+    run_mock.assert_called_once()
+    assert run_mock.call_args.args == (f'sudo snap remove {package_name}',)
 
     logged_payload = log_mock.call_args.kwargs or log_mock.call_args.args
     logged_payload = logged_payload[0]
+    assert logged_payload['log_file'] == run_mock.call_args.kwargs['log_path']
     assert logged_payload['action'] == 'remove'
     assert logged_payload['removed_packages'] == [package_name]
     console_mock.assert_called()
     assert package_name in console_mock.call_args.args[0]
+
+
+def test_install_with_manager_drops_unknown_packages_and_retries(tmp_path):
+    lister_states = iter([{'base-package'}, {'base-package', 'good-app'}])
+    commands = []
+
+    def fake_run(cmd, log_path, progress=None):
+        commands.append(cmd)
+        if 'missing-app' in cmd:
+            with open(log_path, 'a') as fh:
+                fh.write('error: snap "missing-app" not found\n')
+            return 1
+        return 0
+
+    log_mock = MagicMock()
+    with patch.dict(
+        ph.MANAGER_TO_LISTER,
+        {'snap': lambda: set(next(lister_states))},
+        clear=True,
+    ):
+        with patch.object(ph, 'config', {'log_dir': str(tmp_path)}):
+            with patch(
+                'easyinstaller.core.package_handler._ensure_manager_installed'
+            ), patch(
+                'easyinstaller.core.package_handler.run_cmd_smart',
+                side_effect=fake_run,
+            ), patch.object(
+                ph.console, 'print'
+            ), patch(
+                'easyinstaller.core.package_handler.log_operation', log_mock
+            ):
+                results = ph.install_with_manager(
+                    ['good-app', 'missing-app'], 'snap'
+                )
+
+    assert commands == [
+        'sudo snap install good-app missing-app',
+        'sudo snap install good-app',
+    ]
+    assert results == {'good-app': 'installed', 'missing-app': 'failed'}
+    assert log_mock.call_args.args[0]['packages'] == ['good-app']
+    # Both attempts share the operation's log file.
+    assert os.path.exists(log_mock.call_args.args[0]['log_file'])
+
+
+def test_failed_packages_from_output_matches_apt_errors():
+    output = (
+        'Reading package lists...\n'
+        'E: Unable to locate package nosuchpkg\n'
+        "E: Package 'virtualpkg' has no installation candidate\n"
+    )
+
+    assert ph.failed_packages_from_output(
+        'apt', output, ['vim', 'nosuchpkg', 'virtualpkg']
+    ) == ['nosuchpkg', 'virtualpkg']
+
+
+def test_ensure_manager_installed_logs_bootstrap_to_operation_log(tmp_path):
+    with patch.object(ph.shutil, 'which', return_value=None), patch.object(
+        ph, 'get_native_manager_type', return_value='apt'
+    ), patch.object(ph, 'config', {'log_dir': str(tmp_path)}), patch.object(
+        ph, 'run_cmd_smart', return_value=0
+    ) as run_mock, patch.object(
+        ph.console, 'print'
+    ):
+        ph._ensure_manager_installed('snap')
+
+    assert run_mock.call_args.args == ('sudo -E apt-get install -y snapd',)
+    assert '-install-apt-' in run_mock.call_args.kwargs['log_path']
+
+
+def test_prefetch_with_manager_downloads_without_installing(tmp_path):
+    with patch.object(
+        ph, 'get_native_manager_type', return_value='apt'
+    ), patch.object(ph, 'config', {'log_dir': str(tmp_path)}), patch.object(
+        ph, 'run_cmd_smart', return_value=0
+    ) as run_mock:
+        assert ph.prefetch_with_manager(['vim', 'git'], 'apt') == 0
+        # snap has no download-only mode.
+        assert ph.prefetch_with_manager(['code'], 'snap') == 0
+
+    run_mock.assert_called_once()
+    assert run_mock.call_args.args == (
+        'sudo -E apt-get install -y --download-only vim git',
+    )
+    assert '-prefetch-apt-' in run_mock.call_args.kwargs['log_path']
+
+
+def test_remove_with_manager_removes_packages_in_one_transaction(tmp_path):
+    lister_states = iter([{'a', 'b', 'c'}, {'c'}])
+    log_mock = MagicMock()
+    with patch.dict(
+        ph.MANAGER_TO_LISTER,
+        {'snap': lambda: set(next(lister_states))},
+        clear=True,
+    ), patch.object(ph, 'config', {'log_dir': str(tmp_path)}), patch.object(
+        ph, 'run_cmd_smart', return_value=0
+    ) as run_mock, patch.object(
+        ph.console, 'print'
+    ), patch.object(
+        ph, 'log_operation', log_mock
+    ):
+        ph.remove_with_manager(['a', 'b'], 'snap')
+
+    assert run_mock.call_args.args == ('sudo snap remove a b',)
+    payload = log_mock.call_args.args[0]
+    assert payload['packages'] == ['a', 'b']
+    assert payload['removed_packages'] == ['a', 'b']
+    assert 'package' not in payload
@@ -0,0 +1,131 @@
+import json
+
+import easyinstaller.core.progress as progress
+import easyinstaller.core.runner as runner
+
+APT_OUTPUT = (
+    'Reading package lists...\n'
+    'Need to get 2,000 kB of archives.\n'
+    'Get:1 http://deb.debian.org/debian bookworm/main amd64 vim-runtime '
+    'all 2:9.0.1378-2 [1,500 kB]\n'
+    'dlstatus:1:50.0:Retrieving file 1 of 2\n'
+    'Get:2 http://deb.debian.org/debian bookworm/main amd64 vim '
+    'amd64 2:9.0.1378-2 [500 kB]\n'
+    'Fetched 2,000 kB in 1s (1,800 kB/s)\n'
+    'pmstatus:vim:20.0:Preparing vim (amd64)\n'
+    'Unpacking vim (2:9.0.1378-2) ...\n'
+    'pmstatus:vim:40.0:Unpacking vim (amd64)\n'
+    'pmstatus:vim:80.0:Configuring vim (amd64)\n'
+    'pmstatus:vim:100.0:Installed vim (amd64)\n'
+)
+
+
+def test_apt_parser_reports_bytes_stages_and_completion():
+    parser = progress.AptProgressParser()
+
+    events, shown = parser.feed(APT_OUTPUT)
+
+    downloads = [e for e in events if e.kind == 'download']
+    assert downloads[0].total == 2_000_000
+    assert [e.downloaded for e in downloads] == [
+        0,
+        1_500_000,
+        None,
+        2_000_000,
+        2_000_000,
+    ]
+    assert downloads[2].percent == 50.0
+    assert downloads[-1].rate == '1,800 kB/s'
+    stages = [(e.stage, e.percent) for e in events if e.kind == 'stage']
+    assert stages == [
+        ('preparing', 20.0),
+        ('unpacking', 40.0),
+        ('configuring', 80.0),
+    ]
+    assert events[-1].kind == 'package_done'
+    assert events[-1].package == 'vim'
+    # Status lines are for machines only and never reach prompt detection.
+    assert 'pmstatus' not in shown and 'dlstatus' not in shown
+    assert 'Unpacking vim (2:9.0.1378-2) ...\n' in shown
+
+
+def test_apt_status_lines_do_not_trigger_prompt_detection():
+    parser = progress.AptProgressParser()
+    detector = runner.PromptDetector()
+
+    prompted = False
+    # Feed in small chunks so status lines arrive split.
+    for start in range(0, len(APT_OUTPUT), 7):
+        _events, shown = parser.feed(APT_OUTPUT[start : start + 7])
+        prompted = prompted or detector.feed(shown)
+
+    assert not prompted
+
+
+def test_parser_passes_unterminated_prompts_through_immediately():
+    parser = progress.AptProgressParser()
+
+    _events, shown = parser.feed('Do you want to continue? [Y/n] ')
+
+    assert shown == 'Do you want to continue? [Y/n] '
+    assert parser.feed('y\n') == ([], 'y\n')
+
+
+def test_apt_prepare_command_enables_status_lines():
+    parser = progress.AptProgressParser()
+
+    assert parser.prepare_command('sudo -E apt-get install -y vim') == (
+        'sudo -E apt-get -o APT::Status-Fd=1 install -y vim'
+    )
+
+
+def test_flatpak_parser_reads_redrawn_progress_lines():
+    parser = progress.FlatpakProgressParser()
+
+    events, _shown = parser.feed(
+        'Installing 1/2… \x1b[32m████\x1b[0m  50%  1.2 MB/s  00:10\r'
+        'Installing 1/2… ████████ 100%  1.5 MB/s  00:00\n'
+        'Installing 2/2… ██ 10%  800 kB/s  00:30\r'
+    )
+
+    assert [e.percent for e in events] == [25.0, 50.0, 55.0]
+    assert events[0].rate == '1.2 MB/s'
+    assert [e.kind for e in events] == ['stage', 'package_done', 'stage']
+
+
+def test_snap_parser_reads_tasks_and_completion():
+    parser = progress.SnapProgressParser()
+
+    events, _shown = parser.feed(
+        'Download snap "code" (150) from channel "stable"   42% '
+        '12.3MB/s 3.1s\r'
+        'Mount snap "code" (150)\r'
+        'code 1.85.0 from Visual Studio Code (vscode✓) installed\n'
+    )
+
+    assert [(e.kind, e.stage, e.percent) for e in events] == [
+        ('download', 'download', 42.0),
+        ('stage', 'mount', None),
+        ('package_done', None, 100.0),
+    ]
+    assert events[0].rate == '12.3MB/s'
+    assert all(e.package == 'code' for e in events)
+
+
+def test_unattended_run_writes_progress_event_stream(tmp_path, monkeypatch):
+    events_file = tmp_path / 'events.jsonl'
+    monkeypatch.setenv(progress.PROGRESS_EVENTS_ENV, str(events_file))
+    script = "printf 'pmstatus:vim:100.0:Installed vim\\n'"
+
+    with runner.unattended():
+        rc = runner.run_cmd_smart(
+            script, log_path=str(tmp_path / 'op.log'), progress='apt'
+        )
+
+    assert rc == 0
+    records = [
+        json.loads(line) for line in events_file.read_text().splitlines()
+    ]
+    assert records[0]['kind'] == 'package_done'
+    assert records[0]['package'] == 'vim'
+    assert 'time' in records[0]
@@ -0,0 +1,74 @@
+from unittest.mock import patch
+
+import easyinstaller.core.ranking as ranking
+from easyinstaller.core.ranking import rank_results, score_result
+
+
+def _result(name, source='apt', summary='', package_id=None):
+    return {
+        'id': package_id or name,
+        'name': name,
+        'summary': summary,
+        'source': source,
+    }
+
+
+def test_real_app_outranks_substring_noise():
+    noise = [_result(f'libcodec{i}-dev') for i in range(200)]
+    vscode = _result(
+        'Visual Studio Code',
+        'flatpak',
+        'Code editing. Redefined.',
+        'com.visualstudio.code',
+    )
+    exact = _result('code', 'snap')
+
+    ranked = rank_results(noise + [vscode, exact], 'code', limit=5)
+
+    assert len(ranked) == 5
+    assert ranked[0] is exact
+    assert ranked[1] is vscode
+
+
+def test_prefix_matches_prefer_shorter_names():
+    ranked = rank_results(
+        [_result('firefox-esr-l10n-pt-br'), _result('firefox-esr')],
+        'firefox',
+        limit=None,
+    )
+    assert [r['name'] for r in ranked] == [
+        'firefox-esr',
+        'firefox-esr-l10n-pt-br',
+    ]
+
+
+def test_source_preference_and_installed_state_break_ties():
+    apt_vlc = _result('vlc', 'apt')
+    snap_vlc = _result('vlc', 'snap')
+
+    assert score_result(apt_vlc, 'vlc') > score_result(snap_vlc, 'vlc')
+    assert score_result(
+        snap_vlc, 'vlc', preferred_source='snap'
+    ) > score_result(apt_vlc, 'vlc')
+    assert score_result(
+        snap_vlc, 'vlc', installed={('snap', 'vlc')}
+    ) > score_result(apt_vlc, 'vlc')
+
+
+def test_rank_results_reads_installed_snapshot():
+    snapshot = {'flatpak': {'packages': [{'id': 'org.videolan.VLC'}]}}
+    results = [
+        _result('VLC', 'apt', package_id='vlc'),
+        _result('VLC', 'flatpak', package_id='org.videolan.VLC'),
+    ]
+
+    with patch.object(ranking, 'load_snapshot', return_value=snapshot):
+        ranked = rank_results(results, 'vlc')
+
+    assert ranked[0]['source'] == 'flatpak'
+
+
+def test_popularity_only_applies_when_available():
+    plain = _result('player', 'flatpak')
+    popular = dict(plain, popularity=50000)
+    assert score_result(popular, 'player') > score_result(plain, 'player')
@@ -0,0 +1,276 @@
+import json
+import subprocess
+from unittest.mock import patch
+
+import pytest
+from typer.testing import CliRunner
+
+import easyinstaller.core.rollback as rollback
+from easyinstaller.cli import rollback as rollback_cli
+from easyinstaller.core.rollback import (
+    ManagerPlan,
+    operations_to_undo,
+    plan_rollback,
+)
+
+
+def _op(hour, action, manager, packages, changed=None):
+    key = 'installed_packages' if action == 'install' else 'removed_packages'
+    return {
+        'action': action,
+        'manager': manager,
+        'timestamp': f'2024-05-01T{hour:02d}:00:00',
+        'packages': packages,
+        key: changed if changed is not None else packages,
+    }
+
+
+def _write_history(path, records):
+    with open(path, 'w') as fh:
+        for record in records:
+            fh.write(json.dumps(record) + '\n')
+
+
+def test_plan_nets_out_changes_per_manager():
+    operations = [
+        _op(5, 'install', 'apt', ['htop']),
+        _op(4, 'remove', 'apt', ['vim'], ['vim', 'vim-runtime']),
+        _op(3, 'remove', 'flatpak', ['org.gimp.GIMP']),
+        _op(2, 'install', 'flatpak', ['org.gimp.GIMP']),
+        _op(1, 'install', 'apt', ['git'], ['git', 'git-man', 'liberror']),
+    ]
+
+    plans = plan_rollback(operations)
+
+    # GIMP was installed and removed again: nothing to do for flatpak.
+    assert plans == [
+        ManagerPlan(
+            manager='apt',
+            remove=['git', 'git-man', 'htop', 'liberror'],
+            install=['vim', 'vim-runtime'],
+        )
+    ]
+
+
+def test_operations_to_undo_reads_back_to_count_or_time(tmp_path):
+    history = tmp_path / 'history.jsonl'
+    _write_history(
+        history,
+        [
+            _op(1, 'install', 'apt', ['git']),
+            _op(2, 'install', 'snap', ['code']),
+            {'action': 'prefetch', 'timestamp': '2024-05-01T02:30:00'},
+            _op(3, 'remove', 'apt', ['vim']),
+        ],
+    )
+
+    last = operations_to_undo(count=2, history_file=str(history))
+    since = operations_to_undo(
+        after='2024-05-01T01:00:00', history_file=str(history)
+    )
+
+    assert [op['manager'] for op in last] == ['apt', 'snap']
+    assert [op['timestamp'][11:13] for op in since] == ['03', '02']
+
+
+def test_apply_plan_batches_and_skips_packages_already_reverted():
+    plan = ManagerPlan(
+        manager='apt', remove=['htop', 'gone'], install=['vim', 'back']
+    )
+    with patch.dict(
+        rollback.MANAGER_TO_LISTER,
+        {'apt': lambda: {'htop', 'back'}},
+    ), patch.object(
+        rollback, 'remove_with_manager'
+    ) as remove_mock, patch.object(
+        rollback, 'install_with_manager', return_value={'vim': 'installed'}
+    ) as install_mock:
+        results = rollback.apply_plan(plan)
+
+    remove_mock.assert_called_once_with(['htop'], 'apt')
+    install_mock.assert_called_once_with(['vim'], 'apt')
+    assert results == {
+        'gone': 'unchanged',
+        'back': 'unchanged',
+        'htop': 'removed',
+        'vim': 'installed',
+    }
+
+
+def test_apply_plan_reinstalls_packages_left_in_config_files_state(tmp_path):
+    status = tmp_path / 'status'
+    status.write_text(
+        'Package: vim\n'
+        'Status: deinstall ok config-files\n'
+        'Version: 2:9.1.0016-1\n'
+        '\n'
+        'Package: htop\n'
+        'Status: install ok installed\n'
+        'Version: 3.3.0-4\n'
+    )
+    plan = ManagerPlan(manager='apt', remove=['htop'], install=['vim'])
+    with patch(
+        'easyinstaller.core.lister.DPKG_STATUS_FILE', status
+    ), patch.object(
+        rollback, 'remove_with_manager'
+    ) as remove_mock, patch.object(
+        rollback, 'install_with_manager', return_value={'vim': 'installed'}
+    ) as install_mock:
+        results = rollback.apply_plan(plan)
+
+    remove_mock.assert_called_once_with(['htop'], 'apt')
+    install_mock.assert_called_once_with(['vim'], 'apt')
+    assert results == {'htop': 'removed', 'vim': 'installed'}
+
+
+def test_simulate_apt_removal_reports_packages_outside_the_plan():
+    plan = ManagerPlan(manager='apt', remove=['liberror', 'gone'])
+    simulated = subprocess.CompletedProcess(
+        [],
+        0,
+        stdout=(
+            'The following packages will be REMOVED:\n'
+            '  git liberror\n'
+            'Remv git [1:2.43.0-1]\n'
+            'Remv liberror [0.17-1]\n'
+        ),
+    )
+    with patch.dict(
+        rollback.MANAGER_TO_LISTER, {'apt': lambda: {'liberror', 'git'}}
+    ), patch.object(
+        rollback.subprocess, 'run', return_value=simulated
+    ) as run_mock:
+        extra = rollback.simulate_apt_removal(plan)
+
+    # Packages already gone are not simulated.
+    assert run_mock.call_args.args[0] == [
+        'apt-get',
+        '-s',
+        'remove',
+        'liberror',
+    ]
+    assert extra == plan.extra_removals == ['git']
+
+
+def test_undo_stops_when_apt_would_remove_packages_outside_the_plan(
+    tmp_path, monkeypatch
+):
+    history = tmp_path / 'history.jsonl'
+    _write_history(history, [_op(1, 'install', 'apt', ['git'], ['liberror'])])
+    monkeypatch.setattr(
+        rollback_cli,
+        'operations_to_undo',
+        lambda **kwargs: operations_to_undo(
+            **kwargs, history_file=str(history)
+        ),
+    )
+
+    def fake_simulate(plan):
+        plan.extra_removals = ['git']
+        return plan.extra_removals
+
+    monkeypatch.setattr(rollback_cli, 'simulate_apt_removal', fake_simulate)
+    monkeypatch.setattr(
+        rollback_cli,
+        'apply_plan',
+        lambda plan: pytest.fail('the plan must not be applied'),
+    )
+    runner = CliRunner()
+
+    dry = runner.invoke(rollback_cli.app, ['--dry-run'])
+    result = runner.invoke(rollback_cli.app, ['--yes'])
+
+    assert dry.exit_code == 0
+    assert 'Also removed' in dry.output
+    assert result.exit_code == 1
+    assert 'would also remove git' in result.output
+
+
+def test_undo_command_runs_the_plan(tmp_path, monkeypatch):
+    history = tmp_path / 'history.jsonl'
+    _write_history(
+        history,
+        [
+            _op(1, 'install', 'apt', ['git']),
+            _op(2, 'install', 'flatpak', ['org.gimp.GIMP']),
+        ],
+    )
+    monkeypatch.setattr(
+        rollback_cli,
+        'operations_to_undo',
+        lambda **kwargs: operations_to_undo(
+            **kwargs, history_file=str(history)
+        ),
+    )
+    monkeypatch.setattr(rollback_cli, 'prime_sudo_session', lambda: True)
+    monkeypatch.setattr(rollback_cli, 'simulate_apt_removal', lambda plan: [])
+    applied = []
+
+    def fake_apply(plan):
+        applied.append(plan)
+        return {pkg: 'removed' for pkg in plan.remove}
+
+    monkeypatch.setattr(rollback_cli, 'apply_plan', fake_apply)
+    runner = CliRunner()
+
+    dry = runner.invoke(rollback_cli.app, ['2', '--dry-run'])
+    assert dry.exit_code == 0
+    assert 'org.gimp.GIMP' in dry.output
+    assert applied == []
+
+    result = runner.invoke(rollback_cli.app, ['--yes', '--sequential'])
+
+    assert result.exit_code == 0, result.output
+    assert applied == [
+        ManagerPlan(manager='flatpak', remove=['org.gimp.GIMP'])
+    ]
+    assert 'Rollback finished' in result.output
+
+
+def test_parallel_rollback_reuses_sudo_credentials_from_the_terminal(
+    tmp_path, monkeypatch
+):
+    from easyinstaller.core import package_handler, runner
+
+    history = tmp_path / 'history.jsonl'
+    _write_history(
+        history,
+        [
+            _op(1, 'install', 'apt', ['git']),
+            _op(2, 'install', 'snap', ['code']),
+        ],
+    )
+    monkeypatch.delenv(runner.NON_INTERACTIVE_ENV, raising=False)
+    monkeypatch.setattr(
+        rollback_cli,
+        'operations_to_undo',
+        lambda **kwargs: operations_to_undo(
+            **kwargs, history_file=str(history)
+        ),
+    )
+    monkeypatch.setattr(package_handler.os, 'geteuid', lambda: 1000)
+    monkeypatch.setattr(rollback_cli, 'simulate_apt_removal', lambda plan: [])
+    events = []
+
+    def fake_sudo(args, **kwargs):
+        # Inherits the terminal: no PTY, pipes or captured output.
+        events.append(('refresh', args, kwargs))
+        return subprocess.CompletedProcess(args, 0)
+
+    def fake_apply(plan):
+        argv = runner.command_args(f'sudo snap remove {plan.remove[0]}')
+        events.append(('job', runner.is_unattended(), argv))
+        return {pkg: 'removed' for pkg in plan.remove}
+
+    monkeypatch.setattr(package_handler.subprocess, 'run', fake_sudo)
+    monkeypatch.setattr(rollback_cli, 'apply_plan', fake_apply)
+
+    result = CliRunner().invoke(rollback_cli.app, ['2', '--yes'])
+
+    assert result.exit_code == 0, result.output
+    assert events[0] == ('refresh', ['sudo', '-v'], {})
+    jobs = sorted(event for event in events if event[0] == 'job')
+    assert jobs == [
+        ('job', True, ['sudo', 'snap', 'remove', 'code']),
+        ('job', True, ['sudo', 'snap', 'remove', 'git']),
+    ]
@@ -1,3 +1,4 @@
+import os
 from unittest.mock import MagicMock, patch
 
 import easyinstaller.core.runner as runner
@@ -22,3 +23,190 @@ def test_run_cmd_smart_fallbacks_to_subprocess_with_env_merge():
     assert kwargs['env']['FOO'] == 'BAR'
     # The merged environment should still include the existing PATH variable.
     assert 'PATH' in kwargs['env']
+
+
+def test_run_cmd_smart_unattended_logs_output_without_spinner(tmp_path):
+    log_file = tmp_path / 'ei.log'
+
+    with patch('easyinstaller.core.runner.pexpect.spawn') as spawn_mock:
+        with runner.unattended():
+            rc = runner.run_cmd_smart(
+                'echo hello; exit 4', log_path=str(log_file)
+            )
+
+    assert rc == 4
+    spawn_mock.assert_not_called()
+    assert log_file.read_text() == 'hello\n'
+
+
+def test_prompt_detector_finds_prompts_split_across_chunks():
+    detector = runner.PromptDetector()
+
+    assert not detector.feed(
+        'Need to get 12.3 MB of archives.\nDo you want to con'
+    )
+    assert detector.feed('tinue? [Y/n] ')
+    assert detector.context.endswith('Do you want to continue? [Y/n] ')
+
+
+def test_prompt_detector_ignores_plain_output():
+    detector = runner.PromptDetector()
+
+    # 'y', 'n' and '/' alone are not a [y/n] prompt.
+    assert not detector.feed('Unpacking nano (7.2-2) over (7.2-1) ...\n')
+    assert not detector.feed('Setting up yq (3.1.0) ...\n')
+
+
+def test_prompt_keywords_cover_every_prompt_pattern():
+    samples = [
+        'Do you want to continue? [Y/n]',
+        'Proceed (y/N)',
+        'Accept the EULA',
+        'View the license',
+        'Agree to the terms',
+        'Configuring   tzdata',
+        'Press ENTER to continue',
+        '[sudo] Password:',
+        'GPG key',
+        'Bad signature',
+        'Import key 0xABCD',
+        'Grant permissions',
+    ]
+    for sample in samples:
+        assert runner.PROMPTS.search(sample), sample
+        assert runner.PromptDetector().feed(sample), sample
+
+
+def test_prompt_detector_keeps_bounded_context():
+    detector = runner.PromptDetector(context=100)
+    for _ in range(1000):
+        detector.feed('Unpacking libexample1 (1.0) ...\n')
+
+    assert len(detector.context) == 100
+
+
+def _synthetic_apt_log(size: int) -> str:
+    lines = []
+    total = 0
+    i = 0
+    while total < size:
+        package = f'libexample{i}'
+        block = (
+            f'Get:{i} http://archive.ubuntu.com/ubuntu noble/main amd64 '
+            f'{package} amd64 1.{i % 97}-1 [{i % 900} kB]\n'
+            f'Preparing to unpack .../{package}_1.{i % 97}-1_amd64.deb ...\n'
+            f'Unpacking {package} (1.{i % 97}-1) ...\n'
+            f'Setting up {package} (1.{i % 97}-1) ...\n'
+            'Processing triggers for man-db (2.12.0-4build2) ...\n'
+        )
+        lines.append(block)
+        total += len(block)
+        i += 1
+    return ''.join(lines) + 'Do you want to continue? [Y/n] '
+
+
+def test_benchmark_prompt_detector_on_20mb_log():
+    import time
+
+    log = _synthetic_apt_log(20 * 1024 * 1024)
+    chunks = [log[i : i + 1024] for i in range(0, len(log), 1024)]
+
+    detector = runner.PromptDetector()
+    start = time.perf_counter()
+    detections = [n for n, chunk in enumerate(chunks) if detector.feed(chunk)]
+    elapsed = time.perf_counter() - start
+
+    # The former approach rescanned the whole accumulated buffer per chunk.
+    sample = chunks[:200]
+    buffer = ''
+    start = time.perf_counter()
+    for chunk in sample:
+        buffer += chunk
+        runner.PROMPTS.search(buffer)
+    rescan_elapsed = time.perf_counter() - start
+
+    print(
+        f'\n20 MB log: incremental {elapsed:.2f} s; '
+        f'full rescans of the first 200 KB alone {rescan_elapsed:.2f} s'
+    )
+    assert detections == [len(chunks) - 1]
+    assert elapsed < 3
+
+
+def test_command_args_exec_directly_unless_shell_is_needed(monkeypatch):
+    monkeypatch.setenv(runner.NON_INTERACTIVE_ENV, '1')
+    assert runner.command_args('sudo -E apt-get install -y vim') == [
+        'sudo',
+        '-n',
+        '-E',
+        'apt-get',
+        'install',
+        '-y',
+        'vim',
+    ]
+    assert runner.command_args("flatpak install -y 'org.gimp.GIMP'") == [
+        'flatpak',
+        'install',
+        '-y',
+        'org.gimp.GIMP',
+    ]
+    assert runner.command_args('echo a && echo b') == [
+        '/bin/bash',
+        '-c',
+        'echo a && echo b',
+    ]
+
+
+def test_non_interactive_env_skips_pty_and_sets_debian_frontend(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setenv(runner.NON_INTERACTIVE_ENV, '1')
+    log_file = tmp_path / 'op.log'
+
+    with patch('easyinstaller.core.runner.pexpect.spawn') as spawn_mock:
+        rc = runner.run_cmd_smart(
+            'printenv DEBIAN_FRONTEND', log_path=str(log_file)
+        )
+        missing = runner.run_cmd_smart('no-such-program-ei', log_path=None)
+
+    assert rc == 0
+    assert missing == 127
+    spawn_mock.assert_not_called()
+    assert log_file.read_text() == 'noninteractive\n'
+
+
+def test_main_non_interactive_flag_exports_env(monkeypatch):
+    import sys
+    import types
+
+    import typer
+    from typer.testing import CliRunner
+
+    from easyinstaller import main
+
+    seen = {}
+    probe = typer.Typer()
+
+    @probe.callback(invoke_without_command=True)
+    def record_env():
+        seen['value'] = os.environ.get(runner.NON_INTERACTIVE_ENV)
+        seen['non_interactive'] = runner.is_non_interactive()
+
+    module = types.ModuleType('ei_probe_command')
+    module.app = probe
+    monkeypatch.setitem(sys.modules, 'ei_probe_command', module)
+    monkeypatch.setitem(
+        main.EasyInstallerGroup.lazy_commands,
+        'probe',
+        ('ei_probe_command', 'Records the environment.'),
+    )
+    # Registers the variable so the flag's export is undone afterwards.
+    monkeypatch.setenv(runner.NON_INTERACTIVE_ENV, '0')
+    monkeypatch.setattr(main._update_prompt, 'begin', lambda: None)
+    monkeypatch.setattr(main._update_prompt, 'notify', lambda ctx: None)
+
+    result = CliRunner().invoke(main.app, ['--non-interactive', 'probe'])
+
+    assert result.exit_code == 0, result.output
+    assert main.NON_INTERACTIVE_ENV == runner.NON_INTERACTIVE_ENV
+    assert seen == {'value': '1', 'non_interactive': True}
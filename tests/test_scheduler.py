@@ -0,0 +1,124 @@
+import threading
+from unittest.mock import patch
+
+import easyinstaller.core.scheduler as scheduler
+from easyinstaller.core.runner import is_unattended
+from easyinstaller.core.scheduler import ManagerJob, run_manager_jobs
+
+
+def _jobs(*managers):
+    return [ManagerJob(manager=m, packages=[f'{m}-pkg']) for m in managers]
+
+
+def test_managers_without_shared_locks_run_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def worker(manager, packages):
+        # Deadlocks (and times out) unless both jobs run at the same time.
+        barrier.wait()
+        return {pkg: 'installed' for pkg in packages}
+
+    with patch.object(scheduler.shutil, 'which', return_value='/usr/bin/x'):
+        results = run_manager_jobs(_jobs('apt', 'flatpak'), worker)
+
+    assert [r.manager for r in results] == ['apt', 'flatpak']
+    assert all(r.ok for r in results)
+    assert results[1].results == {'flatpak-pkg': 'installed'}
+
+
+def test_bootstrapping_manager_waits_for_native_lock():
+    active = []
+    overlaps = []
+    guard = threading.Lock()
+
+    def worker(manager, packages):
+        with guard:
+            if active:
+                overlaps.append((manager, list(active)))
+            active.append(manager)
+        threading.Event().wait(0.05)
+        with guard:
+            active.remove(manager)
+        return {}
+
+    # snap is missing, so installing it needs the dpkg lock too.
+    with patch.object(
+        scheduler.shutil,
+        'which',
+        side_effect=lambda name: None if name == 'snap' else '/usr/bin/x',
+    ):
+        assert scheduler.manager_resources('snap') == ('dpkg', 'snapd')
+        run_manager_jobs(_jobs('apt', 'snap'), worker)
+
+    assert overlaps == []
+
+
+def test_failures_are_reported_per_job():
+    def worker(manager, packages):
+        if manager == 'snap':
+            raise SystemExit(2)
+        if manager == 'flatpak':
+            raise RuntimeError('remote unavailable')
+        return {'apt-pkg': 'unchanged'}
+
+    states = []
+    results = run_manager_jobs(
+        _jobs('apt', 'flatpak', 'snap'),
+        worker,
+        on_state=lambda manager, state: states.append((manager, state)),
+    )
+
+    by_manager = {r.manager: r for r in results}
+    assert by_manager['apt'].ok
+    assert by_manager['snap'].exit_code == 2
+    assert by_manager['flatpak'].error == 'remote unavailable'
+    assert ('snap', 'failed') in states
+    assert ('apt', 'done') in states
+
+
+def test_only_concurrent_jobs_run_unattended():
+    seen = {}
+
+    def worker(manager, packages):
+        seen[manager] = is_unattended()
+        return {}
+
+    run_manager_jobs(_jobs('apt'), worker)
+    run_manager_jobs(_jobs('flatpak', 'snap'), worker)
+
+    assert seen == {'apt': False, 'flatpak': True, 'snap': True}
+
+
+def test_prefetch_runs_ahead_of_sequential_installs():
+    events = []
+    guard = threading.Lock()
+    flatpak_prefetched = threading.Event()
+
+    def prefetch(manager, packages):
+        with guard:
+            events.append(('prefetch', manager, is_unattended()))
+        if manager == 'flatpak':
+            flatpak_prefetched.set()
+        else:
+            raise SystemExit(100)   # Failed downloads are not fatal.
+
+    def worker(manager, packages):
+        if manager == 'apt':
+            # flatpak downloads while apt is still installing.
+            assert flatpak_prefetched.wait(5)
+        with guard:
+            events.append(('install', manager))
+        return {}
+
+    with patch.object(scheduler.shutil, 'which', return_value='/usr/bin/x'):
+        results = run_manager_jobs(
+            _jobs('apt', 'flatpak'), worker, parallel=False, prefetch=prefetch
+        )
+
+    assert all(r.ok for r in results)
+    assert ('prefetch', 'apt', True) in events
+    assert ('prefetch', 'flatpak', True) in events
+    for manager in ('apt', 'flatpak'):
+        assert events.index(('prefetch', manager, True)) < events.index(
+            ('install', manager)
+        )
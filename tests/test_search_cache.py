@@ -0,0 +1,79 @@
+import time
+from unittest.mock import patch
+
+import easyinstaller.core.search_cache as search_cache
+import easyinstaller.core.searcher as searcher
+from easyinstaller.core.search_cache import (
+    cached_results,
+    load_search_cache,
+    save_search_cache,
+    store_results,
+)
+
+APT_VIM = [{'id': 'vim', 'name': 'vim', 'summary': '', 'source': 'apt'}]
+SNAP_VIM = [{'id': 'vim', 'name': 'vim', 'summary': '', 'source': 'snap'}]
+
+
+def _patched_backends(flathub=()):
+    return (
+        patch.object(searcher, 'search_apt', return_value=APT_VIM),
+        patch.object(searcher, 'search_flathub', return_value=list(flathub)),
+        patch.object(searcher, 'search_snap', return_value=SNAP_VIM),
+    )
+
+
+def test_repeat_search_is_served_from_cache():
+    apt, flathub, snap = _patched_backends()
+    with apt as apt_mock, flathub as flathub_mock, snap as snap_mock:
+        first = searcher.unified_search('Vim')
+        second = searcher.unified_search('  vim ')
+
+    assert first == second
+    assert apt_mock.call_count == 1
+    assert snap_mock.call_count == 1
+    # Empty results may come from a failing backend, so they are retried.
+    assert flathub_mock.call_count == 2
+
+
+def test_no_cache_queries_backends_again():
+    apt, flathub, snap = _patched_backends()
+    with apt as apt_mock, flathub, snap:
+        searcher.unified_search('vim')
+        searcher.unified_search('vim', use_cache=False)
+
+    assert apt_mock.call_count == 2
+
+
+def test_entries_expire_per_backend_ttl():
+    cache = {}
+    store_results(cache, 'apt', 'vim', APT_VIM)
+    store_results(cache, 'snap', 'vim', SNAP_VIM)
+
+    later = time.time() + search_cache.BACKEND_TTLS['apt'] + 1
+    with patch.object(search_cache.time, 'time', return_value=later):
+        assert cached_results(cache, 'apt', 'vim') is None
+        assert cached_results(cache, 'snap', 'vim') == SNAP_VIM
+
+
+def test_least_recently_used_entries_are_evicted(monkeypatch):
+    monkeypatch.setattr(search_cache, 'MAX_ENTRIES', 2)
+    cache = {}
+    for query in ('a', 'b'):
+        store_results(cache, 'apt', query, APT_VIM)
+    cached_results(cache, 'apt', 'a')
+    store_results(cache, 'apt', 'c', APT_VIM)
+    save_search_cache(cache)
+
+    assert list(load_search_cache()) == ['apt:a', 'apt:c']
+
+
+def test_cache_is_bounded_in_bytes(monkeypatch):
+    monkeypatch.setattr(search_cache, 'MAX_BYTES', 400)
+    cache = {}
+    for query in 'abcdefgh':
+        store_results(cache, 'apt', query, APT_VIM)
+    save_search_cache(cache)
+
+    stored = load_search_cache()
+    assert 0 < len(stored) < 8
+    assert 'apt:h' in stored
@@ -0,0 +1,110 @@
+import time
+from unittest.mock import patch
+
+import easyinstaller.core.search_index as search_index
+import easyinstaller.core.searcher as searcher
+from easyinstaller.core.search_index import (
+    SearchIndex,
+    build_source_index,
+    load_search_index,
+    refresh_index,
+)
+
+FLATHUB_APPS = [
+    {
+        'flatpakAppId': 'org.gimp.GIMP',
+        'name': 'GNU Image Manipulation Program',
+        'summary': 'Create images and edit photographs',
+    },
+    {
+        'flatpakAppId': 'org.inkscape.Inkscape',
+        'name': 'Inkscape',
+        'summary': 'Vector graphics editor',
+    },
+]
+
+
+def test_search_matches_token_prefixes_across_fields():
+    index = SearchIndex(
+        {
+            'flatpak': build_source_index(
+                [
+                    {
+                        'id': 'org.gimp.GIMP',
+                        'name': 'GIMP',
+                        'summary': 'Image editor',
+                    },
+                    {
+                        'id': 'com.visualstudio.code',
+                        'name': 'Visual Studio Code',
+                        'summary': 'Code editing. Redefined.',
+                    },
+                ]
+            )
+        }
+    )
+
+    assert [r['id'] for r in index.search('flatpak', 'edit')] == [
+        'org.gimp.GIMP',
+        'com.visualstudio.code',
+    ]
+    assert index.search('flatpak', 'visual cod') == [
+        {
+            'id': 'com.visualstudio.code',
+            'name': 'Visual Studio Code',
+            'summary': 'Code editing. Redefined.',
+            'source': 'flatpak',
+        }
+    ]
+    assert index.search('flatpak', 'gimp vector') == []
+    assert index.search('snap', 'gimp') == []
+
+
+def test_refresh_builds_index_from_catalogs(stand_in):
+    stand_in.routes = {
+        '/api/v2/compat/apps': FLATHUB_APPS,
+        '/api/v1/snaps/search': lambda query: {
+            '_embedded': {
+                'clickindex:package': [
+                    {'package_name': 'inkscape', 'summary': 'Vector art'}
+                ]
+            }
+        },
+    }
+
+    assert refresh_index() == {'flatpak': 2, 'snap': 1}
+
+    index = load_search_index()
+    assert index.size('flatpak') == 2
+    assert index.is_fresh('snap', 3600)
+    assert [r['source'] for r in index.search('flatpak', 'inkscape')] == [
+        'flatpak'
+    ]
+
+    # Refreshing one source keeps the others.
+    stand_in.routes['/api/v2/compat/apps'] = FLATHUB_APPS[:1]
+    assert refresh_index(['flatpak']) == {'flatpak': 1}
+    assert load_search_index().size('snap') == 1
+
+
+def test_unified_search_uses_fresh_index_and_falls_back_when_stale(
+    stand_in,
+):
+    stand_in.routes = {
+        '/api/v2/compat/apps': FLATHUB_APPS,
+        '/api/v1/snaps/search': [],
+    }
+    refresh_index()
+
+    with patch.object(searcher, 'search_apt', return_value=[]), patch.object(
+        searcher, 'search_flathub', return_value=[]
+    ) as live_flathub:
+        results = searcher.unified_search('inkscape')
+        assert [r['id'] for r in results] == ['org.inkscape.Inkscape']
+        live_flathub.assert_not_called()
+
+        with patch.object(
+            search_index.time, 'time', return_value=time.time() + 30 * 86400
+        ):
+            searcher.unified_search('inkscape')
+        live_flathub.assert_called_once_with('inkscape')
@@ -0,0 +1,84 @@
+import threading
+import time
+from unittest.mock import patch
+
+import easyinstaller.core.searcher as searcher
+
+
+def _backend(source, delay=0.0, release=None):
+    def search(query):
+        if release is not None:
+            release.wait(5)
+        time.sleep(delay)
+        return [{'id': query, 'name': query, 'summary': '', 'source': source}]
+
+    return search
+
+
+def test_iter_search_yields_backends_as_they_finish():
+    release = threading.Event()
+    with patch.object(
+        searcher, 'search_apt', _backend('apt', release=release)
+    ), patch.object(
+        searcher, 'search_flathub', _backend('flatpak')
+    ), patch.object(
+        searcher, 'search_snap', _backend('snap', release=release)
+    ):
+        stream = searcher.iter_search('vlc')
+        # apt and snap are blocked, so flatpak must arrive first.
+        first_source, first_results = next(stream)
+        release.set()
+        rest = dict(stream)
+
+    assert first_source == 'flatpak'
+    assert first_results[0]['source'] == 'flatpak'
+    assert set(rest) == {'apt', 'snap'}
+
+
+def test_backend_missing_its_deadline_is_given_up():
+    never = threading.Event()
+    with patch.object(searcher, 'search_apt', _backend('apt')), patch.object(
+        searcher, 'search_flathub', _backend('flatpak', release=never)
+    ), patch.object(searcher, 'search_snap', _backend('snap')):
+        start = time.monotonic()
+        results = dict(searcher.iter_search('vlc', deadlines={'flatpak': 0.2}))
+        elapsed = time.monotonic() - start
+    never.set()
+
+    assert results['flatpak'] is None
+    assert results['apt'][0]['name'] == 'vlc'
+    assert elapsed < 2
+
+
+def test_failing_backend_yields_none():
+    def broken(query):
+        raise RuntimeError('boom')
+
+    with patch.object(searcher, 'search_apt', broken), patch.object(
+        searcher, 'search_flathub', _backend('flatpak')
+    ), patch.object(searcher, 'search_snap', _backend('snap')):
+        results = dict(searcher.iter_search('vlc'))
+        ranked = searcher.unified_search('vlc', use_cache=False)
+
+    assert results['apt'] is None
+    assert [r['source'] for r in ranked] == ['flatpak', 'snap']
+
+
+def test_search_many_runs_queries_concurrently_and_dedupes():
+    barrier = threading.Barrier(2, timeout=5)
+    calls = []
+
+    def apt(query):
+        calls.append(query)
+        # Deadlocks (and times out) unless both queries run at once.
+        barrier.wait()
+        return [{'id': query, 'name': query, 'summary': '', 'source': 'apt'}]
+
+    with patch.object(searcher, 'search_apt', apt), patch.object(
+        searcher, 'search_flathub', return_value=[]
+    ), patch.object(searcher, 'search_snap', return_value=[]):
+        results = searcher.search_many(['gimp', 'vlc', ' GIMP '])
+
+    assert list(results) == ['gimp', 'vlc']
+    assert sorted(calls) == ['gimp', 'vlc']
+    assert results['vlc'][0]['name'] == 'vlc'
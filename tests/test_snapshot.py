@@ -0,0 +1,97 @@
+import subprocess
+from unittest.mock import MagicMock, patch
+
+import easyinstaller.core.lister as lister
+import easyinstaller.core.snapshot as snapshot
+
+
+def _track(tmp_path, monkeypatch):
+    state_files = {}
+    for manager in ('apt', 'flatpak', 'snap'):
+        state_file = tmp_path / f'{manager}.state'
+        state_file.write_text('0')
+        state_files[manager] = state_file
+    monkeypatch.setattr(
+        snapshot,
+        'MANAGER_STATE_PATHS',
+        {manager: (path,) for manager, path in state_files.items()},
+    )
+    return state_files
+
+
+def test_unified_lister_reuses_snapshot_when_state_is_unchanged(
+    tmp_path, monkeypatch
+):
+    _track(tmp_path, monkeypatch)
+    with patch(
+        'easyinstaller.core.lister.list_apt_packages',
+        return_value=[{'name': 'vim', 'source': 'apt'}],
+    ) as apt_mock:
+        first = lister.unified_lister(['apt'])
+        second = lister.unified_lister(['apt'])
+
+    apt_mock.assert_called_once()
+    assert first == second == [{'name': 'vim', 'source': 'apt'}]
+
+
+def test_unified_lister_rescans_only_changed_managers(tmp_path, monkeypatch):
+    state_files = _track(tmp_path, monkeypatch)
+    with patch(
+        'easyinstaller.core.lister.list_apt_packages',
+        return_value=[{'name': 'vim', 'source': 'apt'}],
+    ) as apt_mock, patch(
+        'easyinstaller.core.lister.list_snap_packages',
+        return_value=[{'name': 'code', 'source': 'snap'}],
+    ) as snap_mock:
+        lister.unified_lister(['apt', 'snap'])
+        state_files['snap'].write_text('changed')
+        results = lister.unified_lister(['apt', 'snap'])
+
+    assert apt_mock.call_count == 1
+    assert snap_mock.call_count == 2
+    assert [pkg['source'] for pkg in results] == ['apt', 'snap']
+
+
+def test_unified_lister_bypasses_cache_on_request(tmp_path, monkeypatch):
+    _track(tmp_path, monkeypatch)
+    with patch(
+        'easyinstaller.core.lister.list_snap_packages', return_value=[]
+    ) as snap_mock:
+        lister.unified_lister(['snap'], use_cache=False)
+        lister.unified_lister(['snap'], use_cache=False)
+
+    assert snap_mock.call_count == 2
+    assert not snapshot.SNAPSHOT_FILE.exists()
+
+
+def test_load_snapshot_ignores_corrupt_file():
+    snapshot.SNAPSHOT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    snapshot.SNAPSHOT_FILE.write_text('{not json')
+
+    assert snapshot.load_snapshot() == {}
+
+
+def test_state_fingerprint_marks_missing_paths(tmp_path, monkeypatch):
+    missing = tmp_path / 'missing'
+    monkeypatch.setattr(snapshot, 'MANAGER_STATE_PATHS', {'apt': (missing,)})
+
+    assert snapshot.state_fingerprint('apt') == [[str(missing), None, None]]
+    assert snapshot.state_fingerprint('pacman') is None
+
+
+def test_failed_scan_is_not_cached(tmp_path, monkeypatch):
+    _track(tmp_path, monkeypatch)
+    completed = MagicMock(stdout='Name Version Rev\ncode 1.0 1\n')
+    with patch(
+        'easyinstaller.core.lister.subprocess.run',
+        side_effect=[
+            subprocess.CalledProcessError(1, ['snap', 'list']),
+            completed,
+        ],
+    ) as run_mock:
+        first = lister.unified_lister(['snap'])
+        second = lister.unified_lister(['snap'])
+
+    assert first == []
+    assert [pkg['name'] for pkg in second] == ['code']
+    assert run_mock.call_count == 2